@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CalculatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'calculator'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "CALCULATOR_WARM_START", False):
+            # Load the artifacts written by warm_caches and build_outcome_table,
+            # if present, so the first requests run as fast as later ones.
+            from .logic import load_outcome_table, load_warm_tables
+
+            load_warm_tables()
+            load_outcome_table()
@@ -0,0 +1,156 @@
+"""Async counterparts of the calculator, sweep and scenario API views.
+
+Used when the project is served over ASGI (see CALCULATOR_ASYNC_VIEWS).
+Catalog reads go through the async ORM.  The calculator page computes
+an uncached result's outcome and hit chance together in one pooled task.
+The sweep and API take outcomes from the shared cache or the precomputed
+table when possible.  Anything else runs in the bounded process pool from calculator.compute, so one event loop can keep
+answering light requests while heavy attacks are enumerated.  A saturated
+pool answers 503 with Retry-After, and a calculation that overruns
+CALCULATOR_COMPUTE_TIMEOUT answers 504.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .compute import ComputeBusy, ComputeTimeout, attack_outcomes, attack_result, run_compute
+from .logic import load_outcome_table
+from .models import InjuryBandSet, UnitProfile, Weapon
+from .resolution import AttackOutOfBounds, resolve_attack
+from .result_cache import acached_outcomes, acached_results
+from .timing import timer
+from .views import (
+    _add_bound_errors,
+    _calculator_inputs,
+    _ensure_profiles_exist,
+    _load_catalog,
+    _parse_scenarios,
+    _prefetch_calculation,
+    _render_calculator,
+    _resolve_scenarios,
+    _results_context,
+    _scenario_response,
+    _sweep_bound_error,
+    _sweep_content_type,
+    _sweep_footer,
+    _sweep_header,
+    _sweep_row_attacks,
+    _sweep_row_chunk,
+    _sweep_setup,
+)
+
+RETRY_AFTER_SECONDS = 1
+
+
+async def _compute_outcomes(attacks):
+    """Outcomes in order: table hits inline, the rest in one pooled task."""
+    table = load_outcome_table()
+    outcomes = [table.lookup(attack) if table is not None else None for attack in attacks]
+    missing = [index for index, outcome in enumerate(outcomes) if outcome is None]
+    if missing:
+        with timer("compute"):
+            computed = await run_compute(attack_outcomes, [attacks[index] for index in missing])
+        for index, outcome in zip(missing, computed):
+            outcomes[index] = outcome
+    return outcomes
+
+
+def _overloaded_response(exc):
+    if isinstance(exc, ComputeBusy):
+        response = JsonResponse({"errors": ["Calculator is busy, try again shortly."]}, status=503)
+        response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+        return response
+    return JsonResponse({"errors": ["Calculation timed out."]}, status=504)
+
+
+async def _load_calculator_choices():
+    profiles = [profile async for profile in UnitProfile.objects.all()]
+    if not profiles:
+        await sync_to_async(_ensure_profiles_exist)()
+        profiles = [profile async for profile in UnitProfile.objects.all()]
+    return {
+        "profiles": profiles,
+        "weapons": [weapon async for weapon in Weapon.objects.all()],
+        "band_sets": [band_set async for band_set in InjuryBandSet.objects.all()],
+    }
+
+
+async def _build_results(cleaned_data):
+    resolved = await sync_to_async(_prefetch_calculation)(cleaned_data)
+    attack = resolved["attack"]
+    # The whole context is cached by acached_results, so one pooled task covers both.
+    with timer("compute"):
+        outcome, hit_prob = await run_compute(attack_result, attack)
+    return _results_context(cleaned_data, resolved, outcome, hit_prob)
+
+
+async def calculator_view(request):
+    attack_form, cleaned_data = _calculator_inputs(request, await _load_calculator_choices())
+    results = None
+    if cleaned_data:
+        try:
+            results = await acached_results(cleaned_data, _build_results)
+        except AttackOutOfBounds as exc:
+            _add_bound_errors(attack_form, exc)
+        except (ComputeBusy, ComputeTimeout) as exc:
+            return _overloaded_response(exc)
+    return _render_calculator(request, attack_form, results)
+
+
+async def _sweep_cells(row):
+    x, cells = row
+    outcomes = await _compute_outcomes([attack for _, attack in cells])
+    return x, [(y, outcome) for (y, _), outcome in zip(cells, outcomes)]
+
+
+async def _astream_sweep(cleaned_data, labels, first_row, rows):
+    yield _sweep_header(cleaned_data, labels)
+    yield _sweep_row_chunk(cleaned_data, labels, 0, *first_row)
+    for index, row in enumerate(rows, start=1):
+        yield _sweep_row_chunk(cleaned_data, labels, index, *await _sweep_cells(row))
+    yield _sweep_footer(cleaned_data)
+
+
+async def sweep_view(request):
+    """Async sweep_view.
+
+    Headers go out with the first row, so only that row can still turn into a
+    503 or 504; a later failure ends the stream early.
+    """
+    cleaned_data, error = await sync_to_async(_sweep_setup)(request)
+    if error:
+        return error
+
+    base_attack = (await sync_to_async(resolve_attack)(cleaned_data))["attack"]
+    error = _sweep_bound_error(cleaned_data, base_attack)
+    if error:
+        return error
+    labels = ["Miss"] + [band.label for band in base_attack.injury_bands]
+    rows = _sweep_row_attacks(cleaned_data, base_attack)
+    try:
+        first_row = await _sweep_cells(next(rows))
+    except (ComputeBusy, ComputeTimeout) as exc:
+        return _overloaded_response(exc)
+    return StreamingHttpResponse(
+        _astream_sweep(cleaned_data, labels, first_row, rows), content_type=_sweep_content_type(cleaned_data)
+    )
+
+
+@csrf_exempt
+@require_POST
+async def calculate_api(request):
+    """Async calculate_api; distinct cache misses share a single pooled task."""
+    forms, error = _parse_scenarios(request)
+    if error:
+        return error
+
+    catalog = await sync_to_async(_load_catalog)(forms)
+    # Resolving may still fall back to an attacker's first weapon.
+    entries, unique = await sync_to_async(_resolve_scenarios)(forms, catalog)
+    try:
+        outcomes = await acached_outcomes(list(unique.values()), _compute_outcomes)
+    except (ComputeBusy, ComputeTimeout) as exc:
+        return _overloaded_response(exc)
+    return _scenario_response(entries, dict(zip(unique, outcomes)))
@@ -0,0 +1,159 @@
+"""Vectorized evaluation of many attacks at once.
+
+NumPy is only needed by this module; the scalar engine in ``calculator.logic``
+stays dependency-free.
+"""
+
+from __future__ import annotations
+
+from typing import List, Mapping, Sequence, Union
+
+import numpy as np
+
+from .logic import (
+    DEFAULT_INJURY_BANDS,
+    DICE_SIDES,
+    KEEP_DICES,
+    AttackInput,
+    InjuryBand,
+    _dice_sum_distribution,
+    _hit_branches,
+    compile_injury_bands,
+)
+
+ATTACK_INPUT_DTYPE = np.dtype(
+    [
+        ("hit_target_number", np.int64),
+        ("hit_dice_mod", np.int64),
+        ("hit_roll_mod", np.int64),
+        ("weapon_is_critical", np.bool_),
+        ("injury_dice_mod", np.int64),
+        ("injury_roll_mod", np.int64),
+        ("target_armor", np.int64),
+    ]
+)
+
+_FIELD_DEFAULTS = {
+    "hit_dice_mod": 0,
+    "hit_roll_mod": 0,
+    "weapon_is_critical": False,
+    "injury_dice_mod": 0,
+    "injury_roll_mod": 0,
+    "target_armor": 0,
+}
+
+# Kept sums range over [MIN_SUM, MAX_SUM]; a hit threshold outside
+# [MIN_SUM, MAX_SUM + 1] behaves exactly like the nearest end.
+MIN_SUM = KEEP_DICES
+MAX_SUM = KEEP_DICES * DICE_SIDES
+
+BatchInputs = Union[np.ndarray, Mapping[str, Sequence[int]]]
+
+
+def attack_inputs_to_array(attacks: Sequence[AttackInput]) -> np.ndarray:
+    """Pack AttackInput objects into an ATTACK_INPUT_DTYPE structured array."""
+    return np.array(
+        [tuple(getattr(attack, name) for name in ATTACK_INPUT_DTYPE.names) for attack in attacks],
+        dtype=ATTACK_INPUT_DTYPE,
+    )
+
+
+def batch_labels(injury_bands: List[InjuryBand] = DEFAULT_INJURY_BANDS) -> List[str]:
+    """Column labels of the matrix returned by attack_outcome_batch."""
+    return ["Miss"] + [band.label for band in injury_bands]
+
+
+def _field(inputs: BatchInputs, name: str, size: int | None) -> np.ndarray:
+    names = inputs.dtype.names if isinstance(inputs, np.ndarray) else inputs.keys()
+    if name in names:
+        return np.asarray(inputs[name])
+    if name not in _FIELD_DEFAULTS:
+        raise ValueError(f"{name} is required.")
+    return np.full(size, _FIELD_DEFAULTS[name])
+
+
+def _hit_tables(dice_mods: range):
+    """Per hit dice mod: P(miss), P(hit without crit), P(hit with crit) by threshold."""
+    thresholds = MAX_SUM - MIN_SUM + 2
+    miss = np.zeros((len(dice_mods), thresholds))
+    hit_plain = np.zeros((len(dice_mods), thresholds))
+    hit_crit = np.zeros((len(dice_mods), thresholds))
+
+    for row, dice_mod in enumerate(dice_mods):
+        plain, crit = _hit_branches(dice_mod)
+        # Column t is the threshold MIN_SUM + t: hits are kept sums >= threshold.
+        for column, threshold in enumerate(range(MIN_SUM, MAX_SUM + 2)):
+            miss[row, column] = plain.below(threshold) + crit.below(threshold)
+            hit_plain[row, column] = plain.at_least(threshold)
+            hit_crit[row, column] = crit.at_least(threshold)
+
+    return miss, hit_plain, hit_crit
+
+
+def _injury_tables(dice_mods: range, net_mods: range, injury_bands: List[InjuryBand]) -> np.ndarray:
+    """Band masses indexed by [injury dice mod, net injury mod, band]."""
+    sums = np.arange(MIN_SUM, MAX_SUM + 1)
+    dist = np.zeros((len(dice_mods), len(sums)))
+    for row, dice_mod in enumerate(dice_mods):
+        for value, p in _dice_sum_distribution(KEEP_DICES + abs(dice_mod), dice_mod >= 0):
+            dist[row, value - MIN_SUM] = p
+
+    # One-hot band assignment for every reachable injury total, via the same
+    # compiled lookup injury_distribution uses.
+    totals = np.arange(MIN_SUM + net_mods.start, MAX_SUM + net_mods.stop)
+    start, index = compile_injury_bands(tuple(injury_bands))
+    band_of = np.asarray(index)[np.clip(totals - start, 0, len(index) - 1)]
+    onehot = (band_of[:, None] == np.arange(len(injury_bands))[None, :]).astype(float)
+
+    offsets = np.arange(len(net_mods))[:, None] + np.arange(len(sums))[None, :]
+    return np.einsum("ds,nsb->dnb", dist, onehot[offsets])
+
+
+def attack_outcome_batch(
+    inputs: BatchInputs,
+    injury_bands: List[InjuryBand] = DEFAULT_INJURY_BANDS,
+) -> np.ndarray:
+    """Evaluate many attacks in one vectorized pass.
+
+    ``inputs`` is a structured array with ATTACK_INPUT_DTYPE fields or a
+    mapping of field name to array; every field but ``hit_target_number`` may
+    be omitted and then takes the AttackInput default.  All scenarios share
+    ``injury_bands``.  Returns an ``(N, 1 + len(injury_bands))`` matrix whose
+    columns follow batch_labels(injury_bands).
+    """
+    if not injury_bands:
+        raise ValueError("injury_bands must be provided.")
+
+    tn = _field(inputs, "hit_target_number", None).astype(np.int64).ravel()
+    size = tn.shape[0]
+    hit_dice_mod = _field(inputs, "hit_dice_mod", size).astype(np.int64).ravel()
+    hit_roll_mod = _field(inputs, "hit_roll_mod", size).astype(np.int64).ravel()
+    critical = _field(inputs, "weapon_is_critical", size).astype(bool).ravel()
+    injury_dice_mod = _field(inputs, "injury_dice_mod", size).astype(np.int64).ravel()
+    net_mod = (
+        _field(inputs, "injury_roll_mod", size).astype(np.int64).ravel()
+        - _field(inputs, "target_armor", size).astype(np.int64).ravel()
+    )
+
+    result = np.zeros((size, 1 + len(injury_bands)))
+    if size == 0:
+        return result
+
+    hit_mods = range(int(hit_dice_mod.min()), int(hit_dice_mod.max()) + 1)
+    miss, hit_plain, hit_crit = _hit_tables(hit_mods)
+    hit_row = hit_dice_mod - hit_mods.start
+    threshold = np.clip(tn - hit_roll_mod, MIN_SUM, MAX_SUM + 1) - MIN_SUM
+
+    injury_mods = range(int(injury_dice_mod.min()), int(injury_dice_mod.max()) + 3)
+    net_mods = range(int(net_mod.min()), int(net_mod.max()) + 1)
+    bands = _injury_tables(injury_mods, net_mods, injury_bands)
+    injury_row = injury_dice_mod - injury_mods.start
+    net_col = net_mod - net_mods.start
+    crit_row = injury_row + np.where(critical, 2, 1)
+
+    result[:, 0] = miss[hit_row, threshold]
+    result[:, 1:] = (
+        hit_plain[hit_row, threshold][:, None] * bands[injury_row, net_col]
+        + hit_crit[hit_row, threshold][:, None] * bands[crit_row, net_col]
+    )
+    return result
@@ -0,0 +1,159 @@
+"""Timing suite for the dice engine and the calculator views.
+
+Results are a flat ``{benchmark name: seconds per call}`` mapping so runs can
+be stored as JSON and compared against a baseline.
+"""
+
+from __future__ import annotations
+
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import django
+
+from .logic import (
+    CRIT_RESULT,
+    DEFAULT_INJURY_BANDS,
+    DICE_SIDES,
+    KEEP_DICES,
+    AttackInput,
+    attack_outcome_probabilities,
+    clear_caches,
+    dice_sum_distribution,
+    hit_crit_branches,
+    injury_distribution,
+    success_probability,
+)
+
+DICE_MODS = range(-6, 7)
+ARMOR_VALUES = (0, 2, 4)
+CATALOG_SIZES = (10, 100, 1000)
+
+
+def time_call(func: Callable[[], object], repeat: int = 5, setup: Callable[[], object] | None = None) -> float:
+    """Median wall time of ``func`` over ``repeat`` runs; ``setup`` runs untimed before each."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def logic_benchmarks(repeat: int = 5) -> Dict[str, float]:
+    """Cold-cache timings of each calculator.logic entry point."""
+    results = {}
+    for dice_mod in DICE_MODS:
+        num_dice = KEEP_DICES + abs(dice_mod)
+        keep_highest = dice_mod >= 0
+        results[f"logic.dice_sum_distribution[dice_mod={dice_mod:+d}]"] = time_call(
+            lambda: dice_sum_distribution(num_dice, keep_highest), repeat, clear_caches
+        )
+        results[f"logic.hit_crit_branches[dice_mod={dice_mod:+d}]"] = time_call(
+            lambda: hit_crit_branches(dice_mod), repeat, clear_caches
+        )
+        results[f"logic.success_probability[dice_mod={dice_mod:+d}]"] = time_call(
+            lambda: success_probability(7, dice_mod), repeat, clear_caches
+        )
+        for armor in ARMOR_VALUES:
+            results[f"logic.injury_distribution[dice_mod={dice_mod:+d},armor={armor}]"] = time_call(
+                lambda: injury_distribution(DEFAULT_INJURY_BANDS, dice_mod, 2, armor), repeat, clear_caches
+            )
+            for critical in (False, True):
+                attack = AttackInput(
+                    hit_target_number=7,
+                    hit_dice_mod=dice_mod,
+                    weapon_is_critical=critical,
+                    injury_bands=DEFAULT_INJURY_BANDS,
+                    injury_roll_mod=2,
+                    target_armor=armor,
+                )
+                name = f"logic.attack_outcome_probabilities[dice_mod={dice_mod:+d},armor={armor},crit={int(critical)}]"
+                results[name] = time_call(lambda: attack_outcome_probabilities(attack), repeat, clear_caches)
+    return results
+
+
+def view_benchmarks(sizes: Iterable[int] = CATALOG_SIZES, repeat: int = 5) -> Dict[str, float]:
+    """Full calculator_view requests through the test client against seeded catalogs.
+
+    Needs a disposable database; run it through the ``benchmark`` command,
+    which sets up a test database first.
+    """
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from .models import UnitProfile
+    from .result_cache import get_cache
+    from .testing import LOCMEM_CACHES, seed_catalog
+
+    client = Client()
+    url = reverse("calculator")
+    results = {}
+    with override_settings(CACHES=LOCMEM_CACHES, ALLOWED_HOSTS=["testserver"]):
+        cache = get_cache()
+
+        def cold():
+            cache.clear()
+            clear_caches()
+
+        for size in sizes:
+            seed_catalog(size)
+            attacker, defender = UnitProfile.objects.all()[:2]
+            data = {
+                "attack-attacker_profile": attacker.pk,
+                "attack-defender_profile": defender.pk,
+                "attack-attack_type": "ranged",
+                "attack-hit_target_number": 7,
+                "attack-extra_hit_dice_mod": 3,
+                "attack-hit_roll_mod": 0,
+                "attack-injury_dice_mod": 0,
+                "attack-injury_roll_mod": 2,
+                "attack-extra_target_armor": 0,
+            }
+            results[f"view.calculator_get[catalog={size},cold]"] = time_call(lambda: client.get(url), repeat, cold)
+            results[f"view.calculator_get[catalog={size},warm]"] = time_call(lambda: client.get(url), repeat)
+            results[f"view.calculator_post[catalog={size},cold]"] = time_call(
+                lambda: client.post(url, data), repeat, cold
+            )
+            results[f"view.calculator_post[catalog={size},warm]"] = time_call(lambda: client.post(url, data), repeat)
+    return results
+
+
+def run_benchmarks(include_views: bool = True, sizes: Iterable[int] = CATALOG_SIZES, repeat: int = 5) -> dict:
+    results = logic_benchmarks(repeat)
+    if include_views:
+        results.update(view_benchmarks(sizes, repeat))
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "machine": platform.machine(),
+            "dice": {"sides": DICE_SIDES, "keep": KEEP_DICES, "crit": CRIT_RESULT},
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> List[Tuple[str, float, float, float]]:
+    """Benchmarks that got slower by more than ``threshold`` (0.2 = 20%).
+
+    Returns ``(name, baseline seconds, current seconds, ratio)`` tuples,
+    worst first.  Benchmarks missing from either run are ignored.
+    """
+    regressions = []
+    for name, seconds in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = seconds / before
+        if ratio > 1 + threshold:
+            regressions.append((name, before, seconds, ratio))
+    return sorted(regressions, key=lambda row: row[3], reverse=True)
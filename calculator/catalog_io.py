@@ -0,0 +1,256 @@
+"""Bulk import and export of the keyword, weapon and profile catalog.
+
+A catalog file holds one record per row, as CSV or JSON Lines.  Each
+record has a ``kind`` (keyword, weapon or profile), the model's fields and,
+for weapons and profiles, the names of their ``keywords`` and ``weapons``.
+In CSV the name lists are joined with ``|``.  Exports write keywords, then
+weapons, then profiles.
+
+Imports stream the file and upsert rows by name in chunks through
+``bulk_create``.  A record describes the whole row, so omitted fields go
+back to their defaults.  A weapon or profile record that lists links
+replaces that row's links; one without the column or key keeps them.  All
+links are written at the end as bulk through-table inserts, since a link
+may name a row further down the file.  Everything runs in one
+transaction, and bulk writes skip the model signals, so the import
+refreshes keyword totals and bumps the cache versions itself.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import Keyword, UnitProfile, Weapon
+from .result_cache import bump_versions
+
+MODELS = {"keyword": Keyword, "weapon": Weapon, "profile": UnitProfile}
+FIELDS = {
+    "keyword": ("name", "ranged_dice_mod", "melee_dice_mod", "armor_mod"),
+    "weapon": ("name", "weapon_type", "range_type", "range_inches"),
+    "profile": ("name", "ranged_dice_mod", "melee_dice_mod", "armor"),
+}
+# Link field -> kind it points at, per owner kind.
+LINKS = {
+    "weapon": {"keywords": "keyword"},
+    "profile": {"keywords": "keyword", "weapons": "weapon"},
+}
+CSV_COLUMNS = [
+    "kind",
+    "name",
+    "ranged_dice_mod",
+    "melee_dice_mod",
+    "armor_mod",
+    "armor",
+    "weapon_type",
+    "range_type",
+    "range_inches",
+    "keywords",
+    "weapons",
+]
+LIST_SEPARATOR = "|"
+CHUNK_SIZE = 1000
+MAX_ERRORS = 20
+
+
+class CatalogImportError(ValueError):
+    """The file had invalid rows; nothing was imported."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _read_records(lines: Iterable[str], input_format: str) -> Iterator[Tuple[int, object]]:
+    """(line number, record) pairs, one row at a time."""
+    if input_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if name}
+        return
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+
+
+def _parse_record(record) -> Tuple[str, Dict[str, object], Dict[str, List[str]]]:
+    """(kind, field values, link names) for one record; raises ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object.")
+    kind = record.get("kind")
+    if kind not in MODELS:
+        raise ValueError(f"kind must be one of: {', '.join(MODELS)}.")
+
+    model = MODELS[kind]
+    values = {}
+    for name in FIELDS[kind]:
+        raw = record.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw in (None, ""):
+            if name == "name":
+                raise ValueError("name is required.")
+            continue
+        try:
+            values[name] = model._meta.get_field(name).clean(raw, None)
+        except ValidationError as exc:
+            raise ValueError(f"{name}: {' '.join(exc.messages)}") from None
+
+    links = {}
+    for name in LINKS.get(kind, {}):
+        if name not in record:
+            continue
+        raw = record[name]
+        names = raw.split(LIST_SEPARATOR) if isinstance(raw, str) else raw
+        if names is None:
+            names = []
+        if not isinstance(names, list) or not all(isinstance(item, str) for item in names):
+            raise ValueError(f"{name} must be a list of names.")
+        links[name] = [item.strip() for item in names if item.strip()]
+    return kind, values, links
+
+
+def _upsert(kind: str, rows: Dict[str, object]) -> None:
+    MODELS[kind].objects.bulk_create(
+        rows.values(),
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=[name for name in FIELDS[kind] if name != "name"],
+    )
+
+
+def _write_links(links: Dict[Tuple[str, str], Dict[str, Tuple[int, List[str]]]], names, chunk_size: int):
+    """Replace the listed owners' links; returns (links written, errors).
+
+    ``names`` maps each kind to its {name: pk}.
+    """
+    written = 0
+    errors = []
+    for (kind, field_name), owners in links.items():
+        target_kind = LINKS[kind][field_name]
+        field = MODELS[kind]._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = f"{field.m2m_field_name()}_id"
+        target = f"{field.m2m_reverse_field_name()}_id"
+
+        rows = []
+        for owner, (line, targets) in owners.items():
+            for name in dict.fromkeys(targets):
+                if name not in names[target_kind]:
+                    errors.append(f"Line {line}: no {target_kind} named {name!r}.")
+                    continue
+                rows.append(through(**{source: names[kind][owner], target: names[target_kind][name]}))
+        if errors:
+            continue
+
+        owner_pks = [names[kind][owner] for owner in owners]
+        for start in range(0, len(owner_pks), chunk_size):
+            through.objects.filter(**{f"{source}__in": owner_pks[start:start + chunk_size]}).delete()
+        through.objects.bulk_create(rows, batch_size=chunk_size)
+        written += len(rows)
+    return written, errors[:MAX_ERRORS]
+
+
+def import_catalog(lines: Iterable[str], input_format: str = "csv", chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+    """Upsert every record in ``lines``; returns row counts by kind plus ``links``.
+
+    Raises CatalogImportError, with nothing written, when any row is invalid.
+    """
+    counts = Counter({kind: 0 for kind in MODELS})
+    pending = {kind: {} for kind in MODELS}
+    # (owner kind, link field) -> owner name -> (line, target names)
+    links = {(kind, name): {} for kind, fields in LINKS.items() for name in fields}
+    errors = []
+
+    with transaction.atomic():
+        for line, record in _read_records(lines, input_format):
+            try:
+                kind, values, record_links = _parse_record(record)
+            except ValueError as exc:
+                errors.append(f"Line {line}: {exc}")
+                if len(errors) >= MAX_ERRORS:
+                    break
+                continue
+            # A later row for the same name wins, within a chunk and across chunks.
+            pending[kind][values["name"]] = MODELS[kind](**values)
+            for name, targets in record_links.items():
+                links[(kind, name)][values["name"]] = (line, targets)
+            if len(pending[kind]) >= chunk_size and not errors:
+                _upsert(kind, pending[kind])
+                counts[kind] += len(pending[kind])
+                pending[kind] = {}
+        if errors:
+            raise CatalogImportError(errors)
+
+        for kind, rows in pending.items():
+            if rows:
+                _upsert(kind, rows)
+                counts[kind] += len(rows)
+        names = {kind: dict(model.objects.values_list("name", "pk")) for kind, model in MODELS.items()}
+        counts["links"], errors = _write_links(links, names, chunk_size)
+        if errors:
+            raise CatalogImportError(errors)
+
+        for kind in LINKS:
+            if counts["keyword"]:
+                # Changed keyword modifiers reach every row that links them.
+                MODELS[kind].refresh_keyword_totals()
+            elif links[(kind, "keywords")]:
+                MODELS[kind].refresh_keyword_totals([names[kind][owner] for owner in links[(kind, "keywords")]])
+        bump_versions([model._meta.model_name for model in MODELS.values()])
+    return dict(counts)
+
+
+def iter_catalog(chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Every catalog row as an import record, keywords first, a chunk of rows per query."""
+    names = Keyword.objects.only("name")
+    for keyword in Keyword.objects.iterator(chunk_size=chunk_size):
+        yield {"kind": "keyword", **{name: getattr(keyword, name) for name in FIELDS["keyword"]}}
+    for weapon in Weapon.objects.prefetch_related(Prefetch("keywords", names)).iterator(chunk_size=chunk_size):
+        record = {"kind": "weapon", **{name: getattr(weapon, name) for name in FIELDS["weapon"]}}
+        record["keywords"] = [keyword.name for keyword in weapon.keywords.all()]
+        yield record
+    profiles = UnitProfile.objects.prefetch_related(
+        Prefetch("keywords", names), Prefetch("weapons", Weapon.objects.only("name"))
+    )
+    for profile in profiles.iterator(chunk_size=chunk_size):
+        record = {"kind": "profile", **{name: getattr(profile, name) for name in FIELDS["profile"]}}
+        record["keywords"] = [keyword.name for keyword in profile.keywords.all()]
+        record["weapons"] = [weapon.name for weapon in profile.weapons.all()]
+        yield record
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_echo_writer():
+    """A csv.writer whose writerow returns the formatted line, for streaming responses."""
+    return csv.writer(_Echo())
+
+
+def export_lines(output_format: str = "csv", chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """The catalog serialized one line at a time."""
+    if output_format == "csv":
+        writer = csv_echo_writer()
+        yield writer.writerow(CSV_COLUMNS)
+        for record in iter_catalog(chunk_size):
+            yield writer.writerow(
+                [
+                    LIST_SEPARATOR.join(value) if isinstance(value, list) else "" if value is None else value
+                    for value in (record.get(column) for column in CSV_COLUMNS)
+                ]
+            )
+        return
+    for record in iter_catalog(chunk_size):
+        yield json.dumps(record) + "\n"
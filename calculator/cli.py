@@ -0,0 +1,283 @@
+"""Evaluate scenario files from the command line.
+
+    python -m calculator.cli scenarios.csv > results.csv
+    zcat scenarios.jsonl.gz | python -m calculator.cli - --workers 8 > results.jsonl
+
+Each input row is either resolved AttackInput fields (``hit_target_number``,
+``hit_dice_mod``, ...) or, as in the scenario API, ``attacker_profile``,
+``defender_profile`` and optional ``weapon`` IDs plus the calculator's
+situational modifiers.  Rows are read one line at a time, evaluated a chunk
+at a time (optionally in a process pool) and written in input order as each
+chunk finishes, so memory stays flat however long the input is.
+
+Only the standard library and calculator.logic are imported up front.
+Django is set up on the first profile row, and NumPy is imported with
+``--numpy``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .logic import (
+    CACHE_SIZE,
+    DEFAULT_INJURY_BANDS,
+    MAX_DICE_MOD,
+    MAX_ROLL_MOD,
+    AttackInput,
+    lookup_outcome_probabilities,
+)
+
+ATTACK_FIELDS = (
+    "hit_target_number",
+    "hit_dice_mod",
+    "hit_roll_mod",
+    "weapon_is_critical",
+    "injury_dice_mod",
+    "injury_roll_mod",
+    "target_armor",
+)
+LABELS = ["Miss"] + [band.label for band in DEFAULT_INJURY_BANDS]
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+# (error message, attack) per input row; exactly one of the two is set.
+Entry = Tuple[Optional[str], Optional[AttackInput]]
+
+
+# Every attack here uses DEFAULT_INJURY_BANDS, so the plain fields identify it.
+_key = attrgetter(*ATTACK_FIELDS)
+
+
+def _read_rows(stream, input_format: str) -> Iterator[dict]:
+    if input_format == "csv":
+        for row in csv.DictReader(stream):
+            yield {name: value for name, value in row.items() if name and value not in ("", None)}
+        return
+    for line in stream:
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {"__error__": "Line is not a JSON object."}
+
+
+def _sniff_format(stream) -> Tuple[str, Iterable[str]]:
+    first = stream.readline()
+    return ("jsonl" if first.lstrip().startswith("{") else "csv"), itertools.chain([first], stream)
+
+
+def _parse_attack(row: dict) -> AttackInput:
+    """AttackInput from resolved fields, with the same rules as ResolvedAttackForm."""
+    unknown = set(row) - set(ATTACK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    if "hit_target_number" not in row:
+        raise ValueError("hit_target_number is required.")
+    values = {}
+    for name in ATTACK_FIELDS:
+        if name not in row:
+            continue
+        value = row[name]
+        if name == "weapon_is_critical":
+            values[name] = value if isinstance(value, bool) else str(value).strip().lower() in TRUE_VALUES
+        else:
+            try:
+                values[name] = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be an integer.") from None
+    if values["hit_target_number"] < 2:
+        raise ValueError("hit_target_number must be at least 2.")
+    for name, limit in (
+        ("hit_dice_mod", MAX_DICE_MOD),
+        ("hit_roll_mod", MAX_ROLL_MOD),
+        ("injury_dice_mod", MAX_DICE_MOD),
+        ("injury_roll_mod", MAX_ROLL_MOD),
+        ("target_armor", MAX_ROLL_MOD),
+    ):
+        if abs(values.get(name, 0)) > limit:
+            raise ValueError(f"{name} must be between -{limit} and {limit}.")
+    return AttackInput(injury_bands=DEFAULT_INJURY_BANDS, **values)
+
+
+def _setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "trenchcalc.settings")
+    import django
+
+    django.setup()
+
+
+def _resolve_profile_rows(rows: List[dict]) -> List[Entry]:
+    """Resolve profile rows through the API's forms, in a fixed number of queries."""
+    from django.apps import apps
+
+    if not apps.ready:
+        _setup_django()
+    from .forms import ProfileScenarioForm
+    from .views import _load_catalog, _scenario_attack
+
+    forms = [ProfileScenarioForm(row) for row in rows]
+    catalog = _load_catalog(forms)
+    entries = []
+    for form in forms:
+        if not form.is_valid():
+            entries.append((json.dumps(form.errors), None))
+            continue
+        attack, errors = _scenario_attack(form, catalog)
+        entries.append((json.dumps(errors), None) if errors else (None, attack))
+    return entries
+
+
+def _resolve_chunk(rows: List[dict]) -> List[Entry]:
+    entries: List[Optional[Entry]] = [None] * len(rows)
+    profile_rows = []
+    for index, row in enumerate(rows):
+        if "__error__" in row:
+            entries[index] = (row["__error__"], None)
+        elif "injury_band_set" in row:
+            # Output columns are fixed to the standard bands.
+            entries[index] = ("injury_band_set is not supported; results use the standard injury bands.", None)
+        elif "attacker_profile" in row:
+            profile_rows.append(index)
+        else:
+            try:
+                entries[index] = (None, _parse_attack(row))
+            except ValueError as exc:
+                entries[index] = (str(exc), None)
+    if profile_rows:
+        resolved = _resolve_profile_rows([rows[index] for index in profile_rows])
+        for index, entry in zip(profile_rows, resolved):
+            entries[index] = entry
+    return entries
+
+
+@lru_cache(maxsize=CACHE_SIZE * 16)
+def _outcome_row(key: tuple) -> List[float]:
+    # Bounded, so repeated scenarios are cheap without memory growing with the input.
+    outcome = lookup_outcome_probabilities(
+        AttackInput(injury_bands=DEFAULT_INJURY_BANDS, **dict(zip(ATTACK_FIELDS, key)))
+    )
+    return [outcome.get(label, 0.0) for label in LABELS]
+
+
+def evaluate_attacks(attacks: List[AttackInput], use_numpy: bool = False) -> List[List[float]]:
+    """Outcome rows (columns follow LABELS) for a chunk of attacks."""
+    if use_numpy:
+        from .batch import attack_inputs_to_array, attack_outcome_batch
+
+        return attack_outcome_batch(attack_inputs_to_array(attacks)).tolist()
+    return [_outcome_row(_key(attack)) for attack in attacks]
+
+
+def _evaluate_chunks(chunks: Iterable[List[Entry]], workers: int, use_numpy: bool):
+    """Yield (entries, outcome rows by attack key) per chunk, in input order.
+
+    With a pool, at most two chunks per worker are in flight, so a fast
+    reader never runs far ahead of the writer.
+    """
+
+    def submit(entries, run):
+        unique = {}
+        for _, attack in entries:
+            if attack is not None:
+                unique.setdefault(_key(attack), attack)
+        return entries, list(unique), run(evaluate_attacks, list(unique.values()), use_numpy)
+
+    if workers <= 1:
+        for entries in chunks:
+            entries, keys, rows = submit(entries, lambda func, *args: func(*args))
+            yield entries, dict(zip(keys, rows))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for entries in chunks:
+            window.append(submit(entries, pool.submit))
+            if len(window) >= workers * 2:
+                entries, keys, future = window.popleft()
+                yield entries, dict(zip(keys, future.result()))
+        while window:
+            entries, keys, future = window.popleft()
+            yield entries, dict(zip(keys, future.result()))
+
+
+def _write_csv(out, entries: List[Entry], outcomes: Dict[tuple, List[float]]):
+    writer = csv.writer(out)
+    for error, attack in entries:
+        if error:
+            writer.writerow([""] * (len(ATTACK_FIELDS) + len(LABELS)) + [error])
+        else:
+            key = _key(attack)
+            writer.writerow(list(key) + outcomes[key] + [""])
+
+
+def _write_jsonl(out, entries: List[Entry], outcomes: Dict[tuple, List[float]]):
+    for error, attack in entries:
+        if error:
+            record = {"errors": error}
+        else:
+            record = {
+                "attack": dict(zip(ATTACK_FIELDS, _key(attack))),
+                "outcome": dict(zip(LABELS, outcomes[_key(attack)])),
+            }
+        out.write(json.dumps(record) + "\n")
+
+
+def run(stream, out, input_format=None, output_format=None, chunk_size=1000, workers=1, use_numpy=False):
+    """Evaluate every scenario in ``stream`` and write results to ``out``."""
+    if input_format is None:
+        input_format, stream = _sniff_format(stream)
+    output_format = output_format or input_format
+    rows = _read_rows(stream, input_format)
+    chunks = (_resolve_chunk(chunk) for chunk in iter(lambda: list(itertools.islice(rows, chunk_size)), []))
+
+    write = _write_csv if output_format == "csv" else _write_jsonl
+    if output_format == "csv":
+        csv.writer(out).writerow(list(ATTACK_FIELDS) + LABELS + ["error"])
+    for entries, outcomes in _evaluate_chunks(chunks, workers, use_numpy):
+        write(out, entries, outcomes)
+        out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m calculator.cli", description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="CSV or JSONL scenario file, or - for stdin.")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from the file).")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="Default: same as the input.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows evaluated per task.")
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size; 1 evaluates in-process.")
+    parser.add_argument("--numpy", action="store_true", help="Evaluate chunks with calculator.batch.")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1 or args.workers < 1:
+        parser.error("--chunk-size and --workers must be positive.")
+
+    input_format = args.format
+    if input_format is None and args.input != "-":
+        input_format = "jsonl" if args.input.endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    try:
+        run(stream, sys.stdout, input_format, args.output_format, args.chunk_size, args.workers, args.numpy)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
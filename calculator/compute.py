@@ -0,0 +1,120 @@
+"""Bounded process pool for CPU-bound outcome enumeration.
+
+The async views hand cache and table misses to this pool so the event loop
+keeps serving light requests while a heavy attack is enumerated.  The pool
+is created lazily per process and sized by CALCULATOR_COMPUTE_WORKERS.  At
+most CALCULATOR_COMPUTE_MAX_PENDING tasks may be queued or running at once;
+beyond that ``run_compute`` raises ComputeBusy straight away rather than
+queueing.  Each call waits at most CALCULATOR_COMPUTE_TIMEOUT seconds.  A
+task that has already started is not interrupted when its caller times out,
+so it keeps its pending slot until it finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+from django.conf import settings
+
+from .logic import AttackInput, lookup_outcome_probabilities, success_probability
+
+
+class ComputeBusy(Exception):
+    """The pool already has CALCULATOR_COMPUTE_MAX_PENDING tasks in flight."""
+
+
+class ComputeTimeout(Exception):
+    """A pooled task did not finish within the request's timeout."""
+
+
+_executor = None
+_pending = 0
+_lock = threading.Lock()
+
+
+def pool_workers() -> int:
+    return getattr(settings, "CALCULATOR_COMPUTE_WORKERS", None) or os.cpu_count() or 1
+
+
+def max_pending() -> int:
+    configured = getattr(settings, "CALCULATOR_COMPUTE_MAX_PENDING", None)
+    return pool_workers() * 4 if configured is None else configured
+
+
+def compute_timeout() -> float:
+    return getattr(settings, "CALCULATOR_COMPUTE_TIMEOUT", 10.0)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=pool_workers())
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pending_tasks() -> int:
+    return _pending
+
+
+def _release(_future) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+async def run_compute(func, *args, timeout: float | None = None):
+    """Run ``func(*args)`` in the pool without blocking the event loop.
+
+    ``func`` and its arguments must be picklable.  Raises ComputeBusy when
+    the pool is saturated and ComputeTimeout when the result takes longer
+    than ``timeout`` (default CALCULATOR_COMPUTE_TIMEOUT) seconds.
+    """
+    global _pending
+    with _lock:
+        if _pending >= max_pending():
+            raise ComputeBusy()
+        _pending += 1
+    try:
+        future = get_executor().submit(func, *args)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future), compute_timeout() if timeout is None else timeout
+        )
+    except asyncio.TimeoutError:
+        future.cancel()
+        raise ComputeTimeout() from None
+
+
+# Task functions run in the worker processes, so they stay module-level.
+
+
+def attack_outcomes(attacks: Sequence[AttackInput]) -> List[Dict[str, float]]:
+    return [lookup_outcome_probabilities(attack) for attack in attacks]
+
+
+def attack_result(attack: AttackInput) -> Tuple[Dict[str, float], float]:
+    """Outcome and plain hit chance for one attack, together in one task."""
+    hit_prob = success_probability(
+        target_number=attack.hit_target_number,
+        dice_mod=attack.hit_dice_mod,
+        roll_mod=attack.hit_roll_mod,
+    )
+    return lookup_outcome_probabilities(attack), hit_prob
@@ -1,6 +1,11 @@
+import re
+
 from django import forms
+from django.urls import reverse
 
-from .models import Keyword, UnitProfile, Weapon
+from .logic import DEFAULT_INJURY_BANDS, MAX_DICE_MOD, MAX_ROLL_MOD
+from .models import InjuryBandSet, Keyword, UnitProfile, Weapon
+from .solver import HIT_OUTCOME
 
 ATTACK_TYPE_CHOICES = (
     ("ranged", "Ranged"),
@@ -8,18 +13,57 @@ ATTACK_TYPE_CHOICES = (
 )
 
 
+class PreloadedChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.objects is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.objects:
+            yield self.choice(obj)
+
+    def __len__(self):
+        if self.field.objects is None:
+            return super().__len__()
+        return len(self.field.objects) + (1 if self.field.empty_label is not None else 0)
+
+
+class PreloadedModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField that can render and validate from an already-loaded list.
+
+    Assign ``objects`` to skip the per-widget and per-lookup queries a plain
+    ModelChoiceField runs; with ``objects`` left as None it behaves normally.
+    """
+
+    iterator = PreloadedChoiceIterator
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.objects = None
+
+    def to_python(self, value):
+        if self.objects is None or value in self.empty_values:
+            return super().to_python(value)
+        key = self.to_field_name or "pk"
+        for obj in self.objects:
+            if str(getattr(obj, key)) == str(value):
+                return obj
+        raise forms.ValidationError(self.error_messages["invalid_choice"], code="invalid_choice")
+
+
 class AttackInputForm(forms.Form):
-    attacker_profile = forms.ModelChoiceField(
+    attacker_profile = PreloadedModelChoiceField(
         label="Attacker profile",
         queryset=UnitProfile.objects.none(),
         empty_label=None,
     )
-    weapon = forms.ModelChoiceField(
+    weapon = PreloadedModelChoiceField(
         label="Weapon (optional)",
         queryset=Weapon.objects.none(),
         required=False,
     )
-    defender_profile = forms.ModelChoiceField(
+    defender_profile = PreloadedModelChoiceField(
         label="Target profile",
         queryset=UnitProfile.objects.none(),
         empty_label=None,
@@ -27,43 +71,292 @@ class AttackInputForm(forms.Form):
     attack_type = forms.ChoiceField(label="Attack type", choices=ATTACK_TYPE_CHOICES, initial="ranged")
 
     hit_target_number = forms.IntegerField(label="Hit target number (TN)", min_value=2, initial=7)
-    extra_hit_dice_mod = forms.IntegerField(label="Additional hit dice modifier (+/-d6)", initial=0)
-    hit_roll_mod = forms.IntegerField(label="Hit roll modifier", initial=0)
-    injury_dice_mod = forms.IntegerField(label="Injury dice modifier (+/-d6)", initial=0)
-    injury_roll_mod = forms.IntegerField(label="Injury roll modifier", initial=2)
-    extra_target_armor = forms.IntegerField(label="Additional armor modifier", initial=0)
+    extra_hit_dice_mod = forms.IntegerField(
+        label="Additional hit dice modifier (+/-d6)", min_value=-MAX_DICE_MOD, max_value=MAX_DICE_MOD, initial=0
+    )
+    hit_roll_mod = forms.IntegerField(
+        label="Hit roll modifier", min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=0
+    )
+    injury_dice_mod = forms.IntegerField(
+        label="Injury dice modifier (+/-d6)", min_value=-MAX_DICE_MOD, max_value=MAX_DICE_MOD, initial=0
+    )
+    injury_roll_mod = forms.IntegerField(
+        label="Injury roll modifier", min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=2
+    )
+    extra_target_armor = forms.IntegerField(
+        label="Additional armor modifier", min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=0
+    )
     weapon_is_critical = forms.BooleanField(
         label="Critical weapon (+2d injury on crit instead of +1d)",
         required=False,
         initial=False,
     )
+    injury_band_set = PreloadedModelChoiceField(
+        label="Injury table",
+        queryset=InjuryBandSet.objects.none(),
+        required=False,
+        empty_label="Standard (2-6 Flesh Wound, 7-8 Down, 9+ Out of Action)",
+    )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, profiles=None, weapons=None, band_sets=None, **kwargs):
+        """``profiles``/``weapons``/``band_sets`` are optional preloaded choice lists shared with the caller."""
         super().__init__(*args, **kwargs)
         qs = UnitProfile.objects.all()
         self.fields["attacker_profile"].queryset = qs
         self.fields["defender_profile"].queryset = qs
         self.fields["weapon"].queryset = Weapon.objects.all()
-        if not self.is_bound and qs.exists():
-            first = qs.first()
+        self.fields["injury_band_set"].queryset = InjuryBandSet.objects.all()
+        if profiles is not None:
+            self.fields["attacker_profile"].objects = profiles
+            self.fields["defender_profile"].objects = profiles
+        if weapons is not None:
+            self.fields["weapon"].objects = weapons
+        if band_sets is not None:
+            self.fields["injury_band_set"].objects = band_sets
+
+        if self.is_bound:
+            return
+        if profiles is not None:
+            first = profiles[0] if profiles else None
+        else:
+            first = qs.first() if qs.exists() else None
+        if first is not None:
             self.initial.setdefault("attacker_profile", first)
             self.initial.setdefault("defender_profile", first)
 
 
+class InitialDefaultsMixin:
+    """Make fields with an ``initial`` optional and fill omitted values from it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            if field.initial is not None:
+                field.required = False
+
+    def clean(self):
+        cleaned = super().clean()
+        for name, field in self.fields.items():
+            if cleaned.get(name) in (None, "") and field.initial is not None:
+                cleaned[name] = field.initial
+        return cleaned
+
+
+class ResolvedAttackForm(InitialDefaultsMixin, forms.Form):
+    """An API scenario given directly as AttackInput fields."""
+
+    hit_target_number = forms.IntegerField(min_value=2)
+    hit_dice_mod = forms.IntegerField(min_value=-MAX_DICE_MOD, max_value=MAX_DICE_MOD, initial=0)
+    hit_roll_mod = forms.IntegerField(min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=0)
+    weapon_is_critical = forms.BooleanField(required=False, initial=False)
+    injury_dice_mod = forms.IntegerField(min_value=-MAX_DICE_MOD, max_value=MAX_DICE_MOD, initial=0)
+    injury_roll_mod = forms.IntegerField(min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=0)
+    target_armor = forms.IntegerField(min_value=-MAX_ROLL_MOD, max_value=MAX_ROLL_MOD, initial=0)
+    injury_band_set = forms.IntegerField(label="Injury table ID", required=False)
+
+
+class ProfileScenarioForm(InitialDefaultsMixin, forms.Form):
+    """An API scenario given as profile/weapon IDs plus calculator modifiers."""
+
+    attacker_profile = forms.IntegerField(label="Attacker profile ID")
+    weapon = forms.IntegerField(label="Weapon ID", required=False)
+    defender_profile = forms.IntegerField(label="Target profile ID")
+    attack_type = AttackInputForm.base_fields["attack_type"]
+    hit_target_number = AttackInputForm.base_fields["hit_target_number"]
+    extra_hit_dice_mod = AttackInputForm.base_fields["extra_hit_dice_mod"]
+    hit_roll_mod = AttackInputForm.base_fields["hit_roll_mod"]
+    injury_dice_mod = AttackInputForm.base_fields["injury_dice_mod"]
+    injury_roll_mod = AttackInputForm.base_fields["injury_roll_mod"]
+    extra_target_armor = AttackInputForm.base_fields["extra_target_armor"]
+    weapon_is_critical = AttackInputForm.base_fields["weapon_is_critical"]
+    injury_band_set = forms.IntegerField(label="Injury table ID", required=False)
+
+
+SWEEP_AXIS_CHOICES = (
+    ("hit_target_number", "Hit target number (TN)"),
+    ("extra_hit_dice_mod", "Additional hit dice modifier"),
+    ("hit_roll_mod", "Hit roll modifier"),
+    ("injury_dice_mod", "Injury dice modifier"),
+    ("injury_roll_mod", "Injury roll modifier"),
+    ("extra_target_armor", "Additional armor modifier"),
+)
+SWEEP_FORMAT_CHOICES = (
+    ("json", "JSON"),
+    ("csv", "CSV"),
+)
+MAX_SWEEP_STEPS = 100
+
+
+class SweepForm(InitialDefaultsMixin, AttackInputForm):
+    """Fixed attack setup plus one or two axes to sweep across.
+
+    Situational modifiers fall back to their calculator defaults when omitted,
+    so a sweep request only has to name the profiles and the axes.
+    """
+
+    x_axis = forms.ChoiceField(label="Sweep axis", choices=SWEEP_AXIS_CHOICES)
+    x_start = forms.IntegerField(label="Sweep from")
+    x_stop = forms.IntegerField(label="Sweep to (inclusive)")
+    y_axis = forms.ChoiceField(
+        label="Second sweep axis",
+        choices=(("", "None"),) + SWEEP_AXIS_CHOICES,
+        required=False,
+    )
+    y_start = forms.IntegerField(label="Second axis from", required=False)
+    y_stop = forms.IntegerField(label="Second axis to (inclusive)", required=False)
+    output_format = forms.ChoiceField(label="Format", choices=SWEEP_FORMAT_CHOICES, required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        cleaned["output_format"] = cleaned.get("output_format") or "json"
+
+        axes = [("x", cleaned.get("x_axis"))]
+        if cleaned.get("y_axis"):
+            if cleaned["y_axis"] == cleaned.get("x_axis"):
+                self.add_error("y_axis", "Pick a different field for the second axis.")
+            axes.append(("y", cleaned["y_axis"]))
+
+        for prefix, axis in axes:
+            start, stop = cleaned.get(f"{prefix}_start"), cleaned.get(f"{prefix}_stop")
+            if start is None or stop is None:
+                self.add_error(f"{prefix}_start", "Both ends of the sweep range are required.")
+                continue
+            if stop < start:
+                self.add_error(f"{prefix}_stop", "Sweep range must not run backwards.")
+            elif stop - start + 1 > MAX_SWEEP_STEPS:
+                self.add_error(f"{prefix}_stop", f"Sweep at most {MAX_SWEEP_STEPS} values per axis.")
+            # Swept values bypass the field's own bounds, so check them here.
+            field = self.fields.get(axis)
+            low, high = getattr(field, "min_value", None), getattr(field, "max_value", None)
+            if low is not None and start < low:
+                self.add_error(f"{prefix}_start", f"{field.label} must be at least {low}.")
+            if high is not None and stop > high:
+                self.add_error(f"{prefix}_stop", f"{field.label} must be at most {high}.")
+        return cleaned
+
+
+SOLVE_FIELD_CHOICES = (
+    ("hit_target_number", "Hit target number (TN)"),
+    ("hit_dice_mod", "Hit dice modifier"),
+    ("hit_roll_mod", "Hit roll modifier"),
+    ("injury_dice_mod", "Injury dice modifier"),
+    ("injury_roll_mod", "Injury roll modifier"),
+    ("target_armor", "Target armor"),
+)
+SOLVE_COMPARISON_CHOICES = (
+    ("at_least", "At least"),
+    ("at_most", "At most"),
+)
+
+
+class SolveForm(InitialDefaultsMixin, AttackInputForm):
+    """Fixed attack setup plus the field to solve for and the probability to reach.
+
+    ``outcome`` is "Hit" or an injury band label, read as that band or worse.
+    """
+
+    solve_for = forms.ChoiceField(label="Solve for", choices=SOLVE_FIELD_CHOICES)
+    outcome = forms.CharField(label="Outcome", initial=HIT_OUTCOME)
+    target = forms.FloatField(label="Target probability", min_value=0, max_value=1)
+    comparison = forms.ChoiceField(label="Comparison", choices=SOLVE_COMPARISON_CHOICES, initial="at_least")
+
+
+MAX_LOADOUT_CANDIDATES = 500
+MAX_LOADOUT_KEYWORDS = 4
+
+
+class IdListField(forms.Field):
+    """A JSON array of object IDs."""
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if not isinstance(value, list) or not all(type(item) is int for item in value):
+            raise forms.ValidationError("Expected a list of IDs.")
+        if len(value) > MAX_LOADOUT_CANDIDATES:
+            raise forms.ValidationError(f"At most {MAX_LOADOUT_CANDIDATES} IDs.")
+        return value
+
+
+class WeightedIdListField(IdListField):
+    """Profile IDs, or ``{"profile": id, "weight": w}`` objects; cleans to (id, weight) pairs."""
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if not isinstance(value, list):
+            raise forms.ValidationError("Expected a list of profiles.")
+        pairs = [
+            (item.get("profile"), item.get("weight", 1)) if isinstance(item, dict) else (item, 1) for item in value
+        ]
+        super().to_python([pk for pk, _ in pairs])
+        if not all(type(weight) in (int, float) and weight > 0 for _, weight in pairs):
+            raise forms.ValidationError("Weights must be positive numbers.")
+        return [(pk, float(weight)) for pk, weight in pairs]
+
+
+class LoadoutForm(InitialDefaultsMixin, forms.Form):
+    """A loadout search: attacker, candidate pools, weighted defenders and the situation."""
+
+    attacker_profile = forms.IntegerField(label="Attacker profile ID")
+    weapons = IdListField(label="Candidate weapon IDs", required=False)
+    keywords = IdListField(label="Candidate keyword IDs", required=False)
+    defenders = WeightedIdListField(label="Defender profiles")
+    outcome = forms.CharField(label="Outcome", initial="Out of Action")
+    max_keywords = forms.IntegerField(
+        label="Keywords per loadout", min_value=0, max_value=MAX_LOADOUT_KEYWORDS, initial=2
+    )
+    attack_type = AttackInputForm.base_fields["attack_type"]
+    hit_target_number = AttackInputForm.base_fields["hit_target_number"]
+    extra_hit_dice_mod = AttackInputForm.base_fields["extra_hit_dice_mod"]
+    hit_roll_mod = AttackInputForm.base_fields["hit_roll_mod"]
+    injury_dice_mod = AttackInputForm.base_fields["injury_dice_mod"]
+    injury_roll_mod = AttackInputForm.base_fields["injury_roll_mod"]
+    extra_target_armor = AttackInputForm.base_fields["extra_target_armor"]
+    weapon_is_critical = AttackInputForm.base_fields["weapon_is_critical"]
+    injury_band_set = forms.IntegerField(label="Injury table ID", required=False)
+
+
+class SearchSelectMultiple(forms.SelectMultiple):
+    """A multi-select that renders only its selected options.
+
+    The rest load from the ``catalog_options`` endpoint as the user types
+    (see the script in base.html), so the page never lists the catalog.
+    """
+
+    def __init__(self, kind, attrs=None):
+        super().__init__({"size": 4, **(attrs or {})})
+        self.kind = kind
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-options-url"] = reverse("catalog_options", args=[self.kind])
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        selected = [item for item in value if str(item).isdigit()]
+        self.choices = [(row.pk, str(row)) for row in choices.queryset.filter(pk__in=selected)] if selected else []
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
 class UnitProfileForm(forms.ModelForm):
     keywords = forms.ModelMultipleChoiceField(
         label="Keywords",
         queryset=Keyword.objects.none(),
         required=False,
         help_text="Select any keywords that modify this profile.",
-        widget=forms.SelectMultiple(attrs={"size": 4}),
+        widget=SearchSelectMultiple("keywords"),
     )
     weapons = forms.ModelMultipleChoiceField(
         label="Weapons",
         queryset=Weapon.objects.none(),
         required=False,
         help_text="Assign weapons this profile can use.",
-        widget=forms.SelectMultiple(attrs={"size": 4}),
+        widget=SearchSelectMultiple("weapons"),
     )
 
     class Meta:
@@ -106,7 +399,7 @@ class WeaponForm(forms.ModelForm):
         label="Keywords",
         queryset=Keyword.objects.none(),
         required=False,
-        widget=forms.SelectMultiple(attrs={"size": 4}),
+        widget=SearchSelectMultiple("keywords"),
     )
 
     class Meta:
@@ -125,3 +418,56 @@ class WeaponForm(forms.ModelForm):
 
     def clean_name(self):
         return self.cleaned_data["name"].strip()
+
+
+BAND_LINE = re.compile(r"^\s*(-?\d+)\s*(?:(\+)|-\s*(-?\d+))?\s+(\S.*?)\s*$")
+
+
+def format_band_lines(bands):
+    lines = []
+    for band in bands:
+        if band["max_value"] is None:
+            bounds = f"{band['min_value']}+"
+        elif band["max_value"] == band["min_value"]:
+            bounds = str(band["min_value"])
+        else:
+            bounds = f"{band['min_value']}-{band['max_value']}"
+        lines.append(f"{bounds} {band['label']}")
+    return "\n".join(lines)
+
+
+class InjuryBandSetForm(forms.ModelForm):
+    bands = forms.CharField(
+        label="Bands",
+        widget=forms.Textarea(attrs={"rows": 5}),
+        help_text='One band per line, first match wins: "2-6 Flesh Wound", "9+ Out of Action" or "5 Stunned".',
+    )
+
+    class Meta:
+        model = InjuryBandSet
+        fields = ["name", "bands"]
+        labels = {"name": "Table name"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        bands = self.instance.bands if self.instance.pk else [
+            {"min_value": band.min_value, "max_value": band.max_value, "label": band.label}
+            for band in DEFAULT_INJURY_BANDS
+        ]
+        self.initial["bands"] = format_band_lines(bands)
+
+    def clean_name(self):
+        return self.cleaned_data["name"].strip()
+
+    def clean_bands(self):
+        bands = []
+        for number, line in enumerate(self.cleaned_data["bands"].splitlines(), start=1):
+            if not line.strip():
+                continue
+            match = BAND_LINE.match(line)
+            if match is None:
+                raise forms.ValidationError(f'Line {number}: expected "2-6 Label", "9+ Label" or "5 Label".')
+            low, open_ended, high, label = match.groups()
+            max_value = None if open_ended else int(high if high is not None else low)
+            bands.append({"min_value": int(low), "max_value": max_value, "label": label})
+        return bands
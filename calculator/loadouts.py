@@ -0,0 +1,188 @@
+"""Loadout optimizer: the weapon and extra keywords that do the most harm to a set of defenders.
+
+A loadout is one weapon from a candidate pool plus up to ``max_keywords``
+keywords from another, on top of an attacker's own profile.  A keyword only
+changes the attack through its dice modifier for the weapon's attack type,
+so loadouts collapse to (weapon group, extra hit dice): weapons that resolve
+to the same attacks share a group, keywords with equal modifiers are
+interchangeable, and each distinct AttackInput is evaluated once through a
+shared memo.
+
+The search is branch-and-bound over those modifier groups.  Any completion
+of a partial loadout lands in an interval of extra dice, and once every hit
+pool keeps its highest dice the score only grows with more of them, so the
+branch can do no better than its score at the top of the interval.  Penalty
+dice (and injury tables where "band or worse" is not monotone) have no such
+bound, so that part of the interval is checked value by value.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .logic import AttackInput
+from .matchups import default_situation
+from .models import Keyword, UnitProfile, Weapon
+from .resolution import attack_key, resolve_attack
+from .solver import HIT_OUTCOME, outcome_labels, outcome_probability, worse_is_upward_closed
+
+# Scores closer than this count as a tie; ties go to the loadout with fewer keywords.
+TOLERANCE = 1e-12
+
+
+@dataclass
+class Loadout:
+    weapon: Optional[Weapon]
+    equivalent_weapons: List[Weapon]  # the rest of the weapon's group
+    keywords: List[Keyword]
+    extra_hit_dice_mod: int
+    score: float  # weighted mean P(outcome or worse) over the defenders
+    defender_probabilities: List[float]  # in defender order
+
+
+@dataclass
+class LoadoutSearch:
+    best: Optional[Loadout]
+    loadouts: int  # weapon x keyword combinations in the pools
+    nodes_explored: int
+    attacks_evaluated: int
+
+
+class _Scorer:
+    """Weighted outcome probability of one weapon group by extra hit dice."""
+
+    def __init__(self, attacks: List[AttackInput], weights: Sequence[float], outcome: str, memo: Dict[tuple, float]):
+        self.attacks = attacks
+        self.weights = weights
+        self.outcome = outcome
+        self.memo = memo
+        self.scores: Dict[int, Tuple[float, List[float]]] = {}
+        # Extra dice from which the score can only grow: every hit pool keeps its
+        # highest dice from there on; hits alone always grow with more dice.
+        if outcome == HIT_OUTCOME:
+            self.monotone_from = float("-inf")
+        elif all(worse_is_upward_closed(attack, outcome) for attack in attacks):
+            self.monotone_from = -min(attack.hit_dice_mod for attack in attacks)
+        else:
+            self.monotone_from = float("inf")
+
+    def probabilities(self, extra: int) -> List[float]:
+        if extra not in self.scores:
+            self(extra)
+        return self.scores[extra][1]
+
+    def __call__(self, extra: int) -> float:
+        if extra not in self.scores:
+            probabilities = []
+            for attack in self.attacks:
+                attack = replace(attack, hit_dice_mod=attack.hit_dice_mod + extra)
+                key = attack_key(attack)
+                if key not in self.memo:
+                    self.memo[key] = outcome_probability(attack, self.outcome)
+                probabilities.append(self.memo[key])
+            score = sum(w * p for w, p in zip(self.weights, probabilities)) / sum(self.weights)
+            self.scores[extra] = (score, probabilities)
+        return self.scores[extra][0]
+
+    def bound(self, low: int, high: int) -> float:
+        """The best score any extra dice in [low, high] can reach."""
+        if low >= self.monotone_from:
+            return self(high)
+        best = max(self(extra) for extra in range(low, min(high, self.monotone_from - 1) + 1))
+        return max(best, self(high)) if high >= self.monotone_from else best
+
+
+def _reachable(groups: List[Tuple[int, int]], slots: int) -> Tuple[int, int]:
+    """Least and most extra dice from up to ``slots`` keywords out of (modifier, count) groups."""
+    modifiers = sorted(value for value, count in groups for _ in range(min(count, slots)))
+    low = sum(value for value in modifiers[:slots] if value < 0)
+    high = sum(value for value in modifiers[::-1][:slots] if value > 0)
+    return low, high
+
+
+def optimize_loadout(
+    attacker: UnitProfile,
+    weapons: Sequence[Weapon],
+    keywords: Sequence[Keyword],
+    defenders: Sequence[Tuple[UnitProfile, float]],
+    outcome: str = "Out of Action",
+    max_keywords: int = 2,
+    situation: Optional[Dict[str, object]] = None,
+) -> LoadoutSearch:
+    """Find the loadout with the best weighted chance of ``outcome`` or worse.
+
+    ``defenders`` pairs each profile with its weight.  Keywords the attacker
+    already has are skipped, and an empty weapon pool means the attacker's
+    default weapon, as in the calculator.  Needs the attacker's keywords and
+    weapons prefetched to stay off the database.
+    """
+    if not defenders:
+        raise ValueError("At least one defender is required.")
+    situation = {**default_situation(), **(situation or {})}
+    owned = {keyword.pk for keyword in attacker.keywords.all()}
+    keywords = [keyword for keyword in keywords if keyword.pk not in owned]
+    weights = [weight for _, weight in defenders]
+
+    groups: Dict[tuple, Tuple[str, List[Optional[Weapon]], List[AttackInput]]] = {}
+    for weapon in sorted(weapons, key=lambda weapon: weapon.name) or [None]:
+        resolved = [
+            resolve_attack(dict(situation, attacker_profile=attacker, weapon=weapon, defender_profile=defender))
+            for defender, _ in defenders
+        ]
+        attacks = [entry["attack"] for entry in resolved]
+        if outcome not in outcome_labels(attacks[0]):
+            raise ValueError(f"Unknown outcome {outcome!r}.")
+        attack_type = resolved[0]["attack_type"]
+        key = (attack_type, tuple(attack_key(attack) for attack in attacks))
+        groups.setdefault(key, (attack_type, [], attacks))[1].append(resolved[0]["weapon"])
+
+    memo: Dict[tuple, float] = {}
+    best: Optional[Loadout] = None
+    nodes = 0
+
+    for attack_type, group_weapons, attacks in groups.values():
+        scorer = _Scorer(attacks, weights, outcome, memo)
+        by_modifier: Dict[int, List[Keyword]] = defaultdict(list)
+        for keyword in sorted(keywords, key=lambda keyword: keyword.name):
+            modifier = keyword.ranged_dice_mod if attack_type == "ranged" else keyword.melee_dice_mod
+            if modifier:
+                by_modifier[modifier].append(keyword)
+        # Strongest modifier first, so good incumbents turn up early.
+        modifier_groups = sorted(((value, len(group)) for value, group in by_modifier.items()), reverse=True)
+
+        def search(index: int, slots: int, extra: int, taken: List[Tuple[int, int]]):
+            nonlocal best, nodes
+            nodes += 1
+            score = scorer(extra)
+            count = sum(take for _, take in taken)
+            if best is None or score > best.score + TOLERANCE or (
+                score >= best.score - TOLERANCE and count < len(best.keywords)
+            ):
+                best = Loadout(
+                    weapon=group_weapons[0],
+                    equivalent_weapons=group_weapons[1:],
+                    keywords=[keyword for value, take in taken for keyword in by_modifier[value][:take]],
+                    extra_hit_dice_mod=extra,
+                    score=score,
+                    defender_probabilities=scorer.probabilities(extra),
+                )
+            if index == len(modifier_groups) or not slots:
+                return
+            low, high = _reachable(modifier_groups[index:], slots)
+            if scorer.bound(extra + low, extra + high) <= best.score + TOLERANCE:
+                return
+            value, available = modifier_groups[index]
+            for take in range(min(available, slots), -1, -1):
+                search(index + 1, slots - take, extra + take * value, taken + [(value, take)] if take else taken)
+
+        search(0, max_keywords, 0, [])
+
+    return LoadoutSearch(
+        best=best,
+        loadouts=max(len(weapons), 1) * sum(comb(len(keywords), count) for count in range(max_keywords + 1)),
+        nodes_explored=nodes,
+        attacks_evaluated=len(memo),
+    )
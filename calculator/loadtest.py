@@ -0,0 +1,192 @@
+"""Concurrent read/write load test against a scratch copy of the configured SQLite database.
+
+Reader threads post scenarios to the calculator API and browse the catalog
+pages while writer threads edit keywords through the keyword page, all
+through the test client.  Each request opens, or with CONN_MAX_AGE reuses, its thread's
+connection the way a threaded server would, so running it under each
+settings module shows what the database profile is worth:
+
+    python manage.py load_test --output before.json
+    python manage.py load_test --settings trenchcalc.settings_production --compare before.json
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from .models import Keyword, UnitProfile
+from .testing import LOCMEM_CACHES, seed_catalog
+
+# Reported metrics and whether a higher value is better.
+METRICS = {
+    "reads_per_second": True,
+    "writes_per_second": True,
+    "read_p50_ms": False,
+    "read_p95_ms": False,
+    "write_p95_ms": False,
+    "read_errors": False,
+    "write_errors": False,
+}
+
+
+def _percentile_ms(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0] * 1000
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(fraction * 100) - 1] * 1000
+
+
+def _reader(client: Client, rng: random.Random, profiles: List[int]):
+    choice = rng.random()
+    if choice < 0.5:
+        scenarios = [
+            {
+                "attacker_profile": rng.choice(profiles),
+                "defender_profile": rng.choice(profiles),
+                "hit_target_number": rng.randint(4, 10),
+            }
+            for _ in range(4)
+        ]
+        return client.post(reverse("calculate_api"), json.dumps(scenarios), content_type="application/json")
+    if choice < 0.75:
+        return client.get(reverse("profile_list"), {"q": str(rng.randint(0, 9))})
+    return client.get(reverse("keyword_list"))
+
+
+def _writer(client: Client, rng: random.Random, keywords: List[dict]):
+    keyword = rng.choice(keywords)
+    return client.post(
+        reverse("keyword_list"),
+        {
+            "keyword_id": keyword["pk"],
+            "keyword-name": keyword["name"],
+            "keyword-ranged_dice_mod": rng.randint(0, 2),
+            "keyword-melee_dice_mod": rng.randint(0, 2),
+            "keyword-armor_mod": keyword["armor_mod"],
+        },
+    )
+
+
+def _run(readers: int, writers: int, seconds: float) -> Dict[str, float]:
+    profiles = list(UnitProfile.objects.values_list("pk", flat=True))
+    keywords = list(Keyword.objects.values("pk", "name", "armor_mod"))
+    latencies = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    deadline = []
+    barrier = threading.Barrier(readers + writers, action=lambda: deadline.append(time.perf_counter() + seconds))
+
+    def work(kind: str, seed: int):
+        client = Client()
+        rng = random.Random(seed)
+        samples, failed = [], 0
+        barrier.wait()
+        try:
+            while time.perf_counter() < deadline[0]:
+                started = time.perf_counter()
+                try:
+                    if kind == "read":
+                        response = _reader(client, rng, profiles)
+                    else:
+                        response = _writer(client, rng, keywords)
+                    ok = response.status_code in (200, 302)
+                except OperationalError:  # database is locked
+                    ok = False
+                if ok:
+                    samples.append(time.perf_counter() - started)
+                else:
+                    failed += 1
+        finally:
+            connections.close_all()
+        with lock:
+            latencies[kind] += samples
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=work, args=("read", seed)) for seed in range(readers)]
+    threads += [threading.Thread(target=work, args=("write", readers + seed)) for seed in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads_per_second": len(latencies["read"]) / seconds,
+        "writes_per_second": len(latencies["write"]) / seconds,
+        "read_p50_ms": _percentile_ms(latencies["read"], 0.5),
+        "read_p95_ms": _percentile_ms(latencies["read"], 0.95),
+        "write_p95_ms": _percentile_ms(latencies["write"], 0.95),
+        "read_errors": errors["read"],
+        "write_errors": errors["write"],
+    }
+
+
+def run_load_test(readers: int = 4, writers: int = 1, seconds: float = 5.0, size: int = 500) -> dict:
+    """Throughput and latency of ``readers`` and ``writers`` threads over ``seconds``.
+
+    The default database is pointed at a fresh file, migrated and seeded
+    with ``size`` catalog rows for the run, then restored; the configured
+    connection settings and CALCULATOR_SQLITE_PRAGMAS still apply.
+    """
+    connection = connections["default"]
+    if connection.vendor != "sqlite":
+        raise ValueError("The load test only runs against SQLite.")
+    settings_dict = connection.settings_dict
+    original_name = settings_dict["NAME"]
+
+    # One log line per request would drown the report.
+    timing_logger = logging.getLogger("calculator.timing")
+    with tempfile.TemporaryDirectory() as directory, override_settings(
+        CACHES=LOCMEM_CACHES, ALLOWED_HOSTS=["testserver"]
+    ):
+        timing_logger.disabled = True
+        connections.close_all()
+        settings_dict["NAME"] = os.path.join(directory, "load_test.sqlite3")
+        try:
+            call_command("migrate", verbosity=0, interactive=False)
+            seed_catalog(size)
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                journal_mode = cursor.fetchone()[0]
+            connections.close_all()
+            results = _run(readers, writers, seconds)
+        finally:
+            connections.close_all()
+            settings_dict["NAME"] = original_name
+            timing_logger.disabled = False
+
+    return {
+        "meta": {
+            "journal_mode": journal_mode,
+            "conn_max_age": settings_dict.get("CONN_MAX_AGE", 0),
+            "readers": readers,
+            "writers": writers,
+            "seconds": seconds,
+            "catalog_size": size,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, report: dict) -> List[tuple]:
+    """(metric, before, after, after / before) for every metric in both reports."""
+    rows = []
+    for name in METRICS:
+        before, after = baseline["results"].get(name), report["results"].get(name)
+        if before is not None and after is not None:
+            rows.append((name, before, after, after / before if before else float("inf") if after else 1.0))
+    return rows
@@ -1,14 +1,46 @@
 from __future__ import annotations
 
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
 from collections import Counter
 from dataclasses import dataclass
-from itertools import product
+from functools import lru_cache
+from itertools import accumulate
+from math import comb, prod
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from .timing import timed
+
 KEEP_DICES = 2
 DICE_SIDES = 6
 CRIT_RESULT = 12
 
+# Largest dice modifier, either sign, the forms and CLI accept; each step
+# is another die to enumerate.
+MAX_DICE_MOD = 20
+# Largest flat roll modifier or armor, either sign; beyond it every roll
+# already passes or fails.
+MAX_ROLL_MOD = 20
+
+# Largest injury band edge, either sign, a band set may use.  Every bounded
+# attack's totals fall well inside it, and compile_injury_bands indexes each
+# total between the edges.
+MAX_INJURY_BAND_VALUE = 100
+
+# Upper bound on entries kept by each memoized stage below.
+CACHE_SIZE = 256
+
+# Precomputed stage results from the warm-start artifact (see
+# load_warm_tables), as (offset, probabilities) pairs; consulted on a memo
+# miss before computing.
+_warm_dice_sums: Dict[Tuple[int, bool], Tuple[int, Tuple[float, ...]]] = {}
+_warm_hit_branches: Dict[int, Tuple[Tuple[int, Tuple[float, ...]], ...]] = {}
+
 
 @dataclass(frozen=True)
 class InjuryBand:
@@ -31,6 +63,141 @@ DEFAULT_INJURY_BANDS: List[InjuryBand] = [
 ]
 
 
+class Distribution:
+    """Probability mass over a run of consecutive integer totals.
+
+    ``probs[i]`` is P(X == offset + i), held in one contiguous array.  Running
+    sums from both ends and the first two moments are built in one pass, so
+    tail probabilities, interval masses, the mean and the variance are O(1),
+    and ``shifted`` applies a flat roll modifier by moving the offset while
+    sharing every buffer.  Distributions are shared by the memoized stages,
+    so treat them as read-only.  The total mass may be below 1 (a joint
+    distribution); mean and variance are then conditional on X existing.
+    """
+
+    __slots__ = ("offset", "probs", "_below", "_at_least", "_moments")
+
+    def __init__(self, offset: int, probs: array, _shared: Optional[tuple] = None):
+        self.offset = offset
+        self.probs = probs
+        if _shared is None:
+            # _below[i] = P(X < offset + i), _at_least[i] = P(X >= offset + i);
+            # _moments = (sum p, sum i * p, sum i * i * p) over positions i.
+            below = array("d", accumulate(probs, initial=0.0))
+            at_least = array("d", accumulate(reversed(probs), initial=0.0))
+            at_least.reverse()
+            first = second = 0.0
+            for position, p in enumerate(probs):
+                first += position * p
+                second += position * position * p
+            _shared = (below, at_least, (below[-1], first, second))
+        self._below, self._at_least, self._moments = _shared
+
+    @classmethod
+    def from_counts(cls, counts: Dict[int, int], total: int) -> "Distribution":
+        if not counts:
+            return cls(0, array("d"))
+        low, high = min(counts), max(counts)
+        return cls(low, array("d", (counts.get(value, 0) / total for value in range(low, high + 1))))
+
+    def __len__(self) -> int:
+        return len(self.probs)
+
+    def __iter__(self):
+        """(value, probability) pairs in ascending order."""
+        return zip(range(self.offset, self.offset + len(self.probs)), self.probs)
+
+    def __repr__(self) -> str:
+        return f"Distribution(offset={self.offset}, probs={self.probs.tolist()!r})"
+
+    def _position(self, value: int) -> int:
+        return min(max(value - self.offset, 0), len(self.probs))
+
+    def at_least(self, value: int) -> float:
+        return self._at_least[self._position(value)]
+
+    def below(self, value: int) -> float:
+        return self._below[self._position(value)]
+
+    def between(self, low: Optional[int], high: Optional[int]) -> float:
+        """P(low <= X <= high); None leaves that end open."""
+        start = 0 if low is None else self._position(low)
+        stop = len(self.probs) if high is None else self._position(high + 1)
+        if stop <= start:
+            return 0.0
+        # Difference the smaller pair of running sums, so a small interval in
+        # either tail keeps its relative precision.
+        if self._below[stop] <= self._at_least[start]:
+            return self._below[stop] - self._below[start]
+        return self._at_least[start] - self._at_least[stop]
+
+    def shifted(self, amount: int) -> "Distribution":
+        """The distribution of X + amount, without copying."""
+        if not amount:
+            return self
+        return Distribution(self.offset + amount, self.probs, (self._below, self._at_least, self._moments))
+
+    def to_dict(self) -> Dict[int, float]:
+        return dict(self)
+
+    def mass(self) -> float:
+        return self._moments[0]
+
+    def mean(self) -> Optional[float]:
+        mass, first, _ = self._moments
+        return self.offset + first / mass if mass else None
+
+    def variance(self) -> Optional[float]:
+        mass, first, second = self._moments
+        if not mass:
+            return None
+        return max(second / mass - (first / mass) ** 2, 0.0)
+
+    @classmethod
+    def mixture(cls, parts) -> "Distribution":
+        """The sum of ``weight * dist`` over (weight, dist) ``parts``, aligned by value."""
+        parts = [(weight, dist) for weight, dist in parts if weight and len(dist)]
+        if not parts:
+            return cls(0, array("d"))
+        low = min(dist.offset for _, dist in parts)
+        probs = array("d", bytes(8 * (max(dist.offset + len(dist) for _, dist in parts) - low)))
+        for weight, dist in parts:
+            start = dist.offset - low
+            for position, p in enumerate(dist.probs, start):
+                probs[position] += weight * p
+        return cls(low, probs)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _kept_sum_counts(num_dice: int) -> Counter:
+    """Count rolls of ``num_dice`` dice by (lowest kept sum, highest kept sum).
+
+    Instead of enumerating all ``DICE_SIDES ** num_dice`` rolls, walk the faces
+    in ascending order and choose how many dice show each face.  The number of
+    rolls sharing those face counts is a product of binomials, so the state
+    space (dice placed, lowest sum, highest dice seen) stays polynomial in
+    ``num_dice`` and the counts remain exact integers.
+    """
+    states = Counter({(0, 0, ()): 1})
+    for face in range(1, DICE_SIDES + 1):
+        next_states = Counter()
+        for (placed, low_sum, top), ways in states.items():
+            remaining = num_dice - placed
+            # Every die left over has to show the highest face.
+            counts = range(remaining, remaining + 1) if face == DICE_SIDES else range(remaining + 1)
+            for count in counts:
+                new_low = low_sum + face * min(count, max(0, KEEP_DICES - placed))
+                new_top = (top + (face,) * min(count, KEEP_DICES))[-KEEP_DICES:]
+                next_states[(placed + count, new_low, new_top)] += ways * comb(remaining, count)
+        states = next_states
+
+    counts = Counter()
+    for (_, low_sum, top), ways in states.items():
+        counts[(low_sum, sum(top))] += ways
+    return counts
+
+
+@timed("logic.dice_sum_distribution")
 def dice_sum_distribution(
     num_dice: int,
     keep_highest: bool = True,
@@ -38,56 +205,104 @@ def dice_sum_distribution(
     if num_dice <= 0:
         raise ValueError("num_dice must be >= 1")
 
-    counts = Counter()
-    total_outcomes = DICE_SIDES ** num_dice
+    return _dice_sum_distribution(num_dice, keep_highest).to_dict()
 
-    for rolls in product(range(1, DICE_SIDES + 1), repeat=num_dice):
-        srt = sorted(rolls)
-        kept = srt[-KEEP_DICES:] if keep_highest else srt[:KEEP_DICES]
-        counts[sum(kept)] += 1
 
-    return {total: count / total_outcomes for total, count in sorted(counts.items())}
+@lru_cache(maxsize=CACHE_SIZE)
+def _dice_sum_distribution(num_dice: int, keep_highest: bool) -> Distribution:
+    warm = _warm_dice_sums.get((num_dice, keep_highest))
+    if warm is not None:
+        return Distribution(warm[0], array("d", warm[1]))
+
+    counts = Counter()
+    for (low_sum, high_sum), ways in _kept_sum_counts(num_dice).items():
+        counts[high_sum if keep_highest else low_sum] += ways
+
+    return Distribution.from_counts(counts, DICE_SIDES ** num_dice)
 
 
+@timed("logic.success_probability")
 def success_probability(
     target_number: int,
     dice_mod: int = 0,
     roll_mod: int = 0,
 ) -> float:
-    dices_rolled = KEEP_DICES + abs(dice_mod)
-    keep_highest = dice_mod >= 0
-
-    dist = dice_sum_distribution(dices_rolled, keep_highest=keep_highest)
-
-    prob = 0.0
-    for value, p in dist.items():
-        if value + roll_mod >= target_number:
-            prob += p
-
-    return prob
+    dist = _dice_sum_distribution(KEEP_DICES + abs(dice_mod), dice_mod >= 0)
+    return dist.at_least(target_number - roll_mod)
 
 
+@timed("logic.injury_distribution")
 def injury_distribution(
     injury_bands: List[InjuryBand],
     dice_mod: int = 0,
     roll_mod: int = 0,
     target_armor: int = 0,
 ) -> Dict[str, float]:
-    num_rolled = KEEP_DICES + abs(dice_mod)
-    keep_highest = dice_mod >= 0
+    return dict(_injury_distribution(tuple(injury_bands), dice_mod, roll_mod - target_armor))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_injury_bands(injury_bands: Tuple[InjuryBand, ...]) -> Tuple[int, Tuple[int, ...]]:
+    """Dense injury total -> band index lookup for a band set.
+
+    Returns ``(start, index)``: total ``t`` falls in band
+    ``index[min(max(t - start, 0), len(index) - 1)]``, with -1 meaning no
+    band.  The index spans one below the lowest band to the last band edge;
+    every total beyond either end lands in the same band as that end, so
+    clamping is exact.  The first matching band wins, as with
+    InjuryBand.matches.  Memoized on the bands themselves, so an edited set
+    simply compiles to a new entry.
+    """
+    if not injury_bands:
+        raise ValueError("injury_bands must be provided.")
+    start = min(band.min_value for band in injury_bands) - 1
+    stop = max(
+        band.min_value if band.max_value is None else max(band.min_value, band.max_value + 1)
+        for band in injury_bands
+    )
+    index = tuple(
+        next((position for position, band in enumerate(injury_bands) if band.matches(total)), -1)
+        for total in range(start, stop + 1)
+    )
+    return start, index
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def injury_band_runs(injury_bands: Tuple[InjuryBand, ...]) -> Tuple[Tuple[int, Optional[int], Optional[int]], ...]:
+    """The compiled lookup as ``(band index, lowest total, highest total)`` runs.
+
+    Consecutive totals landing in the same band form one run; the first and
+    last runs are open-ended (None), matching the clamped lookup.  Totals in
+    no band are left out.
+    """
+    start, index = compile_injury_bands(injury_bands)
+    runs = []
+    run_start = 0
+    for position in range(1, len(index) + 1):
+        if position < len(index) and index[position] == index[run_start]:
+            continue
+        if index[run_start] >= 0:
+            low = None if run_start == 0 else start + run_start
+            high = None if position == len(index) else start + position - 1
+            runs.append((index[run_start], low, high))
+        run_start = position
+    return tuple(runs)
 
-    dist = dice_sum_distribution(num_rolled, keep_highest=keep_highest)
 
-    result: Dict[str, float] = {band.label: 0.0 for band in injury_bands}
+@lru_cache(maxsize=CACHE_SIZE)
+def _injury_distribution(
+    injury_bands: Tuple[InjuryBand, ...],
+    dice_mod: int,
+    net_mod: int,
+) -> Tuple[Tuple[str, float], ...]:
+    dist = _dice_sum_distribution(KEEP_DICES + abs(dice_mod), dice_mod >= 0).shifted(net_mod)
+    labels = [band.label for band in injury_bands]
 
-    for value, p in dist.items():
-        total = value + roll_mod - target_armor
-        for band in injury_bands:
-            if band.matches(total):
-                result[band.label] += p
-                break
+    result: Dict[str, float] = {label: 0.0 for label in labels}
+    for band, low, high in injury_band_runs(injury_bands):
+        result[labels[band]] += dist.between(low, high)
 
-    return result
+    return tuple(result.items())
 
 
 @dataclass
@@ -111,79 +326,418 @@ class AttackInput:
             raise ValueError("injury_bands must be provided.")
 
 
-def hit_branches(
+@timed("logic.hit_crit_branches")
+def hit_crit_branches(
     hit_dice_mod: int,
-) -> Dict[Tuple[int, int], float]:
+) -> Dict[Tuple[int, bool], float]:
+    """P(kept sum, critical) for a hit roll, skipping impossible pairs.
+
+    Formerly ``hit_branches``, keyed by (kept sum, highest-two sum); only
+    whether the highest two make CRIT_RESULT matters to the engine.
+    """
+    plain, crit = _hit_branches(hit_dice_mod)
+    return {
+        (kept_sum, critical): p
+        for critical, dist in ((False, plain), (True, crit))
+        for kept_sum, p in dist
+        if p
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _hit_branches(hit_dice_mod: int) -> Tuple[Distribution, Distribution]:
+    """Kept-sum mass of non-critical and critical hit rolls, as two distributions."""
+    warm = _warm_hit_branches.get(hit_dice_mod)
+    if warm is not None:
+        return tuple(Distribution(offset, array("d", probs)) for offset, probs in warm)
+
     num_rolled = KEEP_DICES + abs(hit_dice_mod)
-    total_outcomes = DICE_SIDES ** num_rolled
-    counts = Counter()
+    plain, crit = Counter(), Counter()
 
-    for rolls in product(range(1, DICE_SIDES + 1), repeat=num_rolled):
-        srt = sorted(rolls)
-        lowest = srt[:KEEP_DICES]
-        highest = srt[-KEEP_DICES:]
-        kept = highest if hit_dice_mod >= 0 else lowest
-        kept_sum = sum(kept)
-        highest_sum = sum(highest)
-        counts[(kept_sum, highest_sum)] += 1
+    for (low_sum, high_sum), ways in _kept_sum_counts(num_rolled).items():
+        kept_sum = high_sum if hit_dice_mod >= 0 else low_sum
+        # Crit logic (based on highest 2 dice, even with penalties)
+        (crit if high_sum == CRIT_RESULT else plain)[kept_sum] += ways
 
-    return {k: c / total_outcomes for k, c in counts.items()}
+    total_outcomes = DICE_SIDES ** num_rolled
+    return Distribution.from_counts(plain, total_outcomes), Distribution.from_counts(crit, total_outcomes)
 
 
-def attack_outcome_probabilities(attack: AttackInput) -> Dict[str, float]:
-    attack.validate()
+def _injury_branches(attack: AttackInput, plain: Distribution, crit: Distribution, threshold: int):
+    """(P(hit on the branch), injury dice mod) for non-critical and critical hits."""
+    extra_dice_from_crit = 2 if attack.weapon_is_critical else 1
+    return (
+        (plain.at_least(threshold), attack.injury_dice_mod),
+        (crit.at_least(threshold), attack.injury_dice_mod + extra_dice_from_crit),
+    )
+
 
-    result: Dict[str, float] = {"Miss": 0.0}
+def _band_masses(attack: AttackInput, miss: float, branches) -> Dict[str, float]:
+    result: Dict[str, float] = {"Miss": miss}
     for band in attack.injury_bands:
         result.setdefault(band.label, 0.0)
 
-    branches = hit_branches(attack.hit_dice_mod)
-
-    for (kept_sum, highest_sum), p_raw in branches.items():
-        total_hit = kept_sum + attack.hit_roll_mod
-
-        # Miss
-        if total_hit < attack.hit_target_number:
-            result["Miss"] += p_raw
+    injury_bands = tuple(attack.injury_bands)
+    net_injury_mod = attack.injury_roll_mod - attack.target_armor
+    for p_branch, branch_injury_dice_mod in branches:
+        if not p_branch:
             continue
-
-        # Crit logic (based on highest 2 dice, even with penalties)
-        extra_dice_from_crit = 0
-        if highest_sum == CRIT_RESULT:
-            extra_dice_from_crit = 2 if attack.weapon_is_critical else 1
-
-        # Final Injury dice modifier on this branch
-        branch_injury_dice_mod = attack.injury_dice_mod + extra_dice_from_crit
-
-        cond_injury = injury_distribution(
-            injury_bands=attack.injury_bands,
-            dice_mod=branch_injury_dice_mod,
-            roll_mod=attack.injury_roll_mod,
-            target_armor=attack.target_armor,
-        )
-
-        for label, p_injury in cond_injury.items():
-            result[label] += p_raw * p_injury
+        for label, p_injury in _injury_distribution(injury_bands, branch_injury_dice_mod, net_injury_mod):
+            result[label] += p_branch * p_injury
 
     return result
 
 
-def format_percent(p: float) -> str:
-    return f"{p*100:5.2f}%"
+@timed("logic.attack_outcome_probabilities")
+def attack_outcome_probabilities(attack: AttackInput) -> Dict[str, float]:
+    attack.validate()
 
+    plain, crit = _hit_branches(attack.hit_dice_mod)
+    threshold = attack.hit_target_number - attack.hit_roll_mod
+    miss = plain.below(threshold) + crit.below(threshold)
+    return _band_masses(attack, miss, _injury_branches(attack, plain, crit, threshold))
 
-def print_summary(name: str, outcome: Dict[str, float]):
-    miss = outcome.get("Miss", 0.0)
-    any_injury = 1.0 - miss
 
-    down = outcome.get("Down", 0.0)
-    ooa = outcome.get("Out of Action", 0.0)
+@dataclass(frozen=True)
+class AttackStatistics:
+    """Band probabilities plus moments, all read off the same memoized stages.
+
+    The hit margin is the kept sum + hit_roll_mod - hit_target_number over
+    every roll (hits are margins >= 0).  The injury total is the injury kept
+    sum + injury_roll_mod - target_armor; ``injury_totals`` holds P(hit and
+    total == t), and the injury moments are conditional on a hit (None when
+    the attack cannot hit).
+    """
+
+    outcome: Dict[str, float]  # as attack_outcome_probabilities returns
+    crit_probability: float  # P(hit and crit)
+    hit_margin_mean: float
+    hit_margin_variance: float
+    injury_total_mean: Optional[float]
+    injury_total_variance: Optional[float]
+    injury_totals: Distribution
+
+
+@timed("logic.attack_statistics")
+def attack_statistics(attack: AttackInput) -> AttackStatistics:
+    attack.validate()
 
-    print(f"=== {name} ===")
-    for label, p in outcome.items():
-        print(f"  {label:14s}: {format_percent(p)}")
-    print("  -------------------------")
-    print(f"  Any injury      : {format_percent(any_injury)}")
-    print(f"  Down : {format_percent(down)}")
-    print(f"  OOA : {format_percent(ooa)}")
-    print()
+    plain, crit = _hit_branches(attack.hit_dice_mod)
+    threshold = attack.hit_target_number - attack.hit_roll_mod
+    miss = plain.below(threshold) + crit.below(threshold)
+    branches = _injury_branches(attack, plain, crit, threshold)
+
+    # The kept sum on its own is just the hit roll's dice-sum distribution.
+    margins = _dice_sum_distribution(KEEP_DICES + abs(attack.hit_dice_mod), attack.hit_dice_mod >= 0)
+    margins = margins.shifted(-threshold)
+    net_injury_mod = attack.injury_roll_mod - attack.target_armor
+    injury_totals = Distribution.mixture(
+        (p_branch, _dice_sum_distribution(KEEP_DICES + abs(dice_mod), dice_mod >= 0).shifted(net_injury_mod))
+        for p_branch, dice_mod in branches
+    )
+
+    return AttackStatistics(
+        outcome=_band_masses(attack, miss, branches),
+        crit_probability=branches[1][0],
+        hit_margin_mean=margins.mean(),
+        hit_margin_variance=margins.variance(),
+        injury_total_mean=injury_totals.mean(),
+        injury_total_variance=injury_totals.variance(),
+        injury_totals=injury_totals,
+    )
+
+
+_MEMOIZED_STAGES = {
+    "kept_sum_counts": _kept_sum_counts,
+    "dice_sum_distribution": _dice_sum_distribution,
+    "hit_branches": _hit_branches,
+    "injury_distribution": _injury_distribution,
+    "compile_injury_bands": compile_injury_bands,
+    "injury_band_runs": injury_band_runs,
+}
+
+
+def cache_stats() -> Dict[str, Dict[str, Optional[int]]]:
+    """Hit/miss/size counters for each memoized stage of the dice engine."""
+    return {name: func.cache_info()._asdict() for name, func in _MEMOIZED_STAGES.items()}
+
+
+def clear_caches() -> None:
+    for func in _MEMOIZED_STAGES.values():
+        func.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# Precomputed outcome table
+#
+# File layout (all little-endian):
+#   header  : magic b"TCOT", then uint32 version, DICE_SIDES, KEEP_DICES,
+#             CRIT_RESULT and the number of injury bands
+#   payload : float64 cells in C order over the axes
+#       [hit threshold][hit dice mod][critical][injury dice mod][net injury mod][outcome]
+#   hit threshold   = hit_target_number - hit_roll_mod, clamped to
+#                     TABLE_HIT_THRESHOLDS (anything below always hits,
+#                     anything above always misses)
+#   hit dice mod    = TABLE_DICE_MODS
+#   critical        = 0 / 1 (weapon_is_critical)
+#   injury dice mod = TABLE_DICE_MODS
+#   net injury mod  = injury_roll_mod - target_armor, TABLE_NET_INJURY_MODS
+#   outcome         = "Miss" followed by DEFAULT_INJURY_BANDS in order
+#
+# Cells hold exactly what attack_outcome_probabilities returns for the
+# equivalent input, so a lookup is indistinguishable from the live engine.
+# ---------------------------------------------------------------------------
+
+OUTCOME_TABLE_PATH = Path(
+    os.environ.get("TRENCHCALC_OUTCOME_TABLE", Path(__file__).resolve().parent / "outcome_table.bin")
+)
+OUTCOME_TABLE_VERSION = 2
+
+TABLE_HIT_THRESHOLDS = range(KEEP_DICES, KEEP_DICES * DICE_SIDES + 2)
+TABLE_DICE_MODS = range(-6, 7)
+TABLE_ROLL_MODS = range(-6, 7)
+TABLE_ARMOR = range(0, 7)
+TABLE_NET_INJURY_MODS = range(
+    TABLE_ROLL_MODS.start - (TABLE_ARMOR.stop - 1),
+    TABLE_ROLL_MODS.stop - TABLE_ARMOR.start,
+)
+
+_TABLE_HEADER = struct.Struct("<4s5I")
+_TABLE_MAGIC = b"TCOT"
+_TABLE_SHAPE = (
+    len(TABLE_HIT_THRESHOLDS),
+    len(TABLE_DICE_MODS),
+    2,
+    len(TABLE_DICE_MODS),
+    len(TABLE_NET_INJURY_MODS),
+    1 + len(DEFAULT_INJURY_BANDS),
+)
+
+
+def _table_header() -> bytes:
+    return _TABLE_HEADER.pack(
+        _TABLE_MAGIC,
+        OUTCOME_TABLE_VERSION,
+        DICE_SIDES,
+        KEEP_DICES,
+        CRIT_RESULT,
+        len(DEFAULT_INJURY_BANDS),
+    )
+
+
+def build_outcome_table(path: Path | str = OUTCOME_TABLE_PATH) -> int:
+    """Evaluate every grid cell and write the table to ``path``.
+
+    Returns the number of cells written.
+    """
+    labels = ["Miss"] + [band.label for band in DEFAULT_INJURY_BANDS]
+    payload = array("d")
+    cells = 0
+
+    for threshold in TABLE_HIT_THRESHOLDS:
+        for hit_dice_mod in TABLE_DICE_MODS:
+            for critical in (False, True):
+                for injury_dice_mod in TABLE_DICE_MODS:
+                    for net_injury_mod in TABLE_NET_INJURY_MODS:
+                        outcome = attack_outcome_probabilities(
+                            AttackInput(
+                                hit_target_number=threshold,
+                                hit_dice_mod=hit_dice_mod,
+                                weapon_is_critical=critical,
+                                injury_bands=DEFAULT_INJURY_BANDS,
+                                injury_dice_mod=injury_dice_mod,
+                                injury_roll_mod=net_injury_mod,
+                            )
+                        )
+                        payload.extend(outcome[label] for label in labels)
+                        cells += 1
+
+    if sys.byteorder != "little":
+        payload.byteswap()
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(_table_header())
+        payload.tofile(fh)
+    os.replace(tmp_path, path)
+    close_outcome_table()
+    return cells
+
+
+class OutcomeTable:
+    """Read-only, memory-mapped view over a table written by build_outcome_table."""
+
+    __slots__ = ("_file", "_mmap", "_labels", "_cell")
+
+    def __init__(self, path: Path | str = OUTCOME_TABLE_PATH):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        expected_size = _TABLE_HEADER.size + 8 * prod(_TABLE_SHAPE)
+        if self._mmap[: _TABLE_HEADER.size] != _table_header() or len(self._mmap) != expected_size:
+            self.close()
+            raise ValueError(f"{path} is not an outcome table for the current dice rules")
+
+        self._labels = ["Miss"] + [band.label for band in DEFAULT_INJURY_BANDS]
+        self._cell = struct.Struct(f"<{len(self._labels)}d")
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def lookup(self, attack: AttackInput) -> Optional[Dict[str, float]]:
+        """Return the tabulated outcome, or None when ``attack`` lies outside the grid."""
+        if tuple(attack.injury_bands) != tuple(DEFAULT_INJURY_BANDS):
+            return None
+
+        threshold = attack.hit_target_number - attack.hit_roll_mod
+        threshold = min(max(threshold, TABLE_HIT_THRESHOLDS.start), TABLE_HIT_THRESHOLDS.stop - 1)
+        net_injury_mod = attack.injury_roll_mod - attack.target_armor
+        if (
+            attack.hit_dice_mod not in TABLE_DICE_MODS
+            or attack.injury_dice_mod not in TABLE_DICE_MODS
+            or net_injury_mod not in TABLE_NET_INJURY_MODS
+        ):
+            return None
+
+        index = threshold - TABLE_HIT_THRESHOLDS.start
+        for size, offset in (
+            (_TABLE_SHAPE[1], attack.hit_dice_mod - TABLE_DICE_MODS.start),
+            (_TABLE_SHAPE[2], int(bool(attack.weapon_is_critical))),
+            (_TABLE_SHAPE[3], attack.injury_dice_mod - TABLE_DICE_MODS.start),
+            (_TABLE_SHAPE[4], net_injury_mod - TABLE_NET_INJURY_MODS.start),
+        ):
+            index = index * size + offset
+
+        values = self._cell.unpack_from(self._mmap, _TABLE_HEADER.size + index * self._cell.size)
+        return dict(zip(self._labels, values))
+
+
+_outcome_table: OutcomeTable | None = None
+_outcome_table_missing = False
+
+
+def load_outcome_table() -> Optional[OutcomeTable]:
+    """Open the shared outcome table once per process; None if unavailable."""
+    global _outcome_table, _outcome_table_missing
+    if _outcome_table is None and not _outcome_table_missing:
+        try:
+            _outcome_table = OutcomeTable(OUTCOME_TABLE_PATH)
+        except (OSError, ValueError):
+            _outcome_table_missing = True
+    return _outcome_table
+
+
+def close_outcome_table() -> None:
+    global _outcome_table, _outcome_table_missing
+    if _outcome_table is not None:
+        _outcome_table.close()
+    _outcome_table = None
+    _outcome_table_missing = False
+
+
+@timed("logic.lookup_outcome_probabilities")
+def lookup_outcome_probabilities(attack: AttackInput) -> Dict[str, float]:
+    """Answer from the precomputed table when possible, else run the live engine."""
+    attack.validate()
+    table = load_outcome_table()
+    if table is not None:
+        outcome = table.lookup(attack)
+        if outcome is not None:
+            return outcome
+    return attack_outcome_probabilities(attack)
+
+
+# ---------------------------------------------------------------------------
+# Warm-start artifact
+#
+# Every dice-sum distribution and hit-branch table a range of dice modifiers
+# can reach, so a fresh worker serves its first large-modifier request as
+# fast as a warm one.
+#
+# File layout:
+#   header  : magic b"TCWS", then uint32 version, DICE_SIDES, KEEP_DICES,
+#             CRIT_RESULT and the marshal format version (little-endian)
+#   payload : marshal of {"dice_mods": (start, stop),
+#                         "dice_sum_distribution": {(num_dice, keep_highest): dist},
+#                         "hit_branches": {hit_dice_mod: (plain dist, crit dist)}}
+#             with each Distribution stored as (offset, probabilities), so
+#             the stages rebuild exactly what they would have computed
+# ---------------------------------------------------------------------------
+
+WARM_TABLES_PATH = Path(
+    os.environ.get("TRENCHCALC_WARM_TABLES", Path(__file__).resolve().parent / "warm_tables.bin")
+)
+WARM_TABLES_VERSION = 2
+# Every dice modifier the forms and CLI accept, so none starts cold after a deploy.
+WARM_DICE_MODS = range(-MAX_DICE_MOD, MAX_DICE_MOD + 1)
+
+_WARM_HEADER = struct.Struct("<4s5I")
+_WARM_MAGIC = b"TCWS"
+
+
+def _warm_header() -> bytes:
+    return _WARM_HEADER.pack(_WARM_MAGIC, WARM_TABLES_VERSION, DICE_SIDES, KEEP_DICES, CRIT_RESULT, marshal.version)
+
+
+def _distribution_state(dist: Distribution) -> Tuple[int, Tuple[float, ...]]:
+    return dist.offset, tuple(dist.probs)
+
+
+def build_warm_tables(path: Path | str = WARM_TABLES_PATH, dice_mods: range = WARM_DICE_MODS) -> int:
+    """Compute every stage result ``dice_mods`` can reach and write them to ``path``.
+
+    Injury rolls can gain up to two dice from a critical hit, so dice-sum
+    distributions run two dice past the largest modifier.  Returns the
+    number of tables written.
+    """
+    max_dice = KEEP_DICES + max(abs(dice_mods.start), abs(dice_mods.stop - 1)) + 2
+    dice_sums = {
+        (num_dice, keep_highest): _distribution_state(_dice_sum_distribution(num_dice, keep_highest))
+        for num_dice in range(KEEP_DICES, max_dice + 1)
+        for keep_highest in (True, False)
+    }
+    branches = {
+        dice_mod: tuple(_distribution_state(dist) for dist in _hit_branches(dice_mod)) for dice_mod in dice_mods
+    }
+    payload = {
+        "dice_mods": (dice_mods.start, dice_mods.stop),
+        "dice_sum_distribution": dice_sums,
+        "hit_branches": branches,
+    }
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(_warm_header())
+        marshal.dump(payload, fh)
+    os.replace(tmp_path, path)
+    return len(dice_sums) + len(branches)
+
+
+def load_warm_tables(path: Path | str = WARM_TABLES_PATH) -> int:
+    """Seed the memoized stages from a warm-start artifact.
+
+    Returns the number of tables loaded; 0 when the file is missing or was
+    built for different dice rules.
+    """
+    try:
+        with open(path, "rb") as fh:
+            if fh.read(_WARM_HEADER.size) != _warm_header():
+                return 0
+            payload = marshal.load(fh)
+    except (OSError, EOFError, ValueError, TypeError):
+        return 0
+    _warm_dice_sums.update(payload["dice_sum_distribution"])
+    _warm_hit_branches.update(payload["hit_branches"])
+    return len(payload["dice_sum_distribution"]) + len(payload["hit_branches"])
+
+
+def unload_warm_tables() -> None:
+    _warm_dice_sums.clear()
+    _warm_hit_branches.clear()
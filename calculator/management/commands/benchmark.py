@@ -0,0 +1,60 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner
+
+from calculator.benchmarks import CATALOG_SIZES, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Time the dice engine and calculator views, optionally comparing against a saved baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Write results as JSON to this file.")
+        parser.add_argument("--compare", metavar="BASELINE", help="Flag regressions against this results file.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed slowdown before a benchmark counts as a regression (default: %(default)s = 20%%).",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark; the median is kept.")
+        parser.add_argument("--sizes", type=int, nargs="+", default=list(CATALOG_SIZES), help="Catalog sizes.")
+        parser.add_argument("--skip-views", action="store_true", help="Only time calculator.logic.")
+
+    def handle(self, *args, **options):
+        runner = None
+        if not options["skip_views"]:
+            # Views run against a throwaway test database seeded per size.
+            runner = get_runner(settings)(verbosity=0, interactive=False)
+            old_config = runner.setup_databases()
+        try:
+            report = run_benchmarks(
+                include_views=not options["skip_views"],
+                sizes=options["sizes"],
+                repeat=options["repeat"],
+            )
+        finally:
+            if runner is not None:
+                runner.teardown_databases(old_config)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Wrote {len(report['results'])} timings to {options['output']}.")
+        else:
+            for name, seconds in sorted(report["results"].items()):
+                self.stdout.write(f"{name:80s} {seconds * 1000:10.3f} ms")
+
+        if options["compare"]:
+            with open(options["compare"]) as fh:
+                baseline = json.load(fh)
+            regressions = compare(baseline, report, options["threshold"])
+            for name, before, after, ratio in regressions:
+                self.stdout.write(
+                    self.style.ERROR(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+                )
+            if regressions:
+                raise CommandError(f"{len(regressions)} benchmark(s) regressed beyond {options['threshold']:.0%}.")
+            self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,39 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from calculator.matchups import default_situation, rebuild_matchups
+
+
+class Command(BaseCommand):
+    help = "Precompute the attacker x weapon x defender outcome matrix for every profile."
+
+    def add_arguments(self, parser):
+        defaults = default_situation()
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size.")
+        parser.add_argument("--hit-target-number", type=int, default=defaults["hit_target_number"])
+        parser.add_argument("--hit-roll-mod", type=int, default=defaults["hit_roll_mod"])
+        parser.add_argument("--injury-dice-mod", type=int, default=defaults["injury_dice_mod"])
+        parser.add_argument("--injury-roll-mod", type=int, default=defaults["injury_roll_mod"])
+        parser.add_argument(
+            "--attack-type",
+            choices=["ranged", "melee"],
+            default=defaults["attack_type"],
+            help="Attack type for profiles without weapons.",
+        )
+
+    def handle(self, *args, **options):
+        situation = {
+            "hit_target_number": options["hit_target_number"],
+            "hit_roll_mod": options["hit_roll_mod"],
+            "injury_dice_mod": options["injury_dice_mod"],
+            "injury_roll_mod": options["injury_roll_mod"],
+            "attack_type": options["attack_type"],
+        }
+        started = time.perf_counter()
+        rows, unique = rebuild_matchups(situation, workers=options["workers"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored {rows} matchups ({unique} distinct attacks) in {elapsed:.1f}s.")
+        )
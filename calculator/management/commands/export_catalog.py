@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from calculator.catalog_io import CHUNK_SIZE, export_lines
+
+
+class Command(BaseCommand):
+    help = "Write every keyword, weapon and profile as a CSV or JSONL catalog file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument("--output", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        lines = export_lines(options["format"], max(options["chunk_size"], 1))
+        if options["output"] is None:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", newline="", encoding="utf-8") as out:
+            out.writelines(lines)
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.catalog_io import CHUNK_SIZE, CatalogImportError, import_catalog
+
+
+class Command(BaseCommand):
+    help = "Upsert keywords, weapons and profiles by name from a CSV or JSONL catalog file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Catalog file, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Default: from the file name, else CSV.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per bulk insert.")
+
+    def handle(self, *args, **options):
+        input_format = options["format"]
+        if input_format is None:
+            input_format = "jsonl" if options["input"].endswith((".jsonl", ".json", ".ndjson")) else "csv"
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        stream = sys.stdin if options["input"] == "-" else open(options["input"], newline="", encoding="utf-8")
+        try:
+            counts = import_catalog(stream, input_format, options["chunk_size"])
+        except CatalogImportError as exc:
+            raise CommandError(f"Nothing imported:\n{exc}") from None
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {counts['keyword']} keywords, {counts['weapon']} weapons and "
+                f"{counts['profile']} profiles with {counts['links']} links."
+            )
+        )
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.loadtest import METRICS, compare, run_load_test
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent read/write throughput on a scratch copy of the SQLite database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4, help="Reader threads.")
+        parser.add_argument("--writers", type=int, default=1, help="Writer threads.")
+        parser.add_argument("--seconds", type=float, default=5.0, help="Length of the run.")
+        parser.add_argument("--size", type=int, default=500, help="Catalog rows to seed.")
+        parser.add_argument("--output", help="Write the report as JSON to this file.")
+        parser.add_argument("--compare", metavar="BASELINE", help="Show each metric against this report.")
+
+    def handle(self, *args, **options):
+        if options["readers"] < 0 or options["writers"] < 0 or options["readers"] + options["writers"] < 1:
+            raise CommandError("Run at least one reader or writer.")
+        try:
+            report = run_load_test(options["readers"], options["writers"], options["seconds"], options["size"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from None
+
+        meta = report["meta"]
+        self.stdout.write(
+            f"journal_mode={meta['journal_mode']} CONN_MAX_AGE={meta['conn_max_age']} "
+            f"readers={meta['readers']} writers={meta['writers']} seconds={meta['seconds']}"
+        )
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+
+        if not options["compare"]:
+            for name, value in report["results"].items():
+                self.stdout.write(f"{name:20s} {value:12.1f}")
+            return
+        with open(options["compare"]) as fh:
+            baseline = json.load(fh)
+        self.stdout.write(f"{'':20s} {'baseline':>12s} {'this run':>12s}")
+        for name, before, after, ratio in compare(baseline, report):
+            line = f"{name:20s} {before:12.1f} {after:12.1f} {ratio:8.2f}x"
+            better = after > before if METRICS[name] else after < before
+            self.stdout.write(self.style.SUCCESS(line) if better else line)
@@ -0,0 +1,35 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from calculator.logic import WARM_DICE_MODS, WARM_TABLES_PATH, build_warm_tables
+
+
+class Command(BaseCommand):
+    help = "Precompute dice-sum distributions and hit-branch tables into a warm-start artifact."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=str(WARM_TABLES_PATH),
+            help="Where to write the artifact (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-dice-mod",
+            type=int,
+            default=WARM_DICE_MODS.stop - 1,
+            help="Cover dice modifiers from -N to +N (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["output"])
+        max_mod = abs(options["max_dice_mod"])
+        started = time.perf_counter()
+        tables = build_warm_tables(path, range(-max_mod, max_mod + 1))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {tables} tables ({path.stat().st_size} bytes) to {path} in {elapsed:.1f}s."
+            )
+        )
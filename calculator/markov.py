@@ -0,0 +1,115 @@
+"""Multi-attack injury chains.
+
+The target is modelled as a Markov chain over INJURY_STATES.  A single attack
+moves it according to the band it lands in: Down and Out of Action results
+step the state forward (a second Down takes a Down model Out of Action), any
+other result leaves it where it is, and Out of Action is absorbing.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .logic import AttackInput, lookup_outcome_probabilities
+
+HEALTHY = "Healthy"
+DOWN = "Down"
+OUT_OF_ACTION = "Out of Action"
+INJURY_STATES: Tuple[str, ...] = (HEALTHY, DOWN, OUT_OF_ACTION)
+
+Matrix = Tuple[Tuple[float, ...], ...]
+
+
+def transition_matrix(
+    outcome: Dict[str, float],
+    down_outcome: Optional[Dict[str, float]] = None,
+) -> Matrix:
+    """Per-attack transition matrix, rows/columns ordered as INJURY_STATES.
+
+    ``outcome`` is a single-attack result as returned by
+    attack_outcome_probabilities.  ``down_outcome`` is used for attacks
+    against a target that is already Down, when those resolve differently.
+    """
+    if down_outcome is None:
+        down_outcome = outcome
+
+    p_down = outcome.get(DOWN, 0.0)
+    p_ooa = outcome.get(OUT_OF_ACTION, 0.0)
+    next_down = down_outcome.get(DOWN, 0.0) + down_outcome.get(OUT_OF_ACTION, 0.0)
+
+    return (
+        (1.0 - p_down - p_ooa, p_down, p_ooa),
+        (0.0, 1.0 - next_down, next_down),
+        (0.0, 0.0, 1.0),
+    )
+
+
+def _matmul(a: Matrix, b: Matrix) -> Matrix:
+    return tuple(
+        tuple(sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0])))
+        for i in range(len(a))
+    )
+
+
+def _vecmul(vector: Sequence[float], matrix: Matrix) -> Tuple[float, ...]:
+    return tuple(sum(vector[k] * matrix[k][j] for k in range(len(matrix))) for j in range(len(matrix[0])))
+
+
+def matrix_power(matrix: Matrix, exponent: int) -> Matrix:
+    """``matrix ** exponent`` by repeated squaring."""
+    if exponent < 0:
+        raise ValueError("exponent must be >= 0")
+
+    size = len(matrix)
+    result: Matrix = tuple(tuple(1.0 if i == j else 0.0 for j in range(size)) for i in range(size))
+    while exponent:
+        if exponent & 1:
+            result = _matmul(result, matrix)
+        exponent >>= 1
+        if exponent:
+            matrix = _matmul(matrix, matrix)
+    return result
+
+
+def _start_vector(start: str) -> Tuple[float, ...]:
+    if start not in INJURY_STATES:
+        raise ValueError(f"start must be one of {', '.join(INJURY_STATES)}.")
+    return tuple(1.0 if state == start else 0.0 for state in INJURY_STATES)
+
+
+def state_after_attacks(
+    attack: AttackInput,
+    attacks: int,
+    start: str = HEALTHY,
+    down_attack: Optional[AttackInput] = None,
+) -> Dict[str, float]:
+    """Probability of each injury state after ``attacks`` attacks."""
+    matrix = transition_matrix(
+        lookup_outcome_probabilities(attack),
+        lookup_outcome_probabilities(down_attack) if down_attack else None,
+    )
+    vector = _vecmul(_start_vector(start), matrix_power(matrix, attacks))
+    return dict(zip(INJURY_STATES, vector))
+
+
+def out_of_action_curve(
+    attack: AttackInput,
+    max_attacks: int = 50,
+    start: str = HEALTHY,
+    down_attack: Optional[AttackInput] = None,
+) -> List[float]:
+    """P(target Out of Action) after 1..max_attacks attacks.
+
+    The single-attack engine runs once (twice with ``down_attack``); each
+    further count is one 3x3 step of the chain.
+    """
+    matrix = transition_matrix(
+        lookup_outcome_probabilities(attack),
+        lookup_outcome_probabilities(down_attack) if down_attack else None,
+    )
+    vector = _start_vector(start)
+    curve = []
+    for _ in range(max_attacks):
+        vector = _vecmul(vector, matrix)
+        curve.append(vector[-1])
+    return curve
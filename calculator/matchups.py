@@ -0,0 +1,90 @@
+"""Roster-wide attacker x weapon x defender outcome matrix."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from .forms import AttackInputForm
+from .logic import AttackInput, lookup_outcome_probabilities
+from .models import Matchup, UnitProfile, Weapon
+from .resolution import attack_key, resolve_attack
+
+Combination = Tuple[UnitProfile, Optional[Weapon], UnitProfile, AttackInput]
+
+
+def default_situation() -> Dict[str, object]:
+    """The calculator form's default situational modifiers."""
+    names = [
+        "attack_type",
+        "hit_target_number",
+        "extra_hit_dice_mod",
+        "hit_roll_mod",
+        "injury_dice_mod",
+        "injury_roll_mod",
+        "extra_target_armor",
+        "weapon_is_critical",
+    ]
+    return {name: AttackInputForm.base_fields[name].initial for name in names}
+
+
+def load_roster() -> List[UnitProfile]:
+    """Every profile with its weapons (two queries); keyword totals are stored on the rows."""
+    return list(UnitProfile.objects.prefetch_related("weapons"))
+
+
+def resolve_combinations(
+    profiles: List[UnitProfile],
+    situation: Optional[Dict[str, object]] = None,
+) -> List[Combination]:
+    """Resolve every attacker/weapon/defender triple without touching the database.
+
+    Attackers without weapons get a single unarmed row using the situation's
+    attack type.
+    """
+    situation = {**default_situation(), **(situation or {})}
+    combinations = []
+    for attacker in profiles:
+        weapons = list(attacker.weapons.all()) or [None]
+        for weapon in weapons:
+            for defender in profiles:
+                cleaned = dict(situation, attacker_profile=attacker, weapon=weapon, defender_profile=defender)
+                combinations.append((attacker, weapon, defender, resolve_attack(cleaned)["attack"]))
+    return combinations
+
+
+def compute_outcomes(attacks: Iterable[AttackInput], workers: int = 1) -> Dict[tuple, Dict[str, float]]:
+    """Evaluate each distinct attack once, optionally across a process pool."""
+    unique = {}
+    for attack in attacks:
+        unique.setdefault(attack_key(attack), attack)
+
+    keys, pending = list(unique), list(unique.values())
+    if workers > 1 and len(pending) > 1:
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(lookup_outcome_probabilities, pending, chunksize=chunksize))
+    else:
+        outcomes = [lookup_outcome_probabilities(attack) for attack in pending]
+    return dict(zip(keys, outcomes))
+
+
+def rebuild_matchups(
+    situation: Optional[Dict[str, object]] = None,
+    workers: int = 1,
+    batch_size: int = 1000,
+) -> Tuple[int, int]:
+    """Recompute the whole matchup table; returns (rows written, distinct attacks)."""
+    combinations = resolve_combinations(load_roster(), situation)
+    outcomes = compute_outcomes((attack for *_, attack in combinations), workers=workers)
+
+    rows = [
+        Matchup(attacker=attacker, weapon=weapon, defender=defender, outcome=outcomes[attack_key(attack)])
+        for attacker, weapon, defender, attack in combinations
+    ]
+    with transaction.atomic():
+        Matchup.objects.all().delete()
+        Matchup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows), len(outcomes)
@@ -0,0 +1,142 @@
+import cProfile
+import json
+import logging
+import re
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.db import connections
+
+from .timing import start_collecting, stop_collecting
+
+logger = logging.getLogger("calculator.timing")
+
+
+class _QueryTimer:
+    """execute_wrapper hook that counts queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += perf_counter() - started
+
+
+def _server_timing(timings, queries, total):
+    entries = [f'db;dur={queries.seconds * 1000:.2f};desc="{queries.count} queries"']
+    entries += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in sorted(timings.items())]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """Report DB, compute and render time per request.
+
+    Timings go to a ``Server-Timing`` response header (unless
+    CALCULATOR_SERVER_TIMING is False) and, when the ``calculator.timing``
+    logger is at INFO, to it as one JSON object per request.  Streaming responses are timed up
+    to the point the response object is returned, not while they stream.
+
+    Profiling is opt-in: set CALCULATOR_PROFILE_REQUESTS = True to profile
+    every request, or add ``?profile=1`` as a staff user to profile one.  The
+    cProfile stats are written to CALCULATOR_PROFILE_DIR.
+
+    Works in both sync and async chains, so async views stay async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _should_profile(self, request):
+        if getattr(settings, "CALCULATOR_PROFILE_REQUESTS", False):
+            return True
+        user = getattr(request, "user", None)
+        return "profile" in request.GET and user is not None and user.is_staff
+
+    def _dump_profile(self, profiler, request):
+        directory = Path(getattr(settings, "CALCULATOR_PROFILE_DIR", settings.BASE_DIR / "profiles"))
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        path = directory / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.method.lower()}-{slug}.prof"
+        profiler.dump_stats(path)
+        return path
+
+    @staticmethod
+    def _watch_queries(stack, queries):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(queries))
+
+    def _start(self, request):
+        profiler = cProfile.Profile() if self._should_profile(request) else None
+        if profiler is not None:
+            profiler.enable()
+        return profiler, _QueryTimer(), start_collecting()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = perf_counter()
+        with ExitStack() as stack:
+            profiler, queries, token = self._start(request)
+            self._watch_queries(stack, queries)
+            try:
+                response = self.get_response(request)
+            finally:
+                timings = self._stop(profiler, token)
+        return self._finish(request, response, profiler, queries, timings, perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with ExitStack() as stack:
+            profiler, queries, token = self._start(request)
+            # The async ORM runs on the request's sync_to_async thread, whose
+            # connections differ from the event loop's; hook those.  Only the
+            # event loop thread is profiled.
+            await sync_to_async(self._watch_queries)(stack, queries)
+            try:
+                response = await self.get_response(request)
+            finally:
+                timings = self._stop(profiler, token)
+        return self._finish(request, response, profiler, queries, timings, perf_counter() - started)
+
+    def _stop(self, profiler, token):
+        if profiler is not None:
+            profiler.disable()
+        return stop_collecting(token)
+
+    def _finish(self, request, response, profiler, queries, timings, total):
+        if getattr(settings, "CALCULATOR_SERVER_TIMING", True):
+            response["Server-Timing"] = _server_timing(timings, queries, total)
+
+        if profiler is None and not logger.isEnabledFor(logging.INFO):
+            return response
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 3),
+            "db_ms": round(queries.seconds * 1000, 3),
+            "queries": queries.count,
+            "timings_ms": {name: round(seconds * 1000, 3) for name, seconds in timings.items()},
+        }
+        if profiler is not None:
+            record["profile"] = str(self._dump_profile(profiler, request))
+        logger.info(json.dumps(record))
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0005_unitprofile_weapons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Matchup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outcome', models.JSONField(help_text='Probability of Miss and of each injury band.')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('attacker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matchups_as_attacker', to='calculator.unitprofile')),
+                ('defender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matchups_as_defender', to='calculator.unitprofile')),
+                ('weapon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='matchups', to='calculator.weapon')),
+            ],
+            options={
+                'ordering': ['attacker__name', 'weapon__name', 'defender__name'],
+                'constraints': [models.UniqueConstraint(fields=('attacker', 'weapon', 'defender'), name='unique_matchup')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:08
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_keyword_totals(apps, schema_editor):
+    for model_name in ("UnitProfile", "Weapon"):
+        model = apps.get_model("calculator", model_name)
+        rows = model.objects.annotate(
+            ranged_total=Coalesce(Sum("keywords__ranged_dice_mod"), 0),
+            melee_total=Coalesce(Sum("keywords__melee_dice_mod"), 0),
+            armor_total=Coalesce(Sum("keywords__armor_mod"), 0),
+        )
+        for row in rows:
+            row.keyword_ranged_dice_mod = row.ranged_total
+            row.keyword_melee_dice_mod = row.melee_total
+            row.keyword_armor_mod = row.armor_total
+        model.objects.bulk_update(
+            rows, ["keyword_ranged_dice_mod", "keyword_melee_dice_mod", "keyword_armor_mod"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0006_matchup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unitprofile',
+            name='keyword_armor_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unitprofile',
+            name='keyword_melee_dice_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unitprofile',
+            name='keyword_ranged_dice_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='weapon',
+            name='keyword_armor_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='weapon',
+            name='keyword_melee_dice_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='weapon',
+            name='keyword_ranged_dice_mod',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_keyword_totals, migrations.RunPython.noop),
+    ]
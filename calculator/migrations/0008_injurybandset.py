@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0007_keyword_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InjuryBandSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('bands', models.JSONField(help_text='Ordered injury bands: min_value, max_value (null = no limit) and label.')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# Covering (target, owner) indexes on the auto-created M2M tables.  Django
+# indexes (owner, target) through the unique constraint, which serves the
+# list pages' prefetches and the keyword total subqueries; going from a
+# keyword or weapon to its owners (the keyword signals, cascades) otherwise
+# reads the single-column FK index and then every matching link row.
+LINK_INDEXES = [
+    ('calculator_unitprofile_keywords', 'keyword_id', 'unitprofile_id'),
+    ('calculator_weapon_keywords', 'keyword_id', 'weapon_id'),
+    ('calculator_unitprofile_weapons', 'weapon_id', 'unitprofile_id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_injurybandset'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX "{table}_by_{target}" ON "{table}" ("{target}", "{owner}")',
+            reverse_sql=f'DROP INDEX "{table}_by_{target}"',
+        )
+        for table, target, owner in LINK_INDEXES
+    ]
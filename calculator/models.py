@@ -1,4 +1,15 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .logic import MAX_INJURY_BAND_VALUE, InjuryBand
+
+KEYWORD_TOTAL_FIELDS = {
+    "ranged_dice_mod": "keyword_ranged_dice_mod",
+    "melee_dice_mod": "keyword_melee_dice_mod",
+    "armor_mod": "keyword_armor_mod",
+}
 
 
 class Keyword(models.Model):
@@ -14,7 +25,39 @@ class Keyword(models.Model):
         return self.name
 
 
-class UnitProfile(models.Model):
+class KeywordTotalsModel(models.Model):
+    """Denormalized sums of the modifiers of the attached keywords.
+
+    Kept in sync by the signal handlers in ``calculator.signals`` so that
+    keyword_totals() never has to touch the database.
+    """
+
+    keyword_ranged_dice_mod = models.IntegerField(default=0, editable=False)
+    keyword_melee_dice_mod = models.IntegerField(default=0, editable=False)
+    keyword_armor_mod = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def keyword_totals(self):
+        return {key: getattr(self, field) for key, field in KEYWORD_TOTAL_FIELDS.items()}
+
+    @classmethod
+    def refresh_keyword_totals(cls, pks=None):
+        """Recompute the stored totals for ``pks`` (all rows when None) in one UPDATE."""
+        rows = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        field = cls._meta.get_field("keywords")
+        owner = field.m2m_field_name()
+        links = field.remote_field.through.objects.filter(**{owner: OuterRef("pk")}).values(owner)
+        rows.update(
+            **{
+                total: Coalesce(Subquery(links.annotate(total=Sum(f"keyword__{key}")).values("total")), 0)
+                for key, total in KEYWORD_TOTAL_FIELDS.items()
+            }
+        )
+
+
+class UnitProfile(KeywordTotalsModel):
     name = models.CharField(max_length=100, unique=True)
     ranged_dice_mod = models.IntegerField(default=0, help_text="Dice modifier for ranged attacks (+/-d6).")
     melee_dice_mod = models.IntegerField(default=0, help_text="Dice modifier for melee attacks (+/-d6).")
@@ -28,16 +71,8 @@ class UnitProfile(models.Model):
     def __str__(self) -> str:
         return self.name
 
-    def keyword_totals(self):
-        agg = {"ranged_dice_mod": 0, "melee_dice_mod": 0, "armor_mod": 0}
-        for kw in self.keywords.all():
-            agg["ranged_dice_mod"] += kw.ranged_dice_mod
-            agg["melee_dice_mod"] += kw.melee_dice_mod
-            agg["armor_mod"] += kw.armor_mod
-        return agg
-
 
-class Weapon(models.Model):
+class Weapon(KeywordTotalsModel):
     ONE_HANDED = "one_handed"
     TWO_HANDED = "two_handed"
     WEAPON_TYPE_CHOICES = [
@@ -68,10 +103,62 @@ class Weapon(models.Model):
     def __str__(self) -> str:
         return self.name
 
-    def keyword_totals(self):
-        agg = {"ranged_dice_mod": 0, "melee_dice_mod": 0, "armor_mod": 0}
-        for kw in self.keywords.all():
-            agg["ranged_dice_mod"] += kw.ranged_dice_mod
-            agg["melee_dice_mod"] += kw.melee_dice_mod
-            agg["armor_mod"] += kw.armor_mod
-        return agg
+
+class InjuryBandSet(models.Model):
+    """A named injury table that calculations can use instead of the default bands.
+
+    ``bands`` is an ordered list of ``{"min_value", "max_value", "label"}``
+    objects, ``max_value`` null meaning no upper limit; the first band an
+    injury total falls in wins.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    bands = models.JSONField(help_text="Ordered injury bands: min_value, max_value (null = no limit) and label.")
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+    def injury_bands(self):
+        return [InjuryBand(band["min_value"], band.get("max_value"), band["label"]) for band in self.bands]
+
+    def clean(self):
+        if not isinstance(self.bands, list) or not self.bands:
+            raise ValidationError({"bands": "Add at least one band."})
+        labels = set()
+        for band in self.bands:
+            if not isinstance(band, dict) or not isinstance(band.get("label"), str) or not band["label"].strip():
+                raise ValidationError({"bands": "Every band needs a label."})
+            if not isinstance(band.get("min_value"), int) or not isinstance(band.get("max_value", None), (int, type(None))):
+                raise ValidationError({"bands": f"{band['label']}: bounds must be whole numbers."})
+            # The compiled band index holds one entry per total between the edges.
+            limit = MAX_INJURY_BAND_VALUE
+            if any(value is not None and abs(value) > limit for value in (band["min_value"], band.get("max_value"))):
+                raise ValidationError({"bands": f"{band['label']}: bounds must be between -{limit} and {limit}."})
+            if band.get("max_value") is not None and band["max_value"] < band["min_value"]:
+                raise ValidationError({"bands": f"{band['label']}: upper bound is below the lower bound."})
+            if band["label"] == "Miss" or band["label"] in labels:
+                raise ValidationError({"bands": f"{band['label']}: labels must be unique and not \"Miss\"."})
+            labels.add(band["label"])
+
+
+class Matchup(models.Model):
+    """Precomputed attacker/weapon vs defender outcome, filled by compute_matchups."""
+
+    attacker = models.ForeignKey(UnitProfile, on_delete=models.CASCADE, related_name="matchups_as_attacker")
+    weapon = models.ForeignKey(Weapon, null=True, blank=True, on_delete=models.CASCADE, related_name="matchups")
+    defender = models.ForeignKey(UnitProfile, on_delete=models.CASCADE, related_name="matchups_as_defender")
+    outcome = models.JSONField(help_text="Probability of Miss and of each injury band.")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["attacker__name", "weapon__name", "defender__name"]
+        constraints = [
+            models.UniqueConstraint(fields=["attacker", "weapon", "defender"], name="unique_matchup"),
+        ]
+
+    def __str__(self) -> str:
+        weapon = f" ({self.weapon})" if self.weapon_id else ""
+        return f"{self.attacker}{weapon} vs {self.defender}"
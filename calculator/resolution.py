@@ -0,0 +1,105 @@
+from .logic import DEFAULT_INJURY_BANDS, MAX_DICE_MOD, MAX_ROLL_MOD, AttackInput
+
+# Resolved AttackInput field -> the largest value, either sign, the forms accept.
+ATTACK_BOUNDS = {
+    "hit_dice_mod": MAX_DICE_MOD,
+    "hit_roll_mod": MAX_ROLL_MOD,
+    "injury_dice_mod": MAX_DICE_MOD,
+    "injury_roll_mod": MAX_ROLL_MOD,
+    "target_armor": MAX_ROLL_MOD,
+}
+
+
+class AttackOutOfBounds(ValueError):
+    """A resolved attack exceeds ATTACK_BOUNDS; ``errors`` is from bound_errors."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(message for messages in errors.values() for message in messages))
+        self.errors = errors
+
+
+def resolve_attack(cleaned_data):
+    """Fold profile, weapon and keyword modifiers into an AttackInput.
+
+    ``cleaned_data`` carries model instances plus the calculator's situational
+    modifiers, as produced by AttackInputForm.  Returns the attack together
+    with the intermediate modifiers the results page shows.
+    """
+    attacker = cleaned_data["attacker_profile"]
+    weapon = cleaned_data.get("weapon") or attacker.weapons.first()
+    defender = cleaned_data["defender_profile"]
+    attack_type = weapon.range_type if weapon else cleaned_data["attack_type"]
+
+    atk_kw_totals = attacker.keyword_totals()
+    weapon_kw_totals = weapon.keyword_totals() if weapon else {"ranged_dice_mod": 0, "melee_dice_mod": 0, "armor_mod": 0}
+    def_kw_totals = defender.keyword_totals()
+
+    base_hit_dice_mod = (
+        attacker.ranged_dice_mod if attack_type == "ranged" else attacker.melee_dice_mod
+    )
+    keyword_hit_mod = (
+        atk_kw_totals["ranged_dice_mod"] if attack_type == "ranged" else atk_kw_totals["melee_dice_mod"]
+    )
+    weapon_hit_mod = (
+        weapon_kw_totals["ranged_dice_mod"] if attack_type == "ranged" else weapon_kw_totals["melee_dice_mod"]
+    )
+
+    hit_dice_mod = base_hit_dice_mod + keyword_hit_mod + weapon_hit_mod + cleaned_data["extra_hit_dice_mod"]
+
+    base_armor = defender.armor
+    keyword_armor_mod = def_kw_totals["armor_mod"]
+    target_armor = base_armor + keyword_armor_mod + cleaned_data["extra_target_armor"]
+    band_set = cleaned_data.get("injury_band_set")
+
+    attack = AttackInput(
+        hit_target_number=cleaned_data["hit_target_number"],
+        hit_dice_mod=hit_dice_mod,
+        hit_roll_mod=cleaned_data["hit_roll_mod"],
+        weapon_is_critical=cleaned_data.get("weapon_is_critical", False),
+        injury_bands=band_set.injury_bands() if band_set else DEFAULT_INJURY_BANDS,
+        injury_dice_mod=cleaned_data["injury_dice_mod"],
+        injury_roll_mod=cleaned_data["injury_roll_mod"],
+        target_armor=target_armor,
+    )
+
+    return {
+        "attack": attack,
+        "attacker": attacker,
+        "defender": defender,
+        "weapon": weapon,
+        "attack_type": attack_type,
+        "base_hit_dice_mod": base_hit_dice_mod,
+        "keyword_hit_mod": keyword_hit_mod,
+        "weapon_hit_mod": weapon_hit_mod,
+        "base_armor": base_armor,
+        "keyword_armor_mod": keyword_armor_mod,
+        "injury_band_set": band_set,
+    }
+
+
+def bound_errors(attack):
+    """Form-style errors for resolved fields beyond ATTACK_BOUNDS.
+
+    Profile, weapon and keyword modifiers add to the situational ones, so a
+    resolved attack can exceed limits every submitted field met.
+    """
+    errors = {}
+    for name, limit in ATTACK_BOUNDS.items():
+        value = getattr(attack, name)
+        if abs(value) > limit:
+            errors[name] = [f"Resolved {name} is {value}; it must be between -{limit} and {limit}."]
+    return errors
+
+
+def attack_key(attack):
+    """Hashable identity of a resolved attack, for de-duplication."""
+    return (
+        attack.hit_target_number,
+        attack.hit_dice_mod,
+        attack.hit_roll_mod,
+        attack.weapon_is_critical,
+        tuple(attack.injury_bands),
+        attack.injury_dice_mod,
+        attack.injury_roll_mod,
+        attack.target_armor,
+    )
@@ -0,0 +1,163 @@
+"""Shared cache for calculator results and resolved-attack outcomes.
+
+Two layers live in the ``calculator`` cache alias (falling back to
+``default``):
+
+* outcomes, keyed on the canonical resolved AttackInput.  These are pure
+  functions of their inputs for a given engine, so only a change to the
+  engine invalidates them.
+* full calculator results, keyed on the submitted inputs plus the current
+  UnitProfile, Weapon, Keyword and InjuryBandSet versions.  Signal handlers
+  bump a version whenever a row of that model (or one of its M2M links)
+  changes, which orphans every result built from the old catalog.
+
+Both keys carry ENGINE_VERSION: the outcome table version plus the dice
+rule constants, as in the outcome table and warm-start headers.  Entries
+left by a deploy with different dice rules are never read back.
+
+Hit/miss counters are per process.  The ``a``-prefixed helpers are the
+async views' counterparts; they take an async ``compute``/``build``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .logic import CRIT_RESULT, DICE_SIDES, KEEP_DICES, OUTCOME_TABLE_VERSION, lookup_outcome_probabilities
+from .resolution import attack_key
+
+VERSIONED_MODELS = ("unitprofile", "weapon", "keyword", "injurybandset")
+RESULT_TIMEOUT = 24 * 60 * 60
+# Whatever the engine's outputs depend on besides the attack itself.
+ENGINE_VERSION = (OUTCOME_TABLE_VERSION, DICE_SIDES, KEEP_DICES, CRIT_RESULT)
+
+_stats = Counter()
+
+
+def get_cache():
+    alias = "calculator" if "calculator" in settings.CACHES else "default"
+    return caches[alias]
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()
+
+
+def _version_key(model_name: str) -> str:
+    return f"calculator:version:{model_name}"
+
+
+def catalog_versions() -> Dict[str, int]:
+    """Current version of each catalog model, initialising missing ones."""
+    cache = get_cache()
+    keys = {name: _version_key(name) for name in VERSIONED_MODELS}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in found:
+            # Start from the clock so a cleared cache never reuses old keys.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def bump_versions(model_names: Iterable[str] = VERSIONED_MODELS) -> None:
+    """Invalidate cached results that depend on the given models."""
+    cache = get_cache()
+    for name in model_names:
+        key = _version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def _outcome_key(attack) -> str:
+    return f"calculator:outcome:{_digest((ENGINE_VERSION, attack_key(attack)))}"
+
+
+def cached_outcome(attack) -> Dict[str, float]:
+    """lookup_outcome_probabilities, memoized across requests and workers."""
+    cache = get_cache()
+    key = _outcome_key(attack)
+    outcome = cache.get(key)
+    if outcome is None:
+        _stats["outcome_misses"] += 1
+        outcome = lookup_outcome_probabilities(attack)
+        cache.set(key, outcome, timeout=RESULT_TIMEOUT)
+    else:
+        _stats["outcome_hits"] += 1
+    return outcome
+
+
+def _results_key(cleaned_data) -> str:
+    inputs = sorted(
+        (name, value.pk if hasattr(value, "pk") else value) for name, value in cleaned_data.items()
+    )
+    versions = sorted(catalog_versions().items())
+    return f"calculator:results:{_digest((ENGINE_VERSION, inputs, versions))}"
+
+
+def cached_results(cleaned_data, build):
+    """Return ``build(cleaned_data)``, reusing a cached copy for identical inputs."""
+    cache = get_cache()
+    key = _results_key(cleaned_data)
+    results = cache.get(key)
+    if results is None:
+        _stats["result_misses"] += 1
+        results = build(cleaned_data)
+        cache.set(key, results, timeout=RESULT_TIMEOUT)
+    else:
+        _stats["result_hits"] += 1
+    return results
+
+
+async def acached_outcomes(attacks: Sequence, compute) -> List[Dict[str, float]]:
+    """Outcomes for ``attacks`` in order; ``await compute(misses)`` fills the gaps."""
+    cache = get_cache()
+    keys = [_outcome_key(attack) for attack in attacks]
+    found = await cache.aget_many(keys)
+    missing = {key: attack for key, attack in zip(keys, attacks) if key not in found}
+    _stats["outcome_hits"] += len(keys) - len(missing)
+    _stats["outcome_misses"] += len(missing)
+    if missing:
+        computed = dict(zip(missing, await compute(list(missing.values()))))
+        await cache.aset_many(computed, timeout=RESULT_TIMEOUT)
+        found.update(computed)
+    return [found[key] for key in keys]
+
+
+async def acached_results(cleaned_data, build):
+    """Async cached_results; ``build`` is a coroutine function."""
+    cache = get_cache()
+    key = await sync_to_async(_results_key)(cleaned_data)
+    results = await cache.aget(key)
+    if results is None:
+        _stats["result_misses"] += 1
+        results = await build(cleaned_data)
+        await cache.aset(key, results, timeout=RESULT_TIMEOUT)
+    else:
+        _stats["result_hits"] += 1
+    return results
+
+
+def cache_stats() -> Dict[str, float]:
+    stats = {
+        name: _stats[name] for name in ("result_hits", "result_misses", "outcome_hits", "outcome_misses")
+    }
+    for layer in ("result", "outcome"):
+        lookups = stats[f"{layer}_hits"] + stats[f"{layer}_misses"]
+        stats[f"{layer}_hit_rate"] = stats[f"{layer}_hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_cache_stats() -> None:
+    _stats.clear()
@@ -0,0 +1,98 @@
+"""Keep denormalized keyword totals and cached calculator results in sync.
+
+Also applies CALCULATOR_SQLITE_PRAGMAS to each new SQLite connection.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import KEYWORD_TOTAL_FIELDS, InjuryBandSet, Keyword, UnitProfile, Weapon
+from .result_cache import bump_versions
+
+_PENDING_ATTR = "_keyword_totals_pending"
+
+
+def _linked_pks(keyword):
+    # Unordered, so the lookup stays inside the (keyword, owner) link index.
+    return {
+        UnitProfile: list(keyword.unit_profiles.order_by().values_list("pk", flat=True)),
+        Weapon: list(keyword.weapons.order_by().values_list("pk", flat=True)),
+    }
+
+
+def _sync_m2m(model, instance, action, reverse, pk_set):
+    if reverse:
+        # ``instance`` is the Keyword, ``pk_set`` the affected owners.
+        if action == "pre_clear":
+            setattr(instance, _PENDING_ATTR, _linked_pks(instance))
+        elif action == "post_clear":
+            model.refresh_keyword_totals(getattr(instance, _PENDING_ATTR, {}).get(model, []))
+        elif action in ("post_add", "post_remove"):
+            model.refresh_keyword_totals(pk_set)
+        return
+
+    if action in ("post_add", "post_remove", "post_clear"):
+        model.refresh_keyword_totals([instance.pk])
+        instance.refresh_from_db(fields=list(KEYWORD_TOTAL_FIELDS.values()))
+
+
+@receiver(m2m_changed, sender=UnitProfile.keywords.through)
+def profile_keywords_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    _sync_m2m(UnitProfile, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Weapon.keywords.through)
+def weapon_keywords_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    _sync_m2m(Weapon, instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Keyword)
+def keyword_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    for model, pks in _linked_pks(instance).items():
+        model.refresh_keyword_totals(pks)
+
+
+@receiver(pre_delete, sender=Keyword)
+def keyword_deleting(sender, instance, **kwargs):
+    setattr(instance, _PENDING_ATTR, _linked_pks(instance))
+
+
+@receiver(post_delete, sender=Keyword)
+def keyword_deleted(sender, instance, **kwargs):
+    for model, pks in getattr(instance, _PENDING_ATTR, {}).items():
+        model.refresh_keyword_totals(pks)
+
+
+@receiver(post_save, sender=UnitProfile)
+@receiver(post_delete, sender=UnitProfile)
+@receiver(post_save, sender=Weapon)
+@receiver(post_delete, sender=Weapon)
+@receiver(post_save, sender=Keyword)
+@receiver(post_delete, sender=Keyword)
+@receiver(post_save, sender=InjuryBandSet)
+@receiver(post_delete, sender=InjuryBandSet)
+def catalog_row_changed(sender, **kwargs):
+    bump_versions([sender._meta.model_name])
+
+
+@receiver(m2m_changed, sender=UnitProfile.keywords.through)
+@receiver(m2m_changed, sender=UnitProfile.weapons.through)
+@receiver(m2m_changed, sender=Weapon.keywords.through)
+def catalog_links_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        linked = [field.related_model for field in sender._meta.get_fields() if field.is_relation]
+        bump_versions([model._meta.model_name for model in linked])
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    pragmas = getattr(settings, "CALCULATOR_SQLITE_PRAGMAS", None)
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    # Straight on the driver connection, so the pragmas stay out of query counts and logs.
+    for name, value in pragmas.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
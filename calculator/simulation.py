@@ -0,0 +1,172 @@
+"""Monte Carlo backend for attack outcomes.
+
+Mirrors attack_outcome_probabilities (AttackInput in, band probabilities out)
+but rolls the dice, which makes rules that are awkward to enumerate exactly
+easy to bolt on: a dice hook receives each pool of raw rolls before the kept
+dice are chosen and may reroll or otherwise rewrite them.  Hooks have to be
+module-level functions so they can be sent to worker processes.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from math import sqrt
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .logic import CRIT_RESULT, DICE_SIDES, KEEP_DICES, AttackInput, attack_outcome_probabilities
+
+DiceHook = Callable[[np.ndarray, np.random.Generator], np.ndarray]
+
+DEFAULT_CHUNK_SIZE = 200_000
+DEFAULT_MAX_SAMPLES = 20_000_000
+
+
+@dataclass
+class SimulationResult:
+    probabilities: Dict[str, float]
+    intervals: Dict[str, Tuple[float, float]]
+    samples: int
+    confidence: float
+    counts: Dict[str, int] = field(repr=False, default_factory=dict)
+
+    @property
+    def max_interval_width(self) -> float:
+        return max(high - low for low, high in self.intervals.values())
+
+
+def _roll_kept(
+    rng: np.random.Generator,
+    samples: int,
+    dice_mod: int,
+    hook: Optional[DiceHook],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Roll ``samples`` pools; return (kept sums, sums of the highest dice)."""
+    rolls = rng.integers(1, DICE_SIDES + 1, size=(samples, KEEP_DICES + abs(dice_mod)))
+    if hook is not None:
+        rolls = hook(rolls, rng)
+    rolls.sort(axis=1)
+    highest = rolls[:, -KEEP_DICES:].sum(axis=1)
+    kept = highest if dice_mod >= 0 else rolls[:, :KEEP_DICES].sum(axis=1)
+    return kept, highest
+
+
+def _simulate_chunk(
+    attack: AttackInput,
+    samples: int,
+    seed: np.random.SeedSequence,
+    hit_dice_hook: Optional[DiceHook] = None,
+    injury_dice_hook: Optional[DiceHook] = None,
+) -> List[int]:
+    """Outcome counts for one chunk: Miss first, then each injury band."""
+    rng = np.random.default_rng(seed)
+    kept, highest = _roll_kept(rng, samples, attack.hit_dice_mod, hit_dice_hook)
+
+    hit = kept + attack.hit_roll_mod >= attack.hit_target_number
+    crit_bonus = 2 if attack.weapon_is_critical else 1
+    injury_mod = attack.injury_dice_mod + np.where(highest == CRIT_RESULT, crit_bonus, 0)
+
+    totals = np.empty(samples, dtype=np.int64)
+    for dice_mod in np.unique(injury_mod[hit]):
+        rows = hit & (injury_mod == dice_mod)
+        totals[rows], _ = _roll_kept(rng, int(rows.sum()), int(dice_mod), injury_dice_hook)
+    totals += attack.injury_roll_mod - attack.target_armor
+
+    counts = [int(samples - hit.sum())]
+    unassigned = hit.copy()
+    for band in attack.injury_bands:
+        matches = unassigned & (totals >= band.min_value)
+        if band.max_value is not None:
+            matches &= totals <= band.max_value
+        counts.append(int(matches.sum()))
+        unassigned &= ~matches
+    return counts
+
+
+def _wilson_interval(successes: int, samples: int, z: float) -> Tuple[float, float]:
+    p = successes / samples
+    denom = 1 + z * z / samples
+    centre = (p + z * z / (2 * samples)) / denom
+    half = z * sqrt(p * (1 - p) / samples + z * z / (4 * samples * samples)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def simulate_attack_outcome(
+    attack: AttackInput,
+    ci_width: float = 0.002,
+    confidence: float = 0.95,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_samples: int = DEFAULT_MAX_SAMPLES,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    hit_dice_hook: Optional[DiceHook] = None,
+    injury_dice_hook: Optional[DiceHook] = None,
+) -> SimulationResult:
+    """Estimate attack outcome probabilities by rolling dice in NumPy batches.
+
+    Chunks of ``chunk_size`` attacks are rolled ``workers`` at a time (in a
+    process pool when ``workers > 1``), each from its own child of one
+    SeedSequence so runs are reproducible for a given ``seed`` and worker
+    count.  Sampling stops once every Wilson interval at ``confidence`` is
+    narrower than ``ci_width`` or ``max_samples`` is reached.
+    """
+    attack.validate()
+    labels = ["Miss"] + [band.label for band in attack.injury_bands]
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    root = np.random.SeedSequence(seed)
+    totals = [0] * len(labels)
+    samples = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            round_size = min(workers, max(1, -(-(max_samples - samples) // chunk_size)))
+            seeds = root.spawn(round_size)
+            args = [(attack, chunk_size, child, hit_dice_hook, injury_dice_hook) for child in seeds]
+            if executor is None:
+                chunks = [_simulate_chunk(*arg) for arg in args]
+            else:
+                chunks = list(executor.map(_simulate_chunk, *zip(*args)))
+
+            for chunk in chunks:
+                totals = [total + count for total, count in zip(totals, chunk)]
+            samples += chunk_size * round_size
+
+            intervals = {label: _wilson_interval(count, samples, z) for label, count in zip(labels, totals)}
+            widest = max(high - low for low, high in intervals.values())
+            if widest <= ci_width or samples >= max_samples:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Results are keyed like attack_outcome_probabilities; duplicate labels merge.
+    probabilities: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for label, count in zip(labels, totals):
+        counts[label] = counts.get(label, 0) + count
+        probabilities[label] = counts[label] / samples
+    return SimulationResult(
+        probabilities=probabilities,
+        intervals={label: _wilson_interval(count, samples, z) for label, count in counts.items()},
+        samples=samples,
+        confidence=confidence,
+        counts=counts,
+    )
+
+
+def cross_check(attack: AttackInput, result: SimulationResult) -> Dict[str, float]:
+    """Exact probabilities that fall outside the simulated intervals.
+
+    Only meaningful for runs without dice hooks, i.e. configurations the
+    exact engine can express.  An empty dict means the simulation agrees.
+    """
+    exact = attack_outcome_probabilities(attack)
+    return {
+        label: p
+        for label, p in exact.items()
+        if not result.intervals[label][0] <= p <= result.intervals[label][1]
+    }
@@ -0,0 +1,190 @@
+"""Inverse queries: the modifier or TN needed to reach a target probability.
+
+Hit chance and every "band or worse" injury chance move in one direction as
+a single AttackInput field changes, so the values meeting a target form one
+run at an end of the field's range and a binary search finds its edge in a
+logarithmic number of evaluations.  Each evaluation is a memoized engine
+call, and hit chances read straight off the dice-sum survival sums.
+
+Two cases are walked value by value instead.  Below zero, ``hit_dice_mod``
+keeps the lowest two dice but extra dice still raise the chance that the
+highest two crit, so injury outcomes can move either way there.  And when
+an injury table leaves gaps, "band or worse" does not cover every total
+above the band, so it need not grow with the injury roll.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional
+
+from .logic import (
+    DICE_SIDES,
+    KEEP_DICES,
+    MAX_DICE_MOD,
+    AttackInput,
+    compile_injury_bands,
+    injury_band_runs,
+    lookup_outcome_probabilities,
+    success_probability,
+)
+
+HIT_OUTCOME = "Hit"
+
+# Field -> whether raising it raises every outcome probability.
+SOLVE_FIELDS: Dict[str, bool] = {
+    "hit_target_number": False,
+    "hit_dice_mod": True,
+    "hit_roll_mod": True,
+    "injury_dice_mod": True,
+    "injury_roll_mod": True,
+    "target_armor": False,
+}
+
+# Probabilities this close to the target count as meeting it.
+TOLERANCE = 1e-12
+
+MIN_SUM = KEEP_DICES
+MAX_SUM = KEEP_DICES * DICE_SIDES
+
+
+@dataclass(frozen=True)
+class Solution:
+    field: str
+    value: Optional[int]  # None when no value in the range meets the target
+    probability: Optional[float]  # at ``value``
+    search_range: range
+    evaluations: int
+
+
+def outcome_labels(attack: AttackInput):
+    return [HIT_OUTCOME] + [band.label for band in attack.injury_bands]
+
+
+def outcome_probability(attack: AttackInput, outcome: str = HIT_OUTCOME) -> float:
+    """P(hit), or P(``outcome`` band or a later one) with bands ordered mildest first."""
+    if outcome == HIT_OUTCOME:
+        return success_probability(attack.hit_target_number, attack.hit_dice_mod, attack.hit_roll_mod)
+    labels = [band.label for band in attack.injury_bands]
+    if outcome not in labels:
+        raise ValueError(f"Unknown outcome {outcome!r}.")
+    result = lookup_outcome_probabilities(attack)
+    return sum(result.get(label, 0.0) for label in labels[labels.index(outcome):])
+
+
+def search_range(attack: AttackInput, field: str) -> range:
+    """Every value of ``field`` that can change an outcome, with everything else fixed.
+
+    Beyond either end the hit threshold or injury totals clamp, so the
+    probabilities stay as they are at that end.
+    """
+    if field == "hit_target_number":
+        return range(max(MIN_SUM, MIN_SUM + attack.hit_roll_mod), MAX_SUM + 2 + attack.hit_roll_mod)
+    if field == "hit_roll_mod":
+        return range(attack.hit_target_number - MAX_SUM - 1, attack.hit_target_number - MIN_SUM + 1)
+    if field in ("hit_dice_mod", "injury_dice_mod"):
+        return range(-MAX_DICE_MOD, MAX_DICE_MOD + 1)
+
+    start, index = compile_injury_bands(tuple(attack.injury_bands))
+    # Net injury mods where the totals [MIN_SUM + net, MAX_SUM + net] still meet the compiled index.
+    net_low, net_high = start - MAX_SUM, start + len(index) - 1 - MIN_SUM
+    if field == "injury_roll_mod":
+        return range(net_low + attack.target_armor, net_high + attack.target_armor + 1)
+    if field == "target_armor":
+        return range(max(0, attack.injury_roll_mod - net_high), max(0, attack.injury_roll_mod - net_low) + 1)
+    raise ValueError(f"Cannot solve for {field!r}.")
+
+
+def worse_is_upward_closed(attack: AttackInput, outcome: str) -> bool:
+    """Whether ``outcome`` or worse covers exactly the totals from some value up."""
+    position = [band.label for band in attack.injury_bands].index(outcome)
+    runs = injury_band_runs(tuple(attack.injury_bands))
+    worse = [run for run in runs if run[0] >= position]
+    return (
+        bool(worse)
+        and list(runs[-len(worse):]) == worse
+        and worse[-1][2] is None
+        and all(previous[2] + 1 == current[1] for previous, current in zip(worse, worse[1:]))
+    )
+
+
+def _edge(values: range, feasible: Callable[[int], bool], suffix: bool) -> Optional[int]:
+    """Edge of a monotone feasible run at the top (``suffix``) or bottom of ``values``."""
+    ordered = values if suffix else values[::-1]
+    position = bisect_left(ordered, True, key=feasible)
+    return ordered[position] if position < len(ordered) else None
+
+
+def _walk(values: range, feasible: Callable[[int], bool], suffix: bool) -> Optional[int]:
+    """Edge of the feasible run at the same end as _edge, one value at a time."""
+    value = None
+    for candidate in reversed(values) if suffix else values:
+        if not feasible(candidate):
+            break
+        value = candidate
+    return value
+
+
+def solve(
+    attack: AttackInput,
+    field: str,
+    target: float,
+    outcome: str = HIT_OUTCOME,
+    at_most: bool = False,
+    values: Optional[range] = None,
+) -> Solution:
+    """The least favourable value of ``field`` at which ``outcome`` still meets ``target``.
+
+    The probability must be at least ``target``, or at most with ``at_most``.
+    The answer is the edge of the run of qualifying values: the fewest dice
+    or smallest bonus needed, the highest TN or armor still good enough, or
+    the least armor that keeps a result rare enough.  ``values`` defaults to
+    search_range(attack, field).
+    """
+    if field not in SOLVE_FIELDS:
+        raise ValueError(f"Cannot solve for {field!r}.")
+    if outcome not in outcome_labels(attack):
+        raise ValueError(f"Unknown outcome {outcome!r}.")
+    values = search_range(attack, field) if values is None else values
+    probabilities: Dict[int, float] = {}
+
+    def feasible(value: int) -> bool:
+        if value not in probabilities:
+            probabilities[value] = outcome_probability(replace(attack, **{field: value}), outcome)
+        p = probabilities[value]
+        return p <= target + TOLERANCE if at_most else p >= target - TOLERANCE
+
+    # Qualifying values run up to the top of the range when raising the field helps meet the target.
+    suffix = SOLVE_FIELDS[field] != at_most
+    if outcome != HIT_OUTCOME and not worse_is_upward_closed(attack, outcome):
+        value = _walk(values, feasible, suffix)
+    elif field == "hit_dice_mod" and outcome != HIT_OUTCOME and values and values[0] < 0:
+        value = _solve_hit_dice(values, feasible, suffix)
+    else:
+        value = _edge(values, feasible, suffix)
+
+    return Solution(
+        field=field,
+        value=value,
+        probability=None if value is None else probabilities[value],
+        search_range=values,
+        evaluations=len(probabilities),
+    )
+
+
+def _solve_hit_dice(values: range, feasible: Callable[[int], bool], suffix: bool) -> Optional[int]:
+    # Binary search where extra dice are kept highest; walk the penalty dice.
+    penalty = values[: bisect_left(values, 0)]
+    bonus = values[len(penalty):]
+    if not bonus:
+        return _walk(penalty, feasible, suffix)
+    if suffix:
+        value = _edge(bonus, feasible, suffix)
+        if value != bonus[0] or not feasible(penalty[-1]):
+            return value
+        return _walk(penalty, feasible, suffix)
+    value = _walk(penalty, feasible, suffix)
+    if value != penalty[-1] or not feasible(bonus[0]):
+        return value
+    return _edge(bonus, feasible, suffix)
@@ -0,0 +1,49 @@
+"""Helpers shared by the test suite and the benchmarks."""
+
+from .models import Keyword, UnitProfile, Weapon
+from .result_cache import bump_versions
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "calculator": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "calculator-tests"},
+}
+
+
+def seed_catalog(size):
+    """Top the catalog up to ``size`` keywords, weapons and profiles, all cross-linked."""
+    start = Keyword.objects.count()
+    Keyword.objects.bulk_create(
+        Keyword(name=f"Keyword {i:04d}", ranged_dice_mod=i % 2, armor_mod=i % 3 - 1) for i in range(start, size)
+    )
+    Weapon.objects.bulk_create(
+        Weapon(name=f"Weapon {i:04d}", range_type=Weapon.RANGE_RANGED if i % 2 else Weapon.RANGE_MELEE)
+        for i in range(Weapon.objects.count(), size)
+    )
+    UnitProfile.objects.bulk_create(
+        UnitProfile(name=f"Profile {i:04d}", ranged_dice_mod=i % 3, armor=i % 4)
+        for i in range(UnitProfile.objects.count(), size)
+    )
+
+    keywords = list(Keyword.objects.values_list("pk", flat=True))
+    weapons = list(Weapon.objects.values_list("pk", flat=True))
+    profiles = list(UnitProfile.objects.values_list("pk", flat=True))
+    Weapon.keywords.through.objects.all().delete()
+    UnitProfile.keywords.through.objects.all().delete()
+    UnitProfile.weapons.through.objects.all().delete()
+    Weapon.keywords.through.objects.bulk_create(
+        Weapon.keywords.through(weapon_id=pk, keyword_id=keywords[i % len(keywords)]) for i, pk in enumerate(weapons)
+    )
+    UnitProfile.keywords.through.objects.bulk_create(
+        UnitProfile.keywords.through(unitprofile_id=pk, keyword_id=keywords[(i + offset) % len(keywords)])
+        for i, pk in enumerate(profiles)
+        for offset in (0, 1)
+    )
+    UnitProfile.weapons.through.objects.bulk_create(
+        UnitProfile.weapons.through(unitprofile_id=pk, weapon_id=weapons[(i + offset) % len(weapons)])
+        for i, pk in enumerate(profiles)
+        for offset in (0, 1)
+    )
+    UnitProfile.refresh_keyword_totals()
+    Weapon.refresh_keyword_totals()
+    # Bulk writes bypass the signals that invalidate cached results.
+    bump_versions()
@@ -1,3 +1,851 @@
-from django.test import TestCase
+import importlib.util
+import csv
+import io
+import itertools
+import json
+import tempfile
+import unittest
+from unittest import mock
+from dataclasses import replace
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import async_views, catalog_io, cli, logic, result_cache, signals, solver, views
+from .loadouts import optimize_loadout
+from .compute import shutdown_executor
+from .models import InjuryBandSet, Keyword, Matchup, UnitProfile, Weapon
+from .result_cache import cache_stats, get_cache, reset_cache_stats
+from .testing import LOCMEM_CACHES, seed_catalog
+
+CATALOG_SIZES = (10, 100, 1000)
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CalculatorTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_cache_stats()
+
+
+class QueryBudgetTests(CalculatorTestCase):
+    """Each page runs a fixed number of queries no matter how large the catalog is."""
+
+    def assertQueryBudget(self, budget, request):
+        for size in CATALOG_SIZES:
+            with self.subTest(catalog_size=size):
+                seed_catalog(size)
+                with self.assertNumQueries(budget):
+                    response = request()
+                self.assertEqual(response.status_code, 200)
+
+    def test_calculator_get(self):
+        # profiles, weapons, injury tables, attacker weapons, profile keywords, weapon keywords
+        self.assertQueryBudget(6, lambda: self.client.get(reverse("calculator")))
+
+    def test_calculator_post(self):
+        def post():
+            attacker, defender = UnitProfile.objects.all()[:2]
+            data = {
+                "attack-attacker_profile": attacker.pk,
+                "attack-defender_profile": defender.pk,
+                "attack-attack_type": "ranged",
+                "attack-hit_target_number": 7,
+                "attack-extra_hit_dice_mod": 1,
+                "attack-hit_roll_mod": 0,
+                "attack-injury_dice_mod": 0,
+                "attack-injury_roll_mod": 2,
+                "attack-extra_target_armor": 0,
+            }
+            with self.assertNumQueries(6):
+                return self.client.post(reverse("calculator"), data)
+
+        for size in CATALOG_SIZES:
+            with self.subTest(catalog_size=size):
+                seed_catalog(size)
+                response = post()
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNotNone(response.context["results"])
+
+    def test_profile_list(self):
+        # exists, profile page, its keywords, its weapons; form choices load from catalog_options
+        self.assertQueryBudget(4, lambda: self.client.get(reverse("profile_list")))
+
+    def test_weapon_list(self):
+        # weapon page, its keywords
+        self.assertQueryBudget(2, lambda: self.client.get(reverse("weapon_list")))
+
+    def test_keyword_list(self):
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("keyword_list")))
+
+
+class TimingMiddlewareTests(CalculatorTestCase):
+    def get_logged(self, *args):
+        with self.assertLogs("calculator.timing", "INFO") as logs:
+            response = self.client.get(*args)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_header_and_log_count_queries(self):
+        seed_catalog(10)
+        with CaptureQueriesContext(connection) as queries:
+            response, record = self.get_logged(reverse("keyword_list"))
+        self.assertEqual(record["queries"], len(queries))
+        self.assertIn(f'desc="{len(queries)} queries"', response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertNotIn("profile", record)
+
+        with override_settings(CALCULATOR_SERVER_TIMING=False):
+            self.assertNotIn("Server-Timing", self.client.get(reverse("keyword_list")))
+
+    def test_profiling_switch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(CALCULATOR_PROFILE_DIR=Path(directory)):
+                # ?profile=1 is only honoured for staff.
+                _, record = self.get_logged(reverse("keyword_list"), {"profile": "1"})
+                self.assertNotIn("profile", record)
+                with override_settings(CALCULATOR_PROFILE_REQUESTS=True):
+                    _, record = self.get_logged(reverse("keyword_list"))
+            self.assertTrue(Path(record["profile"]).is_file())
+            self.assertEqual(Path(record["profile"]).parent, Path(directory))
+
+
+class CatalogPageTests(CalculatorTestCase):
+    def walk(self, url, params):
+        names = []
+        while True:
+            context = self.client.get(url, params).context
+            names += [row.name for row in context["page"]["rows"]]
+            if not context["page"]["next_after"]:
+                return names, context
+            params = dict(params, after=context["page"]["next_after"])
+
+    def test_keyset_pages_cover_search_results_in_order(self):
+        seed_catalog(200)
+        for url, model in ((reverse("keyword_list"), Keyword), (reverse("weapon_list"), Weapon)):
+            with self.subTest(url=url):
+                expected = list(model.objects.filter(name__icontains="1").values_list("name", flat=True))
+                names, last = self.walk(url, {"q": "1"})
+                self.assertEqual(names, expected)
+                self.assertGreater(len(expected), views.PAGE_SIZE)
+                previous = self.client.get(url, {"q": "1", "before": last["page"]["previous_before"]}).context
+                self.assertEqual(previous["page"]["rows"][-1].name, names[-len(last["page"]["rows"]) - 1])
+
+    def test_forms_render_only_selected_options(self):
+        seed_catalog(100)
+        profile = UnitProfile.objects.first()
+        response = self.client.get(reverse("profile_list"), {"edit": profile.pk})
+        self.assertEqual(response.content.count(b"<option"), profile.keywords.count() + profile.weapons.count())
+        self.assertContains(response, f'data-options-url="{reverse("catalog_options", args=["keywords"])}"')
+
+        response = self.client.get(reverse("catalog_options", args=["weapons"]), {"q": "Weapon 005", "limit": 5})
+        data = response.json()
+        self.assertEqual([item["name"] for item in data["results"]], [f"Weapon 005{i}" for i in range(5)])
+        self.assertEqual(data["next"], "Weapon 0054")
+        self.assertEqual(self.client.get(reverse("catalog_options", args=["users"])).status_code, 404)
+
+
+class DatabaseTuningTests(CalculatorTestCase):
+    def test_pragmas_apply_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            (original,) = cursor.fetchone()
+            with override_settings(CALCULATOR_SQLITE_PRAGMAS={"cache_size": -1234}):
+                signals.configure_sqlite(sender=connection.__class__, connection=connection)
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone(), (-1234,))
+            cursor.execute(f"PRAGMA cache_size = {original}")
+
+    def test_keyword_owner_lookups_use_covering_indexes(self):
+        seed_catalog(10)
+        keyword = Keyword.objects.first()
+        for related in (keyword.unit_profiles, keyword.weapons):
+            sql, params = related.order_by().values_list("pk", flat=True).query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn("COVERING INDEX", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ResultCacheTests(CalculatorTestCase):
+    def test_repeat_request_skips_result_queries(self):
+        seed_catalog(10)
+        self.client.get(reverse("calculator"))
+        # Only the form's profile, weapon and injury table choices are loaded on a hit.
+        with self.assertNumQueries(3):
+            self.client.get(reverse("calculator"))
+        stats = cache_stats()
+        self.assertEqual((stats["result_hits"], stats["result_misses"]), (1, 1))
+
+    def test_catalog_changes_invalidate_results(self):
+        seed_catalog(10)
+        first = self.client.get(reverse("calculator")).context["results"]
+
+        profile = UnitProfile.objects.get(pk=first["defender"].pk)
+        profile.armor += 3
+        profile.save()
+        second = self.client.get(reverse("calculator")).context["results"]
+        self.assertEqual(second["target_armor"], first["target_armor"] + 3)
+
+        keyword = Keyword.objects.create(name="Extra plate", armor_mod=1)
+        profile.keywords.add(keyword)
+        third = self.client.get(reverse("calculator")).context["results"]
+        self.assertEqual(third["target_armor"], second["target_armor"] + 1)
+        self.assertEqual(cache_stats()["result_misses"], 3)
+
+    def test_engine_version_keys_outcomes_and_results(self):
+        seed_catalog(10)
+        self.client.get(reverse("calculator"))
+        # As if CRIT_RESULT had changed.
+        rules = result_cache.ENGINE_VERSION[:-1] + (logic.CRIT_RESULT - 1,)
+        with mock.patch.object(result_cache, "ENGINE_VERSION", rules):
+            self.client.get(reverse("calculator"))
+        stats = cache_stats()
+        self.assertEqual((stats["result_hits"], stats["outcome_hits"]), (0, 0))
+        self.assertEqual((stats["result_misses"], stats["outcome_misses"]), (2, 2))
+
+
+class AsyncViewTests(CalculatorTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_executor()
+        super().tearDownClass()
+
+    def scenarios_request(self):
+        # hit_dice_mod 9 is outside the outcome table, so it needs the pool.
+        scenarios = [
+            {"hit_target_number": 7, "hit_dice_mod": 9, "injury_roll_mod": 2, "target_armor": 1},
+            {"hit_target_number": 8, "hit_dice_mod": 1},
+        ]
+        return AsyncRequestFactory().post(
+            reverse("calculate_api"), json.dumps(scenarios), content_type="application/json"
+        )
+
+    async def test_calculator_matches_sync_view(self):
+        await sync_to_async(seed_catalog)(10)
+        response = await async_views.calculator_view(AsyncRequestFactory().get(reverse("calculator")))
+        self.assertEqual(response.status_code, 200)
+        expected = (await sync_to_async(self.client.get)(reverse("calculator"))).context["results"]
+        for label in ("hit_probability", "miss_probability", "any_injury_probability"):
+            self.assertContains(response, expected[label])
+
+    async def test_calculator_on_empty_catalog(self):
+        await UnitProfile.objects.all().adelete()
+        await Weapon.objects.all().adelete()
+        response = await async_views.calculator_view(AsyncRequestFactory().get(reverse("calculator")))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Baseline")
+
+    async def test_api_matches_sync_view(self):
+        response = await async_views.calculate_api(self.scenarios_request())
+        self.assertEqual(response.status_code, 200)
+        expected = await sync_to_async(views.calculate_api)(self.scenarios_request())
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    @override_settings(CALCULATOR_COMPUTE_MAX_PENDING=0)
+    async def test_saturated_pool_answers_503(self):
+        response = await async_views.calculate_api(self.scenarios_request())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+class SweepTests(CalculatorTestCase):
+    def test_json_and_csv_stream_the_same_grid(self):
+        seed_catalog(2)
+        attacker, defender = UnitProfile.objects.all()[:2]
+        params = {
+            "attacker_profile": attacker.pk,
+            "defender_profile": defender.pk,
+            "x_axis": "hit_target_number",
+            "x_start": 5,
+            "x_stop": 8,
+            "y_axis": "extra_hit_dice_mod",
+            "y_start": -1,
+            "y_stop": 1,
+        }
+        response = self.client.get(reverse("sweep"), params)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([row["x"] for row in data["rows"]], [5, 6, 7, 8])
+        self.assertEqual([cell["y"] for cell in data["rows"][0]["cells"]], [-1, 0, 1])
+
+        scenario = {
+            "attacker_profile": attacker.pk,
+            "defender_profile": defender.pk,
+            "hit_target_number": 7,
+            "extra_hit_dice_mod": 1,
+        }
+        api = self.client.post(reverse("calculate_api"), json.dumps([scenario]), content_type="application/json")
+        cell = data["rows"][2]["cells"][2]
+        self.assertEqual({label: cell[label] for label in data["labels"]}, api.json()["results"][0]["outcome"])
+
+        response = self.client.get(reverse("sweep"), {**params, "output_format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, *rows = csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        self.assertEqual(header, ["hit_target_number", "extra_hit_dice_mod"] + data["labels"])
+        expected = [
+            [row["x"], cell["y"]] + [cell[label] for label in data["labels"]]
+            for row in data["rows"]
+            for cell in row["cells"]
+        ]
+        self.assertEqual([[int(x), int(y)] + [float(value) for value in values] for x, y, *values in rows], expected)
+
+
+class MatchupTests(CalculatorTestCase):
+    def test_command_fills_matrix(self):
+        seed_catalog(3)
+        out = io.StringIO()
+        call_command("compute_matchups", workers=1, injury_roll_mod=1, stdout=out)
+        profiles = list(UnitProfile.objects.prefetch_related("weapons"))
+        rows = sum(max(1, len(profile.weapons.all())) for profile in profiles) * len(profiles)
+        self.assertEqual(Matchup.objects.count(), rows)
+        self.assertIn(f"Stored {rows} matchups", out.getvalue())
+
+        matchup = Matchup.objects.exclude(weapon=None).first()
+        scenario = {
+            "attacker_profile": matchup.attacker_id,
+            "weapon": matchup.weapon_id,
+            "defender_profile": matchup.defender_id,
+            "injury_roll_mod": 1,
+        }
+        response = self.client.post(reverse("calculate_api"), json.dumps([scenario]), content_type="application/json")
+        self.assertEqual(matchup.outcome, response.json()["results"][0]["outcome"])
+
+        response = self.client.get(reverse("matchup_matrix"), {"metric": "Down"})
+        self.assertEqual(response.context["metric"], "Down")
+        self.assertEqual(len(response.context["defenders"]), len(profiles))
+        self.assertEqual(sum(len(row["cells"]) for row in response.context["rows"]), rows)
+        (row,) = [
+            row
+            for row in response.context["rows"]
+            if row["attacker"].pk == matchup.attacker_id and row["weapon"].pk == matchup.weapon_id
+        ]
+        column = [defender.pk for defender in response.context["defenders"]].index(matchup.defender_id)
+        self.assertEqual(row["cells"][column], views._as_percent(matchup.outcome["Down"]))
+
+
+class InputBoundsTests(CalculatorTestCase):
+    def test_dice_mods_are_bounded(self):
+        scenario = {"hit_target_number": 7, "hit_dice_mod": 300}
+        response = self.client.post(reverse("calculate_api"), json.dumps([scenario]), content_type="application/json")
+        self.assertIn("hit_dice_mod", response.json()["results"][0]["errors"])
+
+        seed_catalog(2)
+        profile = UnitProfile.objects.first()
+        sweep = {"attacker_profile": profile.pk, "defender_profile": profile.pk, "x_axis": "injury_dice_mod"}
+        response = self.client.get(reverse("sweep"), {**sweep, "x_start": 0, "x_stop": 30})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("x_stop", response.json()["errors"])
+        response = self.client.get(reverse("sweep"), {**sweep, "x_start": -20, "x_stop": 20})
+        self.assertEqual(response.status_code, 200)
+
+        out = io.StringIO()
+        cli.run(io.StringIO("hit_target_number,hit_dice_mod\n7,300\n"), out)
+        self.assertIn("hit_dice_mod must be between -20 and 20.", out.getvalue())
+
+    def test_resolved_totals_and_roll_mods_are_bounded(self):
+        attacker = UnitProfile.objects.create(name="Gunline", ranged_dice_mod=15)
+        defender = UnitProfile.objects.create(name="Target")
+        scenarios = [
+            {"attacker_profile": attacker.pk, "defender_profile": defender.pk, "extra_hit_dice_mod": 10},
+            {"attacker_profile": attacker.pk, "defender_profile": defender.pk, "extra_hit_dice_mod": 5},
+            {"hit_target_number": 7, "hit_roll_mod": 50, "target_armor": -30},
+        ]
+        response = self.client.post(reverse("calculate_api"), json.dumps(scenarios), content_type="application/json")
+        results = response.json()["results"]
+        self.assertIn("hit_dice_mod", results[0]["errors"])
+        self.assertEqual(results[1]["attack"]["hit_dice_mod"], 20)
+        self.assertEqual(set(results[2]["errors"]), {"hit_roll_mod", "target_armor"})
+
+        data = {
+            "attack-attacker_profile": attacker.pk,
+            "attack-defender_profile": defender.pk,
+            "attack-attack_type": "ranged",
+            "attack-hit_target_number": 7,
+            "attack-extra_hit_dice_mod": 10,
+            "attack-hit_roll_mod": 0,
+            "attack-injury_dice_mod": 0,
+            "attack-injury_roll_mod": 2,
+            "attack-extra_target_armor": 0,
+        }
+        response = self.client.post(reverse("calculator"), data)
+        self.assertIsNone(response.context["results"])
+        self.assertIn("extra_hit_dice_mod", response.context["attack_form"].errors)
+
+        sweep = {"attacker_profile": attacker.pk, "defender_profile": defender.pk, "x_axis": "extra_hit_dice_mod"}
+        response = self.client.get(reverse("sweep"), {**sweep, "x_start": 0, "x_stop": 10})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hit_dice_mod", response.json()["errors"])
+        response = self.client.get(reverse("sweep"), {**sweep, "x_start": 0, "x_stop": 5})
+        self.assertEqual(response.status_code, 200)
+
+
+class CliTests(CalculatorTestCase):
+    def run_cli(self, text, **kwargs):
+        out = io.StringIO()
+        cli.run(io.StringIO(text), out, **kwargs)
+        return out.getvalue().splitlines()
+
+    def test_csv_rows_keep_order_and_report_errors(self):
+        lines = self.run_cli(
+            "hit_target_number,hit_dice_mod,injury_roll_mod\n7,2,2\nseven,0,0\n7,2,2\n", chunk_size=2
+        )
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[1], lines[3])
+        self.assertTrue(lines[2].endswith("hit_target_number must be an integer."))
+
+    def test_profile_rows_match_api(self):
+        seed_catalog(10)
+        attacker, defender = UnitProfile.objects.all()[:2]
+        scenario = {"attacker_profile": attacker.pk, "defender_profile": defender.pk, "hit_target_number": 7}
+        (line,) = self.run_cli(json.dumps(scenario) + "\n")
+        response = self.client.post(reverse("calculate_api"), json.dumps([scenario]), content_type="application/json")
+        expected = response.json()["results"][0]
+        self.assertEqual(json.loads(line), {"attack": expected["attack"], "outcome": expected["outcome"]})
+
+
+class DistributionTests(SimpleTestCase):
+    def test_tail_and_band_masses_match_direct_sums(self):
+        dist = logic.Distribution.from_counts({2: 1, 3: 2, 4: 3, 6: 4}, 10)
+        self.assertEqual(dist.to_dict(), {2: 0.1, 3: 0.2, 4: 0.3, 5: 0.0, 6: 0.4})
+        shifted = dist.shifted(-3)
+        self.assertIs(shifted.probs, dist.probs)
+        for value in range(-3, 9):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(shifted.at_least(value), sum(p for v, p in shifted if v >= value))
+                self.assertAlmostEqual(shifted.below(value), sum(p for v, p in shifted if v < value))
+                self.assertAlmostEqual(shifted.between(value, 2), sum(p for v, p in shifted if value <= v <= 2))
+        self.assertAlmostEqual(dist.between(None, None), 1.0)
+
+    def test_stages_match_brute_force_exactly(self):
+        for dice_mod in range(-3, 4):
+            num_dice = logic.KEEP_DICES + abs(dice_mod)
+            sums, branches = {}, {}
+            for rolls in itertools.product(range(1, logic.DICE_SIDES + 1), repeat=num_dice):
+                ordered = sorted(rolls)
+                kept = sum(ordered[-logic.KEEP_DICES:] if dice_mod >= 0 else ordered[:logic.KEEP_DICES])
+                critical = sum(ordered[-logic.KEEP_DICES:]) == logic.CRIT_RESULT
+                sums[kept] = sums.get(kept, 0) + 1
+                branches[(kept, critical)] = branches.get((kept, critical), 0) + 1
+            total = logic.DICE_SIDES**num_dice
+            with self.subTest(dice_mod=dice_mod):
+                self.assertEqual(
+                    logic.dice_sum_distribution(num_dice, dice_mod >= 0), {k: c / total for k, c in sums.items()}
+                )
+                self.assertEqual(logic.hit_crit_branches(dice_mod), {k: c / total for k, c in branches.items()})
+
+    def test_attack_statistics_match_enumeration(self):
+        attack = logic.AttackInput(
+            hit_target_number=8,
+            hit_dice_mod=-2,
+            hit_roll_mod=1,
+            weapon_is_critical=True,
+            injury_bands=logic.DEFAULT_INJURY_BANDS,
+            injury_dice_mod=1,
+            injury_roll_mod=2,
+            target_armor=3,
+        )
+        stats = logic.attack_statistics(attack)
+        self.assertEqual(stats.outcome, logic.attack_outcome_probabilities(attack))
+
+        margins, totals, crit = {}, {}, 0.0
+        for (kept_sum, critical), p in logic.hit_crit_branches(attack.hit_dice_mod).items():
+            margin = kept_sum + attack.hit_roll_mod - attack.hit_target_number
+            margins[margin] = margins.get(margin, 0.0) + p
+            if margin < 0:
+                continue
+            crit += p if critical else 0.0
+            dice_mod = attack.injury_dice_mod + (2 if critical else 0)
+            for value, q in logic.dice_sum_distribution(2 + abs(dice_mod), dice_mod >= 0).items():
+                total = value + attack.injury_roll_mod - attack.target_armor
+                totals[total] = totals.get(total, 0.0) + p * q
+
+        def moments(dist):
+            mass = sum(dist.values())
+            mean = sum(v * p for v, p in dist.items()) / mass
+            return mean, sum((v - mean) ** 2 * p for v, p in dist.items()) / mass
+
+        self.assertAlmostEqual(stats.crit_probability, crit)
+        for actual, expected in zip(
+            (stats.hit_margin_mean, stats.hit_margin_variance, stats.injury_total_mean, stats.injury_total_variance),
+            moments(margins) + moments(totals),
+        ):
+            self.assertAlmostEqual(actual, expected)
+        for total, p in totals.items():
+            self.assertAlmostEqual(stats.injury_totals.between(total, total), p)
+        self.assertAlmostEqual(stats.injury_totals.mass(), 1.0 - stats.outcome["Miss"])
+
+    def test_overlapping_bands_resolve_to_first_match(self):
+        bands = (logic.InjuryBand(3, 7, "Wounded"), logic.InjuryBand(5, 8, "Down"), logic.InjuryBand(10, None, "Dead"))
+        self.assertEqual(logic.injury_band_runs(bands), ((0, 3, 7), (1, 8, 8), (2, 10, None)))
+        self.assertEqual(logic.injury_band_runs((logic.InjuryBand(4, None, "Out"),)), ((0, 4, None),))
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+class BatchTests(SimpleTestCase):
+    def test_matches_scalar_engine(self):
+        from . import batch
+
+        gapped = [logic.InjuryBand(3, 5, "Grazed"), logic.InjuryBand(8, 9, "Down"), logic.InjuryBand(11, None, "Out")]
+        for bands in (logic.DEFAULT_INJURY_BANDS, gapped):
+            attacks = [
+                logic.AttackInput(
+                    hit_target_number=tn,
+                    hit_dice_mod=hit_dice_mod,
+                    hit_roll_mod=roll_mod,
+                    weapon_is_critical=critical,
+                    injury_bands=bands,
+                    injury_dice_mod=injury_dice_mod,
+                    injury_roll_mod=2,
+                    target_armor=armor,
+                )
+                for tn, hit_dice_mod, roll_mod, critical, injury_dice_mod, armor in itertools.product(
+                    (2, 7, 13), (-2, 0, 3), (-1, 1), (False, True), (-2, 1), (0, 4)
+                )
+            ]
+            matrix = batch.attack_outcome_batch(batch.attack_inputs_to_array(attacks), bands)
+            labels = batch.batch_labels(bands)
+            for row, attack in zip(matrix, attacks):
+                expected = logic.attack_outcome_probabilities(attack)
+                for label, value in zip(labels, row):
+                    self.assertAlmostEqual(value, expected[label], delta=1e-12)
+
+
+class MarkovTests(SimpleTestCase):
+    def test_matrix_power_matches_stepping(self):
+        from . import markov
+
+        attack = logic.AttackInput(
+            hit_target_number=7, injury_bands=logic.DEFAULT_INJURY_BANDS, injury_roll_mod=2, target_armor=1
+        )
+        matrix = markov.transition_matrix(logic.attack_outcome_probabilities(attack))
+        vector = markov._start_vector(markov.HEALTHY)
+        curve = markov.out_of_action_curve(attack, max_attacks=12)
+        for attacks in range(13):
+            with self.subTest(attacks=attacks):
+                stepped = markov.state_after_attacks(attack, attacks)
+                for expected, actual in zip(vector, (stepped[state] for state in markov.INJURY_STATES)):
+                    self.assertAlmostEqual(actual, expected, delta=1e-12)
+                if attacks:
+                    self.assertAlmostEqual(curve[attacks - 1], stepped[markov.OUT_OF_ACTION], delta=1e-12)
+            vector = markov._vecmul(vector, matrix)
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+class SimulationTests(SimpleTestCase):
+    def test_seeded_run_agrees_with_exact_engine(self):
+        from . import simulation
+
+        attack = logic.AttackInput(
+            hit_target_number=7,
+            hit_dice_mod=-1,
+            hit_roll_mod=1,
+            weapon_is_critical=True,
+            injury_bands=logic.DEFAULT_INJURY_BANDS,
+            injury_dice_mod=1,
+            injury_roll_mod=2,
+            target_armor=1,
+        )
+        options = {"ci_width": 0.01, "confidence": 0.999, "chunk_size": 50_000, "seed": 7}
+        result = simulation.simulate_attack_outcome(attack, **options)
+        self.assertLessEqual(result.max_interval_width, 0.01)
+        self.assertEqual(simulation.cross_check(attack, result), {})
+        self.assertEqual(simulation.simulate_attack_outcome(attack, **options).counts, result.counts)
+
+
+class SolverTests(CalculatorTestCase):
+    def scan(self, attack, field, target, outcome, at_most):
+        """The solver's answer by brute force: walk from the favourable end while the target holds."""
+        values = solver.search_range(attack, field)
+        answer = None
+        for value in reversed(values) if solver.SOLVE_FIELDS[field] != at_most else values:
+            p = solver.outcome_probability(replace(attack, **{field: value}), outcome)
+            if (p > target) if at_most else (p < target):
+                break
+            answer = value
+        return answer
+
+    def test_matches_scan(self):
+        attack = logic.AttackInput(
+            hit_target_number=8, hit_dice_mod=-1, injury_bands=logic.DEFAULT_INJURY_BANDS, injury_roll_mod=1
+        )
+        for field in solver.SOLVE_FIELDS:
+            for outcome in solver.outcome_labels(attack):
+                for target, at_most in ((0.8, False), (0.3, False), (0.1, True)):
+                    with self.subTest(field=field, outcome=outcome, target=target, at_most=at_most):
+                        solution = solver.solve(attack, field, target, outcome, at_most)
+                        self.assertEqual(solution.value, self.scan(attack, field, target, outcome, at_most))
+                        if field != "hit_dice_mod" or outcome == solver.HIT_OUTCOME:
+                            self.assertLessEqual(solution.evaluations, len(solution.search_range).bit_length() + 1)
+
+    def test_dice_search_covers_every_accepted_modifier(self):
+        attack = logic.AttackInput(hit_target_number=12, injury_bands=logic.DEFAULT_INJURY_BANDS)
+        solution = solver.solve(attack, "hit_dice_mod", 0.85)
+        self.assertGreater(solution.value, 12)
+        self.assertLessEqual(solution.value, logic.MAX_DICE_MOD)
+        self.assertGreaterEqual(solution.probability, 0.85)
+        self.assertLess(logic.success_probability(12, solution.value - 1), 0.85)
+
+    def test_api_reports_extra_dice_needed(self):
+        seed_catalog(10)
+        attacker, defender = UnitProfile.objects.all()[:2]
+        query = {
+            "attacker_profile": attacker.pk,
+            "defender_profile": defender.pk,
+            "hit_target_number": 9,
+            "solve_for": "hit_dice_mod",
+            "target": 0.8,
+        }
+        result = self.client.get(reverse("solve_api"), query).json()
+        self.assertEqual(result["change"], result["value"] - result["current_value"])
+        self.assertGreaterEqual(result["probability"], 0.8)
+        self.assertLess(logic.success_probability(9, result["value"] - 1), 0.8)
+
+        response = self.client.get(reverse("solve_api"), dict(query, outcome="Dead"))
+        self.assertEqual(response.status_code, 400)
+
+
+class LoadoutTests(CalculatorTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_catalog(4)
+        self.keywords = Keyword.objects.bulk_create(
+            Keyword(name=f"Drill {i:02d}", ranged_dice_mod=i % 5 - 2, melee_dice_mod=(i * 3) % 4 - 1) for i in range(12)
+        )
+        self.weapons = list(Weapon.objects.all())
+        self.attacker = UnitProfile.objects.prefetch_related("keywords", "weapons").first()
+        self.defenders = [(profile, weight) for weight, profile in enumerate(UnitProfile.objects.all(), start=1)]
+
+    def exhaustive_best(self, max_keywords, outcome):
+        situation = {"hit_target_number": 8}
+        best = 0.0
+        for weapon in self.weapons:
+            for count in range(max_keywords + 1):
+                for chosen in itertools.combinations(self.keywords, count):
+                    ranged = weapon.range_type == Weapon.RANGE_RANGED
+                    extra = sum(keyword.ranged_dice_mod if ranged else keyword.melee_dice_mod for keyword in chosen)
+                    search = optimize_loadout(
+                        self.attacker, [weapon], [], self.defenders, outcome, 0, dict(situation, extra_hit_dice_mod=extra)
+                    )
+                    best = max(best, search.best.score)
+        return best
+
+    def test_matches_exhaustive_search(self):
+        for outcome in ("Out of Action", "Down"):
+            with self.subTest(outcome=outcome):
+                search = optimize_loadout(
+                    self.attacker, self.weapons, self.keywords, self.defenders, outcome, 3, {"hit_target_number": 8}
+                )
+                self.assertAlmostEqual(search.best.score, self.exhaustive_best(3, outcome), places=12)
+                self.assertLess(search.nodes_explored, search.loadouts / 4)
+                self.assertLessEqual(len(search.best.keywords), 3)
+
+    def test_api(self):
+        payload = {
+            "attacker_profile": self.attacker.pk,
+            "defenders": [{"profile": profile.pk, "weight": weight} for profile, weight in self.defenders],
+            "weapons": [weapon.pk for weapon in self.weapons],
+            "keywords": [keyword.pk for keyword in self.keywords],
+            "hit_target_number": 8,
+        }
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse("optimize_loadout_api"), json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        best = response.json()["best"]
+        self.assertEqual(len(best["defenders"]), len(self.defenders))
+        self.assertLessEqual(len(best["keywords"]), 2)
+
+        response = self.client.post(
+            reverse("optimize_loadout_api"), json.dumps(dict(payload, keywords=[0])), content_type="application/json"
+        )
+        self.assertEqual(response.json()["errors"], {"keywords": ["No object with id 0."]})
+
+
+class CatalogIoTests(CalculatorTestCase):
+    def snapshot(self):
+        totals = [f"keyword_{key}" for key in ("ranged_dice_mod", "melee_dice_mod", "armor_mod")]
+        return (
+            list(catalog_io.export_lines("jsonl")),
+            list(Weapon.objects.values_list("name", *totals)),
+            list(UnitProfile.objects.values_list("name", *totals)),
+        )
+
+    def test_round_trip_in_bulk(self):
+        seed_catalog(50)
+        expected = self.snapshot()
+        for output_format in ("csv", "jsonl"):
+            with self.subTest(format=output_format):
+                lines = list(catalog_io.export_lines(output_format, chunk_size=16))
+                Keyword.objects.all().delete()
+                Weapon.objects.all().delete()
+                UnitProfile.objects.all().delete()
+                with CaptureQueriesContext(connection) as queries:
+                    counts = catalog_io.import_catalog(iter(lines), output_format)
+                self.assertEqual(counts, {"keyword": 50, "weapon": 50, "profile": 50, "links": 250})
+                self.assertLess(len(queries), 20)
+                self.assertEqual(self.snapshot(), expected)
+
+    def test_upsert_refreshes_totals_and_bad_rows_roll_back(self):
+        seed_catalog(10)
+        keyword = Keyword.objects.get(name="Keyword 0000")
+        profile = keyword.unit_profiles.first()
+        before = profile.keyword_ranged_dice_mod
+
+        catalog_io.import_catalog(['{"kind": "keyword", "name": " Keyword 0000 ", "ranged_dice_mod": 3}\n'], "jsonl")
+        keyword.refresh_from_db()
+        profile.refresh_from_db()
+        self.assertEqual((keyword.ranged_dice_mod, keyword.armor_mod), (3, 0))
+        self.assertEqual(profile.keyword_ranged_dice_mod, before + 3)
+
+        csv_text = "kind,name,armor,keywords\nprofile,New,2,Keyword 0001|Missing\nprofile,,1,\n"
+        expected = self.snapshot()
+        with self.assertRaises(catalog_io.CatalogImportError) as raised:
+            catalog_io.import_catalog(io.StringIO(csv_text), "csv")
+        self.assertEqual(raised.exception.errors, ["Line 3: name is required."])
+        with self.assertRaises(catalog_io.CatalogImportError) as raised:
+            catalog_io.import_catalog(io.StringIO(csv_text.splitlines(True)[0] + csv_text.splitlines(True)[1]), "csv")
+        self.assertEqual(raised.exception.errors, ["Line 2: no keyword named 'Missing'."])
+        self.assertEqual(self.snapshot(), expected)
+
+        response = self.client.get(reverse("catalog_export"), {"format": "jsonl"})
+        self.assertEqual(b"".join(response.streaming_content).decode(), "".join(expected[0]))
+
+
+class OutcomeTableTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "outcome_table.bin"
+        patcher = mock.patch.object(logic, "OUTCOME_TABLE_PATH", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        logic.close_outcome_table()
+        self.addCleanup(logic.close_outcome_table)
+
+    def attack(self, **fields):
+        return logic.AttackInput(
+            **{"hit_target_number": 8, "injury_bands": logic.DEFAULT_INJURY_BANDS, "injury_roll_mod": 2, **fields}
+        )
+
+    def test_lookup_matches_live_engine(self):
+        logic.build_outcome_table(self.path)
+        table = logic.load_outcome_table()
+        for fields in (
+            {},
+            {"hit_dice_mod": -3, "weapon_is_critical": True, "injury_dice_mod": 2, "target_armor": 4},
+            {"hit_target_number": 20, "hit_roll_mod": -6},
+        ):
+            with self.subTest(**fields):
+                attack = self.attack(**fields)
+                self.assertEqual(table.lookup(attack), logic.attack_outcome_probabilities(attack))
+
+        outside = self.attack(hit_dice_mod=9)
+        self.assertIsNone(table.lookup(outside))
+        self.assertIsNone(table.lookup(self.attack(injury_bands=[logic.InjuryBand(2, None, "Hurt")])))
+        self.assertEqual(logic.lookup_outcome_probabilities(outside), logic.attack_outcome_probabilities(outside))
+
+    def test_missing_or_stale_file_falls_back(self):
+        attack = self.attack(hit_dice_mod=1)
+        expected = logic.attack_outcome_probabilities(attack)
+        self.assertIsNone(logic.load_outcome_table())
+        self.assertEqual(logic.lookup_outcome_probabilities(attack), expected)
+
+        logic.close_outcome_table()
+        self.path.write_bytes(b"TCOT" + bytes(20))
+        self.assertIsNone(logic.load_outcome_table())
+        self.assertEqual(logic.lookup_outcome_probabilities(attack), expected)
+
+
+class WarmTablesTests(SimpleTestCase):
+    def tearDown(self):
+        logic.unload_warm_tables()
+        logic.clear_caches()
+
+    def test_loaded_tables_skip_enumeration(self):
+        attack = logic.AttackInput(
+            hit_target_number=7, hit_dice_mod=9, weapon_is_critical=True, injury_bands=logic.DEFAULT_INJURY_BANDS
+        )
+        expected = logic.attack_outcome_probabilities(attack)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "warm.bin"
+            logic.build_warm_tables(path, range(-9, 10))
+            logic.clear_caches()
+            self.assertEqual(logic.load_warm_tables(path), 43)
+
+        self.assertEqual(logic.attack_outcome_probabilities(attack), expected)
+        self.assertEqual(logic.cache_stats()["kept_sum_counts"]["misses"], 0)
+
+    def test_missing_or_stale_file_loads_nothing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "warm.bin"
+            self.assertEqual(logic.load_warm_tables(path), 0)
+            path.write_bytes(b"TCWS" + bytes(20))
+            self.assertEqual(logic.load_warm_tables(path), 0)
+
+
+class InjuryBandSetTests(CalculatorTestCase):
+    def create_table(self):
+        response = self.client.post(
+            reverse("injury_table_list"),
+            {"table-name": "Grim", "table-bands": "3-7 Wounded\n8 Down\n9+ Dead"},
+        )
+        self.assertEqual(response.status_code, 302)
+        return InjuryBandSet.objects.get(name="Grim")
+
+    def test_table_form_parses_bands(self):
+        band_set = self.create_table()
+        self.assertEqual(
+            band_set.injury_bands(),
+            [logic.InjuryBand(3, 7, "Wounded"), logic.InjuryBand(8, 8, "Down"), logic.InjuryBand(9, None, "Dead")],
+        )
+        response = self.client.post(reverse("injury_table_list"), {"table-name": "Bad", "table-bands": "9+ Miss"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(InjuryBandSet.objects.filter(name="Bad").exists())
+
+    def test_wide_bands_are_rejected(self):
+        response = self.client.post(
+            reverse("injury_table_list"), {"table-name": "Wide", "table-bands": "2-3000000 X\n3000001+ Y"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "bounds must be between -100 and 100.")
+        self.assertFalse(InjuryBandSet.objects.filter(name="Wide").exists())
+
+    def test_calculation_uses_selected_table(self):
+        seed_catalog(10)
+        band_set = self.create_table()
+        attacker, defender = UnitProfile.objects.all()[:2]
+        data = {
+            "attack-attacker_profile": attacker.pk,
+            "attack-defender_profile": defender.pk,
+            "attack-attack_type": "ranged",
+            "attack-hit_target_number": 7,
+            "attack-extra_hit_dice_mod": 0,
+            "attack-hit_roll_mod": 0,
+            "attack-injury_dice_mod": 0,
+            "attack-injury_roll_mod": 2,
+            "attack-extra_target_armor": 0,
+            "attack-injury_band_set": band_set.pk,
+        }
+        results = self.client.post(reverse("calculator"), data).context["results"]
+        self.assertEqual([band["label"] for band in results["bands"]], ["Wounded", "Down", "Dead"])
+        self.assertGreater(results["bands"][1]["raw"], 0.0)
+
+        # Editing the table invalidates the cached result; 8 now falls in the first band.
+        band_set.bands[0]["max_value"] = 8
+        band_set.save()
+        results = self.client.post(reverse("calculator"), data).context["results"]
+        self.assertEqual(results["bands"][1]["raw"], 0.0)
+
+    def test_api_accepts_table_id(self):
+        band_set = self.create_table()
+        scenario = {"hit_target_number": 7, "injury_roll_mod": 1, "injury_band_set": band_set.pk}
+        response = self.client.post(reverse("calculate_api"), json.dumps([scenario]), content_type="application/json")
+        (result,) = response.json()["results"]
+        self.assertEqual(list(result["outcome"]), ["Miss", "Wounded", "Down", "Dead"])
+        self.assertAlmostEqual(sum(result["outcome"].values()), 1.0, places=12)
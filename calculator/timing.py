@@ -0,0 +1,62 @@
+"""Lightweight per-request timers.
+
+Code wraps interesting sections in ``timer(name)`` (or decorates functions
+with ``timed``).  The timers only record anything while a collector is
+active for the current context, which TimingMiddleware starts per request;
+otherwise they cost a single ContextVar lookup.  No Django imports here, so
+calculator.logic can use it.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from time import perf_counter
+from typing import Dict, Optional
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("calculator_timings", default=None)
+
+
+def start_collecting() -> Token:
+    return _timings.set({})
+
+
+def stop_collecting(token: Token) -> Dict[str, float]:
+    timings = _timings.get() or {}
+    _timings.reset(token)
+    return timings
+
+
+def add_timing(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timer(name: str):
+    if _timings.get() is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, perf_counter() - started)
+
+
+def timed(name: str):
+    """Decorator form of timer()."""
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            with timer(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
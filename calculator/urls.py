@@ -1,10 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
+if settings.CALCULATOR_ASYNC_VIEWS:
+    from . import async_views as compute_views
+else:
+    compute_views = views
+
 urlpatterns = [
-    path("", views.calculator_view, name="calculator"),
+    path("", compute_views.calculator_view, name="calculator"),
+    path("sweep/", compute_views.sweep_view, name="sweep"),
+    path("api/calculate/", compute_views.calculate_api, name="calculate_api"),
+    path("api/solve/", views.solve_api, name="solve_api"),
+    path("api/optimize-loadout/", views.optimize_loadout_api, name="optimize_loadout_api"),
+    path("api/catalog/export/", views.catalog_export, name="catalog_export"),
+    path("api/options/<str:kind>/", views.catalog_options, name="catalog_options"),
+    path("api/cache-stats/", views.cache_stats_api, name="cache_stats_api"),
     path("profiles/", views.profile_list, name="profile_list"),
     path("weapons/", views.weapon_list, name="weapon_list"),
     path("keywords/", views.keyword_list, name="keyword_list"),
+    path("injury-tables/", views.injury_table_list, name="injury_table_list"),
+    path("matchups/", views.matchup_matrix, name="matchup_matrix"),
 ]
@@ -1,13 +1,37 @@
-from django.shortcuts import get_object_or_404, redirect, render
+import json
+from dataclasses import replace
 
-from .forms import AttackInputForm, KeywordForm, UnitProfileForm, WeaponForm
+from django.db.models import prefetch_related_objects
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .catalog_io import csv_echo_writer, export_lines
+from .forms import (
+    AttackInputForm,
+    InjuryBandSetForm,
+    KeywordForm,
+    LoadoutForm,
+    ProfileScenarioForm,
+    ResolvedAttackForm,
+    SolveForm,
+    SweepForm,
+    UnitProfileForm,
+    WeaponForm,
+)
+from .loadouts import optimize_loadout
 from .logic import (
     AttackInput,
     DEFAULT_INJURY_BANDS,
-    attack_outcome_probabilities,
+    lookup_outcome_probabilities,
     success_probability,
 )
-from .models import Keyword, UnitProfile, Weapon
+from .models import InjuryBandSet, Keyword, Matchup, UnitProfile, Weapon
+from .resolution import AttackOutOfBounds, attack_key, bound_errors, resolve_attack
+from .result_cache import cache_stats, cached_outcome, cached_results
+from .solver import outcome_labels, outcome_probability, solve
+from .timing import timer
 
 
 def _as_percent(value: float) -> str:
@@ -19,49 +43,49 @@ def _ensure_profiles_exist():
         UnitProfile.objects.create(name="Baseline", ranged_dice_mod=0, melee_dice_mod=0, armor=0)
 
 
-def _build_results(cleaned_data):
-    attacker = cleaned_data["attacker_profile"]
-    weapon = cleaned_data.get("weapon") or attacker.weapons.first()
-    defender = cleaned_data["defender_profile"]
-    attack_type = weapon.range_type if weapon else cleaned_data["attack_type"]
+def _load_calculator_choices():
+    """AttackInputForm choice lists (profiles, weapons, band_sets), loaded once per request."""
+    profiles = list(UnitProfile.objects.all())
+    if not profiles:
+        _ensure_profiles_exist()
+        profiles = list(UnitProfile.objects.all())
+    return {
+        "profiles": profiles,
+        "weapons": list(Weapon.objects.all()),
+        "band_sets": list(InjuryBandSet.objects.all()),
+    }
 
-    atk_kw_totals = attacker.keyword_totals()
-    weapon_kw_totals = weapon.keyword_totals() if weapon else {"ranged_dice_mod": 0, "melee_dice_mod": 0, "armor_mod": 0}
-    def_kw_totals = defender.keyword_totals()
 
-    base_hit_dice_mod = (
-        attacker.ranged_dice_mod if attack_type == "ranged" else attacker.melee_dice_mod
-    )
-    keyword_hit_mod = (
-        atk_kw_totals["ranged_dice_mod"] if attack_type == "ranged" else atk_kw_totals["melee_dice_mod"]
-    )
-    weapon_hit_mod = (
-        weapon_kw_totals["ranged_dice_mod"] if attack_type == "ranged" else weapon_kw_totals["melee_dice_mod"]
-    )
+def _prefetch_calculation(cleaned_data):
+    # One query each for the attacker's weapons and both profiles' keywords;
+    # resolve_attack and _results_context read from those caches.
+    prefetch_related_objects([cleaned_data["attacker_profile"]], "weapons")
+    prefetch_related_objects([cleaned_data["attacker_profile"], cleaned_data["defender_profile"]], "keywords")
+    resolved = resolve_attack(cleaned_data)
+    errors = bound_errors(resolved["attack"])
+    if errors:
+        raise AttackOutOfBounds(errors)
+    if resolved["weapon"]:
+        prefetch_related_objects([resolved["weapon"]], "keywords")
+    return resolved
 
-    hit_dice_mod = base_hit_dice_mod + keyword_hit_mod + weapon_hit_mod + cleaned_data["extra_hit_dice_mod"]
-
-    base_armor = defender.armor
-    keyword_armor_mod = def_kw_totals["armor_mod"]
-    target_armor = base_armor + keyword_armor_mod + cleaned_data["extra_target_armor"]
-
-    attack = AttackInput(
-        hit_target_number=cleaned_data["hit_target_number"],
-        hit_dice_mod=hit_dice_mod,
-        hit_roll_mod=cleaned_data["hit_roll_mod"],
-        weapon_is_critical=cleaned_data.get("weapon_is_critical", False),
-        injury_bands=DEFAULT_INJURY_BANDS,
-        injury_dice_mod=cleaned_data["injury_dice_mod"],
-        injury_roll_mod=cleaned_data["injury_roll_mod"],
-        target_armor=target_armor,
-    )
 
-    outcome = attack_outcome_probabilities(attack)
+def _compute_attack(attack):
+    """Outcome and plain hit chance for one resolved attack."""
+    outcome = cached_outcome(attack)
     hit_prob = success_probability(
-        target_number=cleaned_data["hit_target_number"],
-        dice_mod=hit_dice_mod,
-        roll_mod=cleaned_data["hit_roll_mod"],
+        target_number=attack.hit_target_number,
+        dice_mod=attack.hit_dice_mod,
+        roll_mod=attack.hit_roll_mod,
     )
+    return outcome, hit_prob
+
+
+def _results_context(cleaned_data, resolved, outcome, hit_prob):
+    attack = resolved["attack"]
+    attacker = resolved["attacker"]
+    defender = resolved["defender"]
+    weapon = resolved["weapon"]
     any_injury = 1.0 - outcome.get("Miss", 0.0)
 
     return {
@@ -69,22 +93,23 @@ def _build_results(cleaned_data):
         "defender": defender,
         "weapon": weapon,
         "attacker_weapons": list(attacker.weapons.all()),
-        "attack_type": attack_type,
-        "base_hit_dice_mod": base_hit_dice_mod,
-        "keyword_hit_mod": keyword_hit_mod,
-        "weapon_hit_mod": weapon_hit_mod,
-        "hit_dice_mod": hit_dice_mod,
+        "attack_type": resolved["attack_type"],
+        "base_hit_dice_mod": resolved["base_hit_dice_mod"],
+        "keyword_hit_mod": resolved["keyword_hit_mod"],
+        "weapon_hit_mod": resolved["weapon_hit_mod"],
+        "hit_dice_mod": attack.hit_dice_mod,
         "extra_hit_dice_mod": cleaned_data["extra_hit_dice_mod"],
         "hit_target_number": cleaned_data["hit_target_number"],
         "hit_roll_mod": cleaned_data["hit_roll_mod"],
-        "base_armor": base_armor,
-        "target_armor": target_armor,
+        "base_armor": resolved["base_armor"],
+        "target_armor": attack.target_armor,
         "extra_target_armor": cleaned_data["extra_target_armor"],
-        "keyword_armor_mod": keyword_armor_mod,
+        "keyword_armor_mod": resolved["keyword_armor_mod"],
         "injury_dice_mod": cleaned_data["injury_dice_mod"],
         "injury_roll_mod": cleaned_data["injury_roll_mod"],
         "attacker_keywords": list(attacker.keywords.all()),
         "weapon_keywords": list(weapon.keywords.all()) if weapon else [],
+        "injury_band_set": resolved["injury_band_set"],
         "defender_keywords": list(defender.keywords.all()),
         "hit_probability": _as_percent(hit_prob),
         "miss_probability": _as_percent(outcome.get("Miss", 0.0)),
@@ -95,64 +120,547 @@ def _build_results(cleaned_data):
                 "percent": _as_percent(outcome.get(band.label, 0.0)),
                 "raw": outcome.get(band.label, 0.0),
             }
-            for band in DEFAULT_INJURY_BANDS
+            for band in attack.injury_bands
         ],
     }
 
 
-def _default_payload():
-    form = AttackInputForm(prefix="attack")
+def _build_results(cleaned_data):
+    resolved = _prefetch_calculation(cleaned_data)
+    with timer("compute"):
+        outcome, hit_prob = _compute_attack(resolved["attack"])
+    return _results_context(cleaned_data, resolved, outcome, hit_prob)
+
+
+def _default_payload(choices):
+    form = AttackInputForm(prefix="attack", **choices)
     # If no profiles exist yet, bail
-    if not UnitProfile.objects.exists():
+    if not choices["profiles"]:
         return None
 
+    # Choices are preloaded, so this stays off the database (and safe in the async view).
+    # The weapon is only missing when the catalog has none, so the attacker has none either.
     payload = {}
     for name, field in form.fields.items():
         if name in {"attacker_profile", "defender_profile", "weapon"}:
-            payload[name] = form.initial.get(name) or field.queryset.first()
+            payload[name] = form.initial.get(name) or next(iter(field.objects), None)
         else:
             payload[name] = form.initial.get(name, field.initial)
-
-    attacker = payload.get("attacker_profile")
-    if attacker and not payload.get("weapon"):
-        payload["weapon"] = attacker.weapons.first()
     return payload
 
 
+def _calculator_inputs(request, choices):
+    """The bound form plus the cleaned data to calculate (None when there is nothing to show)."""
+    attack_form = AttackInputForm(request.POST or None, prefix="attack", **choices)
+    if attack_form.is_bound and attack_form.is_valid():
+        return attack_form, attack_form.cleaned_data
+
+    defaults = _default_payload(choices)
+    if defaults and not attack_form.is_bound:
+        attack_form.initial.update(
+            {
+                "attacker_profile": defaults["attacker_profile"],
+                "defender_profile": defaults["defender_profile"],
+                "weapon": defaults.get("weapon"),
+            }
+        )
+    return attack_form, defaults
+
+
+def _render_calculator(request, attack_form, results):
+    with timer("render"):
+        return render(
+            request,
+            "calculator/index.html",
+            {
+                "attack_form": attack_form,
+                "results": results,
+                "nav_active": "calc",
+            },
+        )
+
+
+# Resolved AttackInput field -> the calculator field that feeds it, where the names differ.
+RESOLVED_FORM_FIELDS = {"hit_dice_mod": "extra_hit_dice_mod", "target_armor": "extra_target_armor"}
+
+
+def _add_bound_errors(attack_form, exc):
+    """Show a resolved attack's bound errors on the calculator fields that feed them."""
+    if attack_form.is_bound:
+        for name, messages in exc.errors.items():
+            for message in messages:
+                attack_form.add_error(RESOLVED_FORM_FIELDS.get(name, name), message)
+
+
 def calculator_view(request):
-    _ensure_profiles_exist()
+    attack_form, cleaned_data = _calculator_inputs(request, _load_calculator_choices())
     results = None
-    attack_form = AttackInputForm(request.POST or None, prefix="attack")
+    if cleaned_data:
+        try:
+            results = cached_results(cleaned_data, _build_results)
+        except AttackOutOfBounds as exc:
+            _add_bound_errors(attack_form, exc)
+    return _render_calculator(request, attack_form, results)
+
+
+def _sweep_attack(base_attack, cleaned_data, axis, value):
+    """The resolved attack with one situational field set to ``value``."""
+    if axis == "extra_hit_dice_mod":
+        return replace(base_attack, hit_dice_mod=base_attack.hit_dice_mod - cleaned_data[axis] + value)
+    if axis == "extra_target_armor":
+        return replace(base_attack, target_armor=base_attack.target_armor - cleaned_data[axis] + value)
+    return replace(base_attack, **{axis: value})
+
+
+def _sweep_row_attacks(cleaned_data, base_attack):
+    """Yield (x, [(y, attack), ...]) one x value at a time."""
+    x_axis, y_axis = cleaned_data["x_axis"], cleaned_data.get("y_axis")
+    y_values = range(cleaned_data["y_start"], cleaned_data["y_stop"] + 1) if y_axis else [None]
+
+    for x in range(cleaned_data["x_start"], cleaned_data["x_stop"] + 1):
+        row_attack = _sweep_attack(base_attack, cleaned_data, x_axis, x)
+        yield x, [
+            (y, _sweep_attack(row_attack, cleaned_data, y_axis, y) if y_axis else row_attack)
+            for y in y_values
+        ]
+
+
+def _sweep_outcomes(attacks):
+    """Outcomes for one sweep row.
+
+    Cells go through the memoized engine, so each hit dice pool and injury
+    distribution is enumerated once for the whole grid.
+    """
+    return [lookup_outcome_probabilities(attack) for attack in attacks]
+
+
+def _sweep_header(cleaned_data, labels):
+    y_axis = cleaned_data.get("y_axis")
+    if cleaned_data["output_format"] == "csv":
+        return csv_echo_writer().writerow([cleaned_data["x_axis"]] + ([y_axis] if y_axis else []) + labels)
+    header = {"x_axis": cleaned_data["x_axis"], "y_axis": y_axis or None, "labels": labels}
+    return json.dumps(header)[:-1] + ', "rows": ['
+
+
+def _sweep_row_chunk(cleaned_data, labels, index, x, cells):
+    """Serialize one x row; ``cells`` is a list of (y, outcome)."""
+    y_axis = cleaned_data.get("y_axis")
+    if cleaned_data["output_format"] == "csv":
+        writer = csv_echo_writer()
+        return "".join(
+            writer.writerow([x] + ([y] if y_axis else []) + [outcome.get(label, 0.0) for label in labels])
+            for y, outcome in cells
+        )
+    row = {
+        "x": x,
+        "cells": [
+            dict(({"y": y} if y_axis else {}), **{label: outcome.get(label, 0.0) for label in labels})
+            for y, outcome in cells
+        ],
+    }
+    return ("," if index else "") + json.dumps(row)
+
+
+def _sweep_footer(cleaned_data):
+    return "" if cleaned_data["output_format"] == "csv" else "]}"
+
+
+def _stream_sweep(cleaned_data, base_attack, labels):
+    yield _sweep_header(cleaned_data, labels)
+    for index, (x, row) in enumerate(_sweep_row_attacks(cleaned_data, base_attack)):
+        outcomes = _sweep_outcomes([attack for _, attack in row])
+        cells = [(y, outcome) for (y, _), outcome in zip(row, outcomes)]
+        yield _sweep_row_chunk(cleaned_data, labels, index, x, cells)
+    yield _sweep_footer(cleaned_data)
+
+
+def _sweep_setup(request):
+    """Validated sweep inputs, or an error response."""
+    form = SweepForm(request.GET)
+    if not form.is_valid():
+        return None, JsonResponse({"errors": form.errors}, status=400)
+    return form.cleaned_data, None
+
+
+def _sweep_content_type(cleaned_data):
+    return "text/csv" if cleaned_data["output_format"] == "csv" else "application/json"
+
+
+def _sweep_bound_error(cleaned_data, base_attack):
+    """A 400 response when any sweep cell resolves beyond the bounds, else None.
+
+    Every field moves one way along an axis, so checking the corners covers the grid.
+    """
+    axes = [("x", cleaned_data["x_axis"])]
+    if cleaned_data.get("y_axis"):
+        axes.append(("y", cleaned_data["y_axis"]))
+    corners = [base_attack]
+    for prefix, axis in axes:
+        corners = [
+            _sweep_attack(attack, cleaned_data, axis, cleaned_data[f"{prefix}_{end}"])
+            for attack in corners
+            for end in ("start", "stop")
+        ]
+    errors = {}
+    for attack in corners:
+        errors.update(bound_errors(attack))
+    return JsonResponse({"errors": errors}, status=400) if errors else None
+
+
+def sweep_view(request):
+    cleaned_data, error = _sweep_setup(request)
+    if error:
+        return error
+
+    base_attack = resolve_attack(cleaned_data)["attack"]
+    error = _sweep_bound_error(cleaned_data, base_attack)
+    if error:
+        return error
+    labels = ["Miss"] + [band.label for band in base_attack.injury_bands]
+    return StreamingHttpResponse(
+        _stream_sweep(cleaned_data, base_attack, labels), content_type=_sweep_content_type(cleaned_data)
+    )
 
-    if attack_form.is_bound and attack_form.is_valid():
-        results = _build_results(attack_form.cleaned_data)
-    else:
-        defaults = _default_payload()
-        if defaults:
-            results = _build_results(defaults)
-            if not attack_form.is_bound:
-                attack_form.initial.update(
-                    {
-                        "attacker_profile": defaults["attacker_profile"],
-                        "defender_profile": defaults["defender_profile"],
-                        "weapon": defaults.get("weapon"),
-                    }
-                )
-
-    return render(
-        request,
-        "calculator/index.html",
+
+def solve_api(request):
+    """Answer an inverse query, e.g. the hit dice needed for an 80% hit chance.
+
+    Takes the sweep's attack setup plus ``solve_for`` (an AttackInput field),
+    ``target`` (0-1), and optionally ``outcome`` ("Hit" or an injury band
+    label, meaning that band or worse) and ``comparison`` ("at_least" or
+    "at_most").  ``value`` is null when nothing in the search range qualifies.
+    """
+    form = SolveForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    cleaned_data = form.cleaned_data
+
+    attack = resolve_attack(cleaned_data)["attack"]
+    errors = bound_errors(attack)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    outcome = cleaned_data["outcome"]
+    if outcome not in outcome_labels(attack):
+        choices = ", ".join(outcome_labels(attack))
+        return JsonResponse({"errors": {"outcome": [f"Choose one of: {choices}."]}}, status=400)
+
+    field = cleaned_data["solve_for"]
+    with timer("compute"):
+        solution = solve(
+            attack, field, cleaned_data["target"], outcome, at_most=cleaned_data["comparison"] == "at_most"
+        )
+        current_probability = outcome_probability(attack, outcome)
+    current = getattr(attack, field)
+    return JsonResponse(
+        {
+            "solve_for": field,
+            "outcome": outcome,
+            "comparison": cleaned_data["comparison"],
+            "target": cleaned_data["target"],
+            "current_value": current,
+            "current_probability": current_probability,
+            "value": solution.value,
+            "change": None if solution.value is None else solution.value - current,
+            "probability": solution.probability,
+            "search_range": [solution.search_range.start, solution.search_range.stop - 1],
+            "evaluations": solution.evaluations,
+        }
+    )
+
+
+LOADOUT_SITUATION_FIELDS = (
+    "attack_type",
+    "hit_target_number",
+    "extra_hit_dice_mod",
+    "hit_roll_mod",
+    "injury_dice_mod",
+    "injury_roll_mod",
+    "extra_target_armor",
+    "weapon_is_critical",
+)
+
+
+def _named(obj):
+    return {"id": obj.pk, "name": obj.name} if obj is not None else None
+
+
+@csrf_exempt
+@require_POST
+def optimize_loadout_api(request):
+    """Best weapon and extra keywords for an attacker against weighted defenders.
+
+    Takes a JSON object with ``attacker_profile``, ``defenders`` (profile IDs
+    or ``{"profile": id, "weight": w}`` objects), candidate ``weapons``
+    (default: the attacker's own) and ``keywords``, ``max_keywords``, the
+    ``outcome`` band to maximize (that band or worse) and the calculator's
+    situational modifiers.
+    """
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"errors": ["Request body must be JSON."]}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"errors": ["Expected a JSON object."]}, status=400)
+    form = LoadoutForm(payload)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    data = form.cleaned_data
+
+    attacker = UnitProfile.objects.prefetch_related("keywords", "weapons").filter(pk=data["attacker_profile"]).first()
+    defender_ids = [pk for pk, _ in data["defenders"]]
+    profiles = UnitProfile.objects.in_bulk(defender_ids)
+    weapons = Weapon.objects.in_bulk(data["weapons"]) if data["weapons"] else {}
+    keywords = Keyword.objects.in_bulk(data["keywords"]) if data["keywords"] else {}
+    band_set = InjuryBandSet.objects.filter(pk=data["injury_band_set"]).first() if data["injury_band_set"] else None
+
+    errors = {}
+    for name, requested, found in (
+        ("attacker_profile", [data["attacker_profile"]], {attacker.pk: attacker} if attacker else {}),
+        ("defenders", defender_ids, profiles),
+        ("weapons", data["weapons"], weapons),
+        ("keywords", data["keywords"], keywords),
+    ):
+        missing = [pk for pk in requested if pk not in found]
+        if missing:
+            errors[name] = [f"No object with id {pk}." for pk in missing]
+    if data["injury_band_set"] and band_set is None:
+        errors["injury_band_set"] = [f"No object with id {data['injury_band_set']}."]
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    situation = {name: data[name] for name in LOADOUT_SITUATION_FIELDS}
+    situation["injury_band_set"] = band_set
+    defenders = [(profiles[pk], weight) for pk, weight in data["defenders"]]
+    try:
+        with timer("compute"):
+            search = optimize_loadout(
+                attacker,
+                list(weapons.values()) or list(attacker.weapons.all()),
+                list(keywords.values()),
+                defenders,
+                outcome=data["outcome"],
+                max_keywords=data["max_keywords"],
+                situation=situation,
+            )
+    except ValueError as exc:
+        return JsonResponse({"errors": {"outcome": [str(exc)]}}, status=400)
+
+    best = search.best
+    return JsonResponse(
         {
-            "attack_form": attack_form,
-            "results": results,
-            "nav_active": "calc",
-        },
+            "best": {
+                "weapon": _named(best.weapon),
+                "equivalent_weapons": [_named(weapon) for weapon in best.equivalent_weapons],
+                "keywords": [_named(keyword) for keyword in best.keywords],
+                "extra_hit_dice_mod": best.extra_hit_dice_mod,
+                "score": best.score,
+                "defenders": [
+                    {"profile": _named(defender), "weight": weight, "probability": probability}
+                    for (defender, weight), probability in zip(defenders, best.defender_probabilities)
+                ],
+            },
+            "loadouts": search.loadouts,
+            "nodes_explored": search.nodes_explored,
+            "attacks_evaluated": search.attacks_evaluated,
+        }
+    )
+
+
+MAX_API_SCENARIOS = 1000
+
+
+def _attack_payload(attack):
+    return {
+        "hit_target_number": attack.hit_target_number,
+        "hit_dice_mod": attack.hit_dice_mod,
+        "hit_roll_mod": attack.hit_roll_mod,
+        "weapon_is_critical": attack.weapon_is_critical,
+        "injury_dice_mod": attack.injury_dice_mod,
+        "injury_roll_mod": attack.injury_roll_mod,
+        "target_armor": attack.target_armor,
+    }
+
+
+CATALOG_FIELDS = {
+    "attacker_profile": "profiles",
+    "defender_profile": "profiles",
+    "weapon": "weapons",
+    "injury_band_set": "band_sets",
+}
+
+
+def _load_catalog(forms):
+    """Fetch every profile, weapon and injury table referenced by ``forms`` in a fixed number of queries.
+
+    Returns ``{"profiles": {pk: obj}, "weapons": ..., "band_sets": ...}``.
+    """
+    ids = {kind: set() for kind in CATALOG_FIELDS.values()}
+    for form in forms:
+        if form.is_valid():
+            for name, kind in CATALOG_FIELDS.items():
+                if form.cleaned_data.get(name) is not None:
+                    ids[kind].add(form.cleaned_data[name])
+
+    querysets = {
+        "profiles": UnitProfile.objects.prefetch_related("weapons"),
+        "weapons": Weapon.objects.all(),
+        "band_sets": InjuryBandSet.objects.all(),
+    }
+    return {kind: querysets[kind].in_bulk(ids[kind]) if ids[kind] else {} for kind in querysets}
+
+
+def _scenario_attack(form, catalog):
+    """Turn a validated scenario form into an AttackInput, or return an errors dict."""
+    data = form.cleaned_data
+    errors = {}
+    cleaned = dict(data)
+    for name, kind in CATALOG_FIELDS.items():
+        if data.get(name) is None:
+            continue
+        cleaned[name] = catalog[kind].get(data[name])
+        if cleaned[name] is None:
+            errors[name] = [f"No object with id {data[name]}."]
+    if errors:
+        return None, errors
+
+    if isinstance(form, ResolvedAttackForm):
+        band_set = cleaned.pop("injury_band_set", None)
+        bands = band_set.injury_bands() if band_set else DEFAULT_INJURY_BANDS
+        attack = AttackInput(injury_bands=bands, **cleaned)
+    else:
+        attack = resolve_attack(cleaned)["attack"]
+    errors = bound_errors(attack)
+    return (None, errors) if errors else (attack, None)
+
+
+def _parse_scenarios(request):
+    """Scenario forms from the request body, or an error response."""
+    try:
+        scenarios = json.loads(request.body)
+    except ValueError:
+        return None, JsonResponse({"errors": ["Request body must be JSON."]}, status=400)
+    if not isinstance(scenarios, list) or not all(isinstance(item, dict) for item in scenarios):
+        return None, JsonResponse({"errors": ["Expected a JSON array of scenario objects."]}, status=400)
+    if len(scenarios) > MAX_API_SCENARIOS:
+        return None, JsonResponse({"errors": [f"At most {MAX_API_SCENARIOS} scenarios per request."]}, status=400)
+
+    forms = [
+        ProfileScenarioForm(item) if "attacker_profile" in item else ResolvedAttackForm(item)
+        for item in scenarios
+    ]
+    return forms, None
+
+
+def _resolve_scenarios(forms, catalog):
+    """Per-scenario (errors, attack) entries plus the distinct attacks by key."""
+    entries = []
+    unique = {}
+    for form in forms:
+        if not form.is_valid():
+            entries.append((form.errors, None))
+            continue
+        attack, errors = _scenario_attack(form, catalog)
+        if errors:
+            entries.append((errors, None))
+            continue
+        unique.setdefault(attack_key(attack), attack)
+        entries.append((None, attack))
+    return entries, unique
+
+
+def _scenario_response(entries, outcomes):
+    results = [
+        {"errors": errors} if errors else {"attack": _attack_payload(attack), "outcome": outcomes[attack_key(attack)]}
+        for errors, attack in entries
+    ]
+    return JsonResponse({"results": results, "unique_scenarios": len(outcomes)})
+
+
+@csrf_exempt
+@require_POST
+def calculate_api(request):
+    """Evaluate a JSON array of scenarios in one round trip.
+
+    Each scenario is either resolved AttackInput fields (``hit_target_number``,
+    ``hit_dice_mod``, ...) or calculator inputs with ``attacker_profile``,
+    ``defender_profile`` and optional ``weapon`` IDs.  Results come back in
+    request order; identical attacks are only computed once.
+    """
+    forms, error = _parse_scenarios(request)
+    if error:
+        return error
+
+    entries, unique = _resolve_scenarios(forms, _load_catalog(forms))
+    outcomes = {key: cached_outcome(attack) for key, attack in unique.items()}
+    return _scenario_response(entries, outcomes)
+
+
+def catalog_export(request):
+    """Stream the whole catalog as ?format=csv (default) or jsonl, for import_catalog."""
+    output_format = request.GET.get("format", "csv")
+    if output_format not in ("csv", "jsonl"):
+        return JsonResponse({"errors": ["format must be csv or jsonl."]}, status=400)
+    response = StreamingHttpResponse(
+        export_lines(output_format), content_type="text/csv" if output_format == "csv" else "application/x-ndjson"
+    )
+    response["Content-Disposition"] = f'attachment; filename="catalog.{output_format}"'
+    return response
+
+
+def cache_stats_api(request):
+    return JsonResponse(cache_stats())
+
+
+# Rows per catalog page, and options per search-as-you-type response.
+PAGE_SIZE = 50
+OPTION_LIMIT = 20
+OPTION_MODELS = {"keywords": Keyword, "weapons": Weapon, "profiles": UnitProfile}
+
+
+def _keyset_page(queryset, params, page_size=PAGE_SIZE):
+    """One page of ``queryset`` in name order, filtered by ?q=.
+
+    Pages start after the ?after= name or end before the ?before= name, so
+    each page is an indexed range scan however deep it is.
+    """
+    query = params.get("q", "").strip()
+    if query:
+        queryset = queryset.filter(name__icontains=query)
+    after, before = params.get("after"), params.get("before")
+    if before is not None:
+        rows = list(queryset.filter(name__lt=before).order_by("-name")[: page_size + 1])
+        has_previous, has_next = len(rows) > page_size, True
+        rows = rows[:page_size][::-1]
+    else:
+        if after is not None:
+            queryset = queryset.filter(name__gt=after)
+        rows = list(queryset.order_by("name")[: page_size + 1])
+        has_previous, has_next = after is not None, len(rows) > page_size
+        rows = rows[:page_size]
+    return {
+        "rows": rows,
+        "query": query,
+        "next_after": rows[-1].name if rows and has_next else None,
+        "previous_before": rows[0].name if rows and has_previous else None,
+    }
+
+
+def catalog_options(request, kind):
+    """Search-as-you-type choices for the catalog multi-selects: ?q=, ?after= and ?limit=."""
+    if kind not in OPTION_MODELS:
+        return JsonResponse({"errors": [f"Unknown option list {kind!r}."]}, status=404)
+    try:
+        limit = min(max(int(request.GET.get("limit", OPTION_LIMIT)), 1), PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"errors": ["limit must be an integer."]}, status=400)
+    page = _keyset_page(OPTION_MODELS[kind].objects.only("name"), request.GET, limit)
+    return JsonResponse(
+        {"results": [{"id": row.pk, "name": row.name} for row in page["rows"]], "next": page["next_after"]}
     )
 
 
 def profile_list(request):
     _ensure_profiles_exist()
-    profiles = UnitProfile.objects.prefetch_related("keywords", "weapons")
     form = UnitProfileForm(request.POST or None, prefix="profile")
     editing = None
 
@@ -173,20 +681,23 @@ def profile_list(request):
         editing = get_object_or_404(UnitProfile, pk=request.GET.get("edit"))
         form = UnitProfileForm(prefix="profile", instance=editing)
 
-    return render(
-        request,
-        "calculator/profiles.html",
-        {
-            "profiles": profiles,
-            "profile_form": form,
-            "editing_profile": editing,
-            "nav_active": "profiles",
-        },
-    )
+    page = _keyset_page(UnitProfile.objects.prefetch_related("keywords", "weapons"), request.GET)
+
+    with timer("render"):
+        return render(
+            request,
+            "calculator/profiles.html",
+            {
+                "profiles": page["rows"],
+                "page": page,
+                "profile_form": form,
+                "editing_profile": editing,
+                "nav_active": "profiles",
+            },
+        )
 
 
 def weapon_list(request):
-    weapons = Weapon.objects.prefetch_related("keywords")
     form = WeaponForm(request.POST or None, prefix="weapon")
     editing = None
 
@@ -207,20 +718,23 @@ def weapon_list(request):
         editing = get_object_or_404(Weapon, pk=request.GET.get("edit"))
         form = WeaponForm(prefix="weapon", instance=editing)
 
-    return render(
-        request,
-        "calculator/weapons.html",
-        {
-            "weapons": weapons,
-            "weapon_form": form,
-            "editing_weapon": editing,
-            "nav_active": "weapons",
-        },
-    )
+    page = _keyset_page(Weapon.objects.prefetch_related("keywords"), request.GET)
+
+    with timer("render"):
+        return render(
+            request,
+            "calculator/weapons.html",
+            {
+                "weapons": page["rows"],
+                "page": page,
+                "weapon_form": form,
+                "editing_weapon": editing,
+                "nav_active": "weapons",
+            },
+        )
 
 
 def keyword_list(request):
-    keywords = Keyword.objects.all()
     form = KeywordForm(request.POST or None, prefix="keyword")
     editing = None
 
@@ -241,13 +755,93 @@ def keyword_list(request):
         editing = get_object_or_404(Keyword, pk=request.GET.get("edit"))
         form = KeywordForm(prefix="keyword", instance=editing)
 
-    return render(
-        request,
-        "calculator/keywords.html",
+    page = _keyset_page(Keyword.objects.all(), request.GET)
+
+    with timer("render"):
+        return render(
+            request,
+            "calculator/keywords.html",
+            {
+                "keywords": page["rows"],
+                "page": page,
+                "keyword_form": form,
+                "editing_keyword": editing,
+                "nav_active": "keywords",
+            },
+        )
+
+
+def injury_table_list(request):
+    band_sets = InjuryBandSet.objects.all()
+    form = InjuryBandSetForm(request.POST or None, prefix="table")
+    editing = None
+
+    if request.method == "POST":
+        if "delete_table" in request.POST:
+            target = get_object_or_404(InjuryBandSet, pk=request.POST.get("table_id"))
+            target.delete()
+            return redirect("injury_table_list")
+        else:
+            if request.POST.get("table_id"):
+                editing = get_object_or_404(InjuryBandSet, pk=request.POST.get("table_id"))
+                form = InjuryBandSetForm(request.POST, prefix="table", instance=editing)
+            if form.is_valid():
+                form.save()
+                return redirect("injury_table_list")
+
+    if request.GET.get("edit"):
+        editing = get_object_or_404(InjuryBandSet, pk=request.GET.get("edit"))
+        form = InjuryBandSetForm(prefix="table", instance=editing)
+
+    with timer("render"):
+        return render(
+            request,
+            "calculator/injury_tables.html",
+            {
+                "band_sets": band_sets,
+                "table_form": form,
+                "editing_table": editing,
+                "nav_active": "injury_tables",
+            },
+        )
+
+
+def matchup_matrix(request):
+    metrics = ["Miss"] + [band.label for band in DEFAULT_INJURY_BANDS]
+    metric = request.GET.get("metric")
+    if metric not in metrics:
+        metric = "Out of Action"
+
+    matchups = Matchup.objects.select_related("attacker", "weapon", "defender")
+    defenders = {}
+    grid = {}
+    for matchup in matchups:
+        defenders.setdefault(matchup.defender_id, matchup.defender)
+        row = grid.setdefault(
+            (matchup.attacker_id, matchup.weapon_id),
+            {"attacker": matchup.attacker, "weapon": matchup.weapon, "values": {}},
+        )
+        row["values"][matchup.defender_id] = _as_percent(matchup.outcome.get(metric, 0.0))
+
+    defenders = sorted(defenders.values(), key=lambda profile: profile.name)
+    rows = [
         {
-            "keywords": keywords,
-            "keyword_form": form,
-            "editing_keyword": editing,
-            "nav_active": "keywords",
-        },
-    )
+            "attacker": row["attacker"],
+            "weapon": row["weapon"],
+            "cells": [row["values"].get(defender.pk) for defender in defenders],
+        }
+        for row in grid.values()
+    ]
+
+    with timer("render"):
+        return render(
+            request,
+            "calculator/matchups.html",
+            {
+                "metric": metric,
+                "metrics": metrics,
+                "defenders": defenders,
+                "rows": rows,
+                "nav_active": "matchups",
+            },
+        )
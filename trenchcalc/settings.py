@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'calculator.middleware.TimingMiddleware',
 ]
 
 ROOT_URLCONF = 'trenchcalc.urls'
@@ -82,6 +84,59 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The "calculator" alias holds shared calculator results; a file-based
+# backend lets every worker process see the same entries and invalidations.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'calculator': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.calculator_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
+# Request timing and profiling (see calculator.middleware.TimingMiddleware)
+
+CALCULATOR_SERVER_TIMING = True
+CALCULATOR_PROFILE_REQUESTS = False
+CALCULATOR_PROFILE_DIR = BASE_DIR / 'profiles'
+
+
+# Async views (see calculator.async_views).  asgi.py turns them on; WSGI keeps
+# the sync views.  CPU-bound calculations run in a process pool of
+# CALCULATOR_COMPUTE_WORKERS (default: CPU count); past
+# CALCULATOR_COMPUTE_MAX_PENDING queued calculations (default: 4 per worker)
+# requests get a 503, and a calculation slower than CALCULATOR_COMPUTE_TIMEOUT
+# seconds gets a 504.
+
+CALCULATOR_ASYNC_VIEWS = os.environ.get('TRENCHCALC_ASYNC_VIEWS') == '1'
+CALCULATOR_COMPUTE_WORKERS = None
+CALCULATOR_COMPUTE_MAX_PENDING = None
+CALCULATOR_COMPUTE_TIMEOUT = 10.0
+
+# Load the precomputed engine artifacts (manage.py warm_caches and
+# build_outcome_table) at startup when they exist.
+CALCULATOR_WARM_START = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Set to INFO for one JSON line of timings per request.
+        'calculator.timing': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
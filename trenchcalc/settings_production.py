@@ -0,0 +1,45 @@
+"""
+Production settings: ``DJANGO_SETTINGS_MODULE=trenchcalc.settings_production``.
+
+Needs TRENCHCALC_SECRET_KEY and TRENCHCALC_ALLOWED_HOSTS (comma-separated)
+in the environment.  SQLite runs in WAL mode so calculator reads never wait
+on writes from the edit pages, over connections each worker keeps open.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+SECRET_KEY = os.environ['TRENCHCALC_SECRET_KEY']
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('TRENCHCALC_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Server-Timing would show every client how long the database and engine take.
+CALCULATOR_SERVER_TIMING = False
+
+
+# Database
+# Connections live for CONN_MAX_AGE seconds and are health-checked on reuse.
+# Write transactions take the write lock up front (IMMEDIATE), so two
+# writers queue on the busy timeout instead of one failing on lock upgrade.
+
+DATABASES['default'] = {
+    **DATABASES['default'],
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+}
+
+# Applied to every new connection by calculator.signals.configure_sqlite.
+# WAL lets readers and one writer proceed together; synchronous=NORMAL is
+# durable across application crashes in WAL mode and only fsyncs at
+# checkpoints.  The rest keep hot pages and temp b-trees in memory.
+CALCULATOR_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -32768,  # KiB
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}